@@ -5,27 +5,33 @@ from datetime import timedelta
 import os
 from dotenv import load_dotenv
 from config import config
-from extensions import db
+from extensions import db, cache
+from blueprints import register_blueprints
+from commands import register_commands
 
 # Load environment variables
 load_dotenv()
 
 jwt = JWTManager()
 
+CORS_ORIGINS = ['http://localhost:3000', 'http://127.0.0.1:3000']
+
 def create_app(config_name='default'):
     app = Flask(__name__)
     
     # Load configuration
     app.config.from_object(config[config_name])
+    app.config['CONFIG_NAME'] = config_name
     
     # Initialize extensions with app
     db.init_app(app)
     jwt.init_app(app)
+    cache.init_app(app)
     CORS(app, 
-         origins=['http://localhost:3000', 'http://127.0.0.1:3000'],
+         origins=CORS_ORIGINS,
          supports_credentials=True, 
          allow_headers=['Content-Type', 'Authorization'],
-         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
+         methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'])
     
     # JWT error handlers
     @jwt.invalid_token_loader
@@ -43,26 +49,24 @@ def create_app(config_name='default'):
         print(f"Expired token: {jwt_payload}")
         return jsonify({'error': 'Token has expired'}), 401
     
-    # Import models to ensure they are registered with SQLAlchemy
+    # Import models to ensure they are registered with SQLAlchemy; unlike the
+    # blueprints they load eagerly because relationships resolve by class name
     from models.user import User
     from models.invoice import Invoice, InvoiceItem, Payment
-    from models.expense import Expense, ExpenseCategory
+    from models.expense import Expense, ExpenseCategory, ExpenseReceipt
     from models.payroll import Employee, PayrollRecord, TimeEntry
+    from models.job import Job
+    from models.outbox import OutboxMessage
+    from models.recurring import RecurringTemplate, RecurringInstance
+    from models.report_snapshot import TaxSummarySnapshot, TaxYearRevision
+    from models.ledger import LedgerAccount, JournalEntry, JournalLine, AccountBalanceCheckpoint
+    import services.search  # Attaches the full-text index DDL to the model tables
     
-    # Import and register blueprints
-    from routes.auth import auth_bp
-    from routes.invoices import invoice_bp
-    from routes.expenses import expense_bp
-    from routes.payroll import payroll_bp
-    from routes.reports import report_bp
-    from routes.dashboard import dashboard_bp
+    # Blueprints import their route modules on first request (see blueprints.py)
+    register_blueprints(app)
     
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(invoice_bp, url_prefix='/api/invoices')
-    app.register_blueprint(expense_bp, url_prefix='/api/expenses')
-    app.register_blueprint(payroll_bp, url_prefix='/api/payroll')
-    app.register_blueprint(report_bp, url_prefix='/api/reports')
-    app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+    # CLI commands (flask worker, ...)
+    register_commands(app)
     
     # Error handlers
     @app.errorhandler(404)
@@ -85,13 +89,7 @@ def create_app(config_name='default'):
     
     return app
 
-# Create the app instance
-app = create_app()
-
 if __name__ == '__main__':
-    # Create database tables
-    with app.app_context():
-        db.create_all()
-    
-    # Run the app
-    app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
+    # Create the schema first with `flask --app app init-db`
+    app = create_app()
+    app.run(debug=True, host='0.0.0.0', port=5000)
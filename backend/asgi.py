@@ -0,0 +1,221 @@
+"""ASGI entrypoint: async dashboard and report reads next to the WSGI app.
+
+The GET endpoints in ``ASYNC_ROUTES`` run on async SQLAlchemy sessions, with
+independent queries awaited concurrently, so one worker can serve many
+report requests while they wait on the database. Every other request
+(writes, exports, auth, CORS preflights) is handed to the Flask app
+unchanged.
+
+Run with an ASGI server, e.g.:
+    uvicorn asgi:create_asgi_app --factory --workers 2
+"""
+
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qsl
+
+from a2wsgi import WSGIMiddleware
+from flask_jwt_extended import decode_token
+from jwt import ExpiredSignatureError, InvalidTokenError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.datastructures import MultiDict
+
+from app import CORS_ORIGINS, create_app
+from extensions import db
+from services.aggregates import (
+    dashboard_window, expenses_report, financial_summary, monthly_chart, range_start, reports_window,
+    revenue_report
+)
+from services.async_reports import load_aggregates, load_dashboard
+from services.report_cache import cached_report_async
+
+# Async driver for each database backend the WSGI app may be configured with
+ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg', 'mysql': 'aiomysql'}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def async_database_url(app):
+    """The app's database URL with its async driver (ASYNC_DATABASE_URL overrides it)."""
+    if app.config['ASYNC_DATABASE_URL']:
+        return app.config['ASYNC_DATABASE_URL']
+    with app.app_context():
+        url = db.engine.url  # Flask-SQLAlchemy has resolved relative SQLite paths
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        raise ValueError('The async read path needs a file or server database, not in-memory SQLite')
+    return url.set(drivername=f"{url.get_backend_name()}+{ASYNC_DRIVERS[url.get_backend_name()]}")
+
+
+def _dates(args, default_start, default_end):
+    try:
+        start_date = args.get('start_date')
+        end_date = args.get('end_date')
+        return (
+            datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else default_start,
+            datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else default_end
+        )
+    except ValueError:
+        raise BadRequest('Dates must use the YYYY-MM-DD format')
+
+
+async def dashboard_overview(sessions, user_id, args):
+    today = date.today()
+    _, overview = await load_dashboard(sessions, user_id, *dashboard_window(1, today), today)
+    return overview
+
+
+async def dashboard_bundle(sessions, user_id, args):
+    months = args.get('months', 12, type=int)
+
+    async def build():
+        today = date.today()
+        aggregates, overview = await load_dashboard(sessions, user_id, *dashboard_window(months, today), today)
+        return {
+            'overview': overview,
+            'revenue_chart': monthly_chart(aggregates, months, today, 'revenue')
+        }
+
+    return await cached_report_async(user_id, 'dashboard-bundle', {'months': months}, build)
+
+
+def chart(ledger):
+    async def handler(sessions, user_id, args):
+        months = args.get('months', 12, type=int)
+        today = date.today()
+        aggregates = await load_aggregates(sessions, user_id, *dashboard_window(months, today), ledgers=(ledger,))
+        return monthly_chart(aggregates, months, today, 'revenue' if ledger == 'invoices' else 'expenses')
+    return handler
+
+
+async def financial(sessions, user_id, args):
+    today = date.today()
+    start_dt, end_dt = _dates(args, today - timedelta(days=365), today)
+    # Revenue, expense and payroll rows are awaited concurrently
+    aggregates = await load_aggregates(sessions, user_id, *reports_window(start_dt, end_dt))
+    return financial_summary(aggregates, start_dt, end_dt)
+
+
+async def revenue(sessions, user_id, args):
+    end_date = date.today()
+    start_date = range_start(args.get('range', 'month'), end_date)
+    aggregates = await load_aggregates(sessions, user_id, *reports_window(start_date, end_date), ledgers=('invoices',))
+    return revenue_report(aggregates, start_date, end_date)
+
+
+async def expenses(sessions, user_id, args):
+    end_date = date.today()
+    start_date = range_start(args.get('range', 'month'), end_date)
+    aggregates = await load_aggregates(sessions, user_id, start_date, end_date, ledgers=('expenses',))
+    return expenses_report(aggregates, start_date, end_date)
+
+
+async def reports_bundle(sessions, user_id, args):
+    today = date.today()
+    start_dt, end_dt = _dates(args, today - timedelta(days=365), today)
+    range_param = args.get('range', 'month')
+    range_dt = range_start(range_param, today)
+
+    async def build():
+        window_start, window_end = reports_window(min(start_dt, range_dt), max(end_dt, today))
+        aggregates = await load_aggregates(sessions, user_id, window_start, window_end)
+        return {
+            'financial': financial_summary(aggregates, start_dt, end_dt),
+            'revenue': revenue_report(aggregates, range_dt, today),
+            'expenses': expenses_report(aggregates, range_dt, today)
+        }
+
+    params = {'range': range_param, 'start_date': start_dt.isoformat(), 'end_date': end_dt.isoformat()}
+    return await cached_report_async(user_id, 'reports-bundle', params, build)
+
+
+# Path -> handler(sessions, user_id, args); each mirrors the Flask view of the
+# same path, including its use of the report cache
+ASYNC_ROUTES = {
+    '/api/dashboard/overview': dashboard_overview,
+    '/api/dashboard/bundle': dashboard_bundle,
+    '/api/dashboard/charts/revenue': chart('invoices'),
+    '/api/dashboard/charts/expenses': chart('expenses'),
+    '/api/reports/financial': financial,
+    '/api/reports/revenue': revenue,
+    '/api/reports/expenses': expenses,
+    '/api/reports/bundle': reports_bundle,
+}
+
+
+class AsyncReportsApp:
+    """Serves ``ASYNC_ROUTES`` natively and forwards everything else to the WSGI app."""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.engine = create_async_engine(
+            async_database_url(flask_app),
+            pool_size=flask_app.config['ASYNC_POOL_SIZE'],
+            max_overflow=flask_app.config['ASYNC_POOL_SIZE']
+        )
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.wsgi = WSGIMiddleware(flask_app, workers=flask_app.config['ASYNC_WSGI_THREADS'])
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        handler = ASYNC_ROUTES.get(scope['path'].rstrip('/')) if scope['type'] == 'http' else None
+        if handler is None or scope['method'] != 'GET':
+            return await self.wsgi(scope, receive, send)
+
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        user_id, error = self.authenticate(headers.get('authorization', ''))
+        if error is None:
+            args = MultiDict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+            try:
+                with self.flask_app.app_context():  # For the report cache and config
+                    payload, status = await handler(self.sessions, user_id, args), 200
+            except BadRequest as e:
+                payload, status = {'error': str(e)}, 400
+            except Exception:
+                self.flask_app.logger.exception('Error in async %s', scope['path'])
+                payload, status = {'error': 'Internal server error'}, 500
+        else:
+            payload, status = error
+        await self.respond(send, payload, status, headers.get('origin'))
+
+    def authenticate(self, authorization):
+        """(user id, None) for a valid access token, else (None, (error payload, status))."""
+        if not authorization.startswith('Bearer '):
+            return None, ({'error': 'Missing token'}, 401)
+        try:
+            with self.flask_app.app_context():
+                claims = decode_token(authorization[len('Bearer '):])
+        except ExpiredSignatureError:
+            return None, ({'error': 'Token has expired'}, 401)
+        except (InvalidTokenError, ValueError):
+            return None, ({'error': 'Invalid token'}, 422)
+        if claims.get('type') != 'access':
+            return None, ({'error': 'Invalid token'}, 422)
+        return int(claims[self.flask_app.config['JWT_IDENTITY_CLAIM']]), None
+
+    async def respond(self, send, payload, status, origin):
+        body = self.flask_app.json.dumps(payload).encode()
+        headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+        if origin in CORS_ORIGINS:
+            headers += [
+                (b'access-control-allow-origin', origin.encode('latin-1')),
+                (b'access-control-allow-credentials', b'true'),
+                (b'vary', b'Origin')
+            ]
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_name='default'):
+    return AsyncReportsApp(create_app(config_name))
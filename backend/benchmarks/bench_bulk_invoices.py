@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Bulk invoice creation benchmark.
+
+Compares invoices/sec for looping POST /api/invoices against a single
+POST /api/invoices/bulk request, using an in-memory SQLite database.
+
+Usage (from the backend directory):
+    python benchmarks/bench_bulk_invoices.py --invoices 2000 --items 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+
+
+def make_client():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+    
+    client = app.test_client()
+    response = client.post('/api/auth/register', json={
+        'username': 'bench',
+        'email': 'bench@example.com',
+        'password': 'bench',
+        'first_name': 'Bench',
+        'last_name': 'User'
+    })
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    return client, headers
+
+
+def make_invoice(n, items):
+    return {
+        'client_name': f'Client {n}',
+        'client_email': f'client{n}@example.com',
+        'issue_date': '2024-01-31',
+        'due_date': '2024-02-29',
+        'tax_rate': 8.5,
+        'items': [
+            {'description': f'Line {i}', 'quantity': i + 1, 'unit_price': 19.99}
+            for i in range(items)
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=2000)
+    parser.add_argument('--items', type=int, default=5)
+    args = parser.parse_args()
+    
+    payload = [make_invoice(n, args.items) for n in range(args.invoices)]
+    
+    client, headers = make_client()
+    start = time.perf_counter()
+    for invoice in payload:
+        client.post('/api/invoices', json=invoice, headers=headers)
+    single_elapsed = time.perf_counter() - start
+    
+    client, headers = make_client()
+    start = time.perf_counter()
+    response = client.post('/api/invoices/bulk', json={'invoices': payload}, headers=headers)
+    bulk_elapsed = time.perf_counter() - start
+    assert response.get_json()['created'] == args.invoices, response.get_json()
+    
+    single_rate = args.invoices / single_elapsed
+    bulk_rate = args.invoices / bulk_elapsed
+    print(f"invoices: {args.invoices}, items per invoice: {args.items}")
+    print(f"single endpoint: {single_elapsed:8.3f}s  {single_rate:10.1f} invoices/sec")
+    print(f"bulk endpoint:   {bulk_elapsed:8.3f}s  {bulk_rate:10.1f} invoices/sec")
+    print(f"speedup:         {bulk_rate / single_rate:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
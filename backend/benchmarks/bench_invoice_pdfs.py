@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Invoice PDF rendering benchmark.
+
+Renders N synthetic invoices to a temporary folder in this process and
+across a spawned process pool, and reports the one-off layout compile.
+Compare --processes with the CPU count to pick INVOICE_PDF_PROCESSES.
+
+Usage (from the backend directory):
+    python benchmarks/bench_invoice_pdfs.py --invoices 2000 --processes 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.invoice_pdf import layout_template, write_invoice_pdf
+
+
+def synthetic_invoice(rng, n):
+    items = [
+        {'description': f'Service line {i}', 'quantity': rng.randint(1, 20), 'unit_price': 75.0, 'total': 0.0}
+        for i in range(rng.randint(1, 40))
+    ]
+    for item in items:
+        item['total'] = item['quantity'] * item['unit_price']
+    subtotal = sum(item['total'] for item in items)
+    return {
+        'id': n, 'invoice_number': f'INV-{n:06d}', 'client_name': f'Client {n}',
+        'client_email': f'billing{n}@example.com', 'client_address': '1 Main Street\nSpringfield',
+        'issue_date': '2026-01-31', 'due_date': '2026-03-02', 'subtotal': subtotal, 'tax_rate': 8.0,
+        'tax_amount': subtotal * 0.08, 'total_amount': subtotal * 1.08, 'status': 'sent', 'notes': None,
+        'updated_at': '2026-01-31T12:00:00', 'items': items, 'payments': []
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=2000)
+    parser.add_argument('--processes', type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    invoices = [synthetic_invoice(rng, n) for n in range(args.invoices)]
+
+    start = time.perf_counter()
+    layout_template()
+    compile_elapsed = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = [os.path.join(folder, 'serial', str(n), 'invoice.pdf') for n in range(args.invoices)]
+        start = time.perf_counter()
+        for invoice, path in zip(invoices, paths):
+            write_invoice_pdf(invoice, path)
+        serial = time.perf_counter() - start
+
+        paths = [os.path.join(folder, 'pool', str(n), 'invoice.pdf') for n in range(args.invoices)]
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.processes, mp_context=get_context('spawn')) as pool:
+            chunksize = max(1, args.invoices // (args.processes * 4))
+            list(pool.map(write_invoice_pdf, invoices, paths, chunksize=chunksize))
+        pooled = time.perf_counter() - start
+
+    print(f"invoices: {args.invoices}")
+    print(f"layout compile (first call): {compile_elapsed * 1000:8.2f} ms")
+    print(f"one process:                 {serial * 1000:8.2f} ms  {args.invoices / serial:10.0f} invoices/sec")
+    print(f"{args.processes} processes (with spawn):  {pooled * 1000:8.2f} ms  {args.invoices / pooled:10.0f} invoices/sec")
+
+
+if __name__ == '__main__':
+    main()
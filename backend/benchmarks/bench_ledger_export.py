@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Ledger export size and parse-time benchmark.
+
+Exports the same invoices through GET /api/reports/export/csv and
+GET /api/reports/export/columnar (Parquet and Arrow IPC), then compares
+payload sizes and how long a client takes to load each one.
+
+Usage (from the backend directory):
+    python benchmarks/bench_ledger_export.py --invoices 20000 --repeat 5
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from benchmarks.bench_bulk_invoices import make_client
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invoices', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    client, headers = make_client()
+    today = date.today().isoformat()
+    payload = [
+        {
+            'client_name': f'Client {n}',
+            'client_email': f'client{n}@example.com',
+            'issue_date': today,
+            'due_date': today,
+            'tax_rate': 8.5,
+            'items': [{'description': 'Consulting', 'quantity': n % 7 + 1, 'unit_price': 125.5}]
+        }
+        for n in range(args.invoices)
+    ]
+    response = client.post('/api/invoices/bulk', json={'invoices': payload}, headers=headers)
+    assert response.get_json()['created'] == args.invoices, response.get_json()
+    
+    start = time.perf_counter()
+    csv_data = client.get('/api/reports/export/csv?type=invoices&range=week', headers=headers).data
+    csv_export = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    parquet_data = client.get('/api/reports/export/columnar?dataset=invoices', headers=headers).data
+    parquet_export = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    arrow_data = client.get('/api/reports/export/columnar?dataset=invoices&format=arrow', headers=headers).data
+    arrow_export = time.perf_counter() - start
+    
+    csv_load = best_of(args.repeat, lambda: pa_csv.read_csv(io.BytesIO(csv_data)))
+    parquet_load = best_of(args.repeat, lambda: pq.read_table(io.BytesIO(parquet_data)))
+    arrow_load = best_of(args.repeat, lambda: pa.ipc.open_stream(arrow_data).read_all())
+    
+    print(f"invoices: {args.invoices}")
+    print(f"csv:     {len(csv_data) / 1024:10.1f} KiB  export {csv_export * 1000:8.1f} ms  load {csv_load * 1000:8.2f} ms")
+    print(f"parquet: {len(parquet_data) / 1024:10.1f} KiB  export {parquet_export * 1000:8.1f} ms  load {parquet_load * 1000:8.2f} ms")
+    print(f"arrow:   {len(arrow_data) / 1024:10.1f} KiB  export {arrow_export * 1000:8.1f} ms  load {arrow_load * 1000:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
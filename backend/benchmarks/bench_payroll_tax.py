@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Payroll tax engine benchmark.
+
+Times calculate_withholdings for a pay run of N employees, with and
+without year-to-date wages, and compares it to computing each employee
+separately.
+
+Usage (from the backend directory):
+    python benchmarks/bench_payroll_tax.py --employees 10000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.payroll_tax import calculate_withholdings, load_tax_tables
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--employees', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    gross = [round(rng.uniform(800, 15000), 2) for _ in range(args.employees)]
+    ytd = [round(amount * rng.randint(0, 25), 2) for amount in gross]
+    
+    start = time.perf_counter()
+    load_tax_tables()
+    load_elapsed = time.perf_counter() - start
+    
+    run = best_of(args.repeat, lambda: calculate_withholdings(gross, 26))
+    run_ytd = best_of(args.repeat, lambda: calculate_withholdings(gross, 26, ytd))
+    per_employee = best_of(args.repeat, lambda: [
+        calculate_withholdings([amount], 26, [paid]) for amount, paid in zip(gross, ytd)
+    ])
+    
+    print(f"employees: {args.employees}")
+    print(f"table load (first call):  {load_elapsed * 1000:8.2f} ms")
+    print(f"pay run:                  {run * 1000:8.2f} ms  {args.employees / run:12.0f} employees/sec")
+    print(f"pay run with YTD:         {run_ytd * 1000:8.2f} ms  {args.employees / run_ytd:12.0f} employees/sec")
+    print(f"one call per employee:    {per_employee * 1000:8.2f} ms  {args.employees / per_employee:12.0f} employees/sec")
+
+
+if __name__ == '__main__':
+    main()
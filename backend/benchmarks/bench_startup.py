@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+App cold start benchmark.
+
+Starts fresh interpreters that import the app and call create_app(), with
+blueprints loaded lazily and eagerly, and times the first request too.
+Also reports the app's import time from `python -X importtime` and the
+modules that dominate it. With --budget-ms the script exits non-zero when
+the lazy import + create_app time exceeds the budget, so CI can track it.
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter; prints timings in milliseconds as JSON
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app('testing')
+created = time.perf_counter()
+routes_loaded = sum(1 for name in sys.modules if name.startswith('routes.'))
+app.test_client().get('/api/invoices/')
+first_request = time.perf_counter()
+print(json.dumps({
+    'create_app': (created - start) * 1000,
+    'first_request': (first_request - created) * 1000,
+    'routes_loaded': routes_loaded,
+}))
+"""
+
+
+def run_probe(lazy):
+    env = dict(os.environ, LAZY_BLUEPRINTS='true' if lazy else 'false')
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_profile(top):
+    """Return (total ms for `import app`, [(ms, module)] of the slowest top-level imports)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=BACKEND_DIR,
+        capture_output=True, text=True, check=True
+    )
+    total = 0
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        if name.strip() == 'app' and depth == 0:
+            total = int(cumulative) / 1000
+        elif depth == 1:
+            children.append((int(cumulative) / 1000, name.strip()))
+    return total, sorted(children, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help='Slowest imports to list.')
+    parser.add_argument('--budget-ms', type=float, default=None, help='Fail if lazy import + create_app is slower.')
+    args = parser.parse_args()
+
+    results = {}
+    for lazy in (True, False):
+        runs = [run_probe(lazy) for _ in range(args.repeat)]
+        results[lazy] = runs
+        label = 'lazy blueprints' if lazy else 'eager blueprints'
+        print(f"{label}:")
+        print(f"  import + create_app:    {statistics.median(run['create_app'] for run in runs):8.1f} ms (median of {args.repeat})")
+        print(f"  first request:          {statistics.median(run['first_request'] for run in runs):8.1f} ms")
+        print(f"  route modules imported: {runs[0]['routes_loaded']:8d}")
+
+    total, slowest = import_profile(args.top)
+    print(f"-X importtime, import app: {total:8.1f} ms")
+    for elapsed, module in slowest:
+        print(f"  {module:<28} {elapsed:8.1f} ms")
+
+    if args.budget_ms is not None:
+        lazy_ms = statistics.median(run['create_app'] for run in results[True])
+        if lazy_ms > args.budget_ms:
+            print(f"import + create_app took {lazy_ms:.1f} ms, over the {args.budget_ms:.1f} ms budget")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Mixed-workload load test against a running server.
+
+Simulates concurrent users replaying the frontend's request patterns:
+the Dashboard page (overview + revenue chart in parallel), the Reports
+page (financial, revenue and expenses in parallel), the same two pages
+loaded through their bundle endpoints, and users creating invoices.
+Prints throughput and p50/p95/p99 latency per endpoint and per page load,
+measured once ramp-up has finished.
+
+Start the API first (e.g. `python app.py` or gunicorn), then from the
+backend directory:
+    python benchmarks/loadtest.py --base-url http://localhost:5000 --users 100 --duration 60
+    python benchmarks/loadtest.py --mix dashboard=1 --users 200 --json results.json
+    python benchmarks/loadtest.py --mix dashboard-bundle=45,reports-bundle=45,writer=10
+"""
+
+import argparse
+import http.client
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+
+def dashboard_page(range_param):
+    return [
+        ('GET', '/api/dashboard/overview', None),
+        ('GET', '/api/dashboard/charts/revenue', None),
+    ]
+
+
+def reports_page(range_param):
+    return [
+        ('GET', f'/api/reports/financial?range={range_param}', None),
+        ('GET', f'/api/reports/revenue?range={range_param}', None),
+        ('GET', f'/api/reports/expenses?range={range_param}', None),
+    ]
+
+
+def dashboard_bundle_page(range_param):
+    return [('GET', '/api/dashboard/bundle', None)]
+
+
+def reports_bundle_page(range_param):
+    return [('GET', f'/api/reports/bundle?range={range_param}', None)]
+
+
+def invoice_writer(range_param):
+    return [('POST', '/api/invoices', make_invoice())]
+
+
+# Page name -> requests the frontend fires together when the page loads
+PAGES = {
+    'dashboard': dashboard_page,
+    'reports': reports_page,
+    'dashboard-bundle': dashboard_bundle_page,
+    'reports-bundle': reports_bundle_page,
+    'writer': invoice_writer,
+}
+
+
+def make_invoice(issue_date=None):
+    issue_date = issue_date or date.today()
+    return {
+        'client_name': f'Load Client {random.randint(1, 500)}',
+        'client_email': 'load@example.com',
+        'issue_date': issue_date.isoformat(),
+        'due_date': (issue_date + timedelta(days=30)).isoformat(),
+        'tax_rate': 8.5,
+        'items': [
+            {'description': f'Service {n}', 'quantity': random.randint(1, 10), 'unit_price': 49.99}
+            for n in range(random.randint(1, 5))
+        ]
+    }
+
+
+def endpoint_name(method, path):
+    return f"{method} {path.split('?')[0]}"
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Client:
+    """Keep-alive HTTP client with one connection per thread."""
+    
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.https = parts.scheme == 'https'
+        self.timeout = timeout
+        self.local = threading.local()
+    
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            factory = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            connection = factory(self.host, self.port, timeout=self.timeout)
+            self.local.connection = connection
+        return connection
+    
+    def request(self, method, path, body=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        connection = self._connection()
+        try:
+            connection.request(method, path, body=data, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            # Drop the broken connection so the next request reconnects
+            connection.close()
+            self.local.connection = None
+            raise
+        return response.status, payload
+
+
+class Recorder:
+    """Thread-safe latency and error collection.
+    
+    Requests started before ``measure_from`` (a ``time.perf_counter()``
+    value, e.g. the end of ramp-up) are not recorded, so the results
+    describe the steady state with every user running.
+    """
+    
+    def __init__(self, measure_from=0.0):
+        self.measure_from = measure_from
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+    
+    def add(self, name, elapsed, ok, started):
+        if started < self.measure_from:
+            return
+        with self.lock:
+            self.latencies[name].append(elapsed)
+            if not ok:
+                self.errors[name] += 1
+    
+    def summary(self, wall_time):
+        rows = []
+        with self.lock:
+            for name in sorted(self.latencies):
+                values = sorted(self.latencies[name])
+                rows.append({
+                    'name': name,
+                    'requests': len(values),
+                    'errors': self.errors[name],
+                    'throughput': len(values) / wall_time if wall_time else 0.0,
+                    'p50_ms': percentile(values, 0.50) * 1000,
+                    'p95_ms': percentile(values, 0.95) * 1000,
+                    'p99_ms': percentile(values, 0.99) * 1000,
+                    'max_ms': values[-1] * 1000,
+                })
+        return rows
+
+
+def create_accounts(client, count, seed_invoices):
+    """Register throwaway users and give each some invoices to report on."""
+    tokens = []
+    run_id = uuid.uuid4().hex[:8]
+    for n in range(count):
+        username = f'load-{run_id}-{n}'
+        status, payload = client.request('POST', '/api/auth/register', {
+            'username': username,
+            'email': f'{username}@example.com',
+            'password': 'load-test',
+            'first_name': 'Load',
+            'last_name': f'User {n}'
+        })
+        if status != 201:
+            raise SystemExit(f'Could not register {username}: {status} {payload[:200]!r}')
+        token = json.loads(payload)['access_token']
+        if seed_invoices:
+            invoices = [
+                make_invoice(date.today() - timedelta(days=random.randint(0, 360)))
+                for _ in range(seed_invoices)
+            ]
+            client.request('POST', '/api/invoices/bulk', {'invoices': invoices}, token)
+        tokens.append(token)
+    return tokens
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in PAGES:
+            raise argparse.ArgumentTypeError(f"unknown page '{name}' (choose from {', '.join(PAGES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def run_user(client, token, mix, args, deadline, recorder, rng):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    # A browser loads a page's requests in parallel over separate connections
+    with ThreadPoolExecutor(max_workers=4) as browser:
+        while time.monotonic() < deadline:
+            page = rng.choices(names, weights)[0]
+            requests = PAGES[page](args.range)
+            
+            def timed(method, path, body):
+                start = time.perf_counter()
+                try:
+                    status, _ = client.request(method, path, body, token)
+                    ok = status < 400
+                except (OSError, http.client.HTTPException):
+                    ok = False
+                recorder.add(endpoint_name(method, path), time.perf_counter() - start, ok, start)
+                return ok
+            
+            start = time.perf_counter()
+            results = list(browser.map(lambda request: timed(*request), requests))
+            recorder.add(f'page {page}', time.perf_counter() - start, all(results), start)
+            
+            if args.think_time:
+                time.sleep(rng.uniform(0, 2 * args.think_time))
+
+
+def print_table(rows, wall_time, users, ramp_up):
+    print(f"\n{users} users, measured for {wall_time:.1f}s after a {ramp_up:.1f}s ramp-up")
+    header = f"{'endpoint':42s} {'reqs':>7s} {'errs':>5s} {'req/s':>8s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}"
+    print(header)
+    print('-' * len(header))
+    for row in rows:
+        print(
+            f"{row['name']:42s} {row['requests']:7d} {row['errors']:5d} {row['throughput']:8.1f} "
+            f"{row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['p99_ms']:8.1f} {row['max_ms']:8.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--users', type=int, default=50, help='Concurrent simulated users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run after ramp-up')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Seconds over which users start')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('dashboard=45,reports=45,writer=10'),
+                        help='Page weights, e.g. dashboard=45,reports=45,writer=10')
+    parser.add_argument('--range', default='month', help='range= sent by the Reports page')
+    parser.add_argument('--accounts', type=int, default=10, help='Users to register and share between threads')
+    parser.add_argument('--seed-invoices', type=int, default=50, help='Invoices created per account before the run')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Mean seconds a user pauses between pages')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', metavar='PATH', help='Also write the results as JSON')
+    args = parser.parse_args()
+    
+    client = Client(args.base_url, args.timeout)
+    try:
+        client.request('GET', '/api/health')
+    except OSError as e:
+        raise SystemExit(f'Cannot reach {args.base_url}: {e}')
+    
+    print(f'Registering {args.accounts} accounts with {args.seed_invoices} invoices each...')
+    tokens = create_accounts(client, args.accounts, args.seed_invoices)
+    
+    # Throughput and latency cover the run after ramp-up, once every user is active
+    recorder = Recorder(measure_from=time.perf_counter() + args.ramp_up)
+    start = time.monotonic()
+    deadline = start + args.ramp_up + args.duration
+    threads = []
+    for n in range(args.users):
+        rng = random.Random(args.seed + n)
+        thread = threading.Thread(
+            target=run_user,
+            args=(client, tokens[n % len(tokens)], args.mix, args, deadline, recorder, rng),
+            daemon=True
+        )
+        threads.append(thread)
+        thread.start()
+        if args.ramp_up:
+            time.sleep(args.ramp_up / args.users)
+    
+    for thread in threads:
+        thread.join()
+    wall_time = time.monotonic() - start - args.ramp_up
+    
+    rows = recorder.summary(wall_time)
+    print_table(rows, wall_time, args.users, args.ramp_up)
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'base_url': args.base_url,
+                'users': args.users,
+                'duration': wall_time,
+                'ramp_up': args.ramp_up,
+                'mix': args.mix,
+                'results': rows
+            }, f, indent=2)
+    
+    return 1 if any(row['errors'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import importlib
+import os
+from functools import cached_property
+
+# URL prefix -> "module:blueprint". With LAZY_BLUEPRINTS on, every URL rule
+# is registered when the app is created (from route_table.py), but a
+# blueprint's module (and the services it pulls in) is only imported by the
+# first request to one of its views.
+BLUEPRINTS = {
+    '/api/auth': 'routes.auth:auth_bp',
+    '/api/invoices': 'routes.invoices:invoice_bp',
+    '/api/expenses': 'routes.expenses:expense_bp',
+    '/api/payroll': 'routes.payroll:payroll_bp',
+    '/api/reports': 'routes.reports:report_bp',
+    '/api/dashboard': 'routes.dashboard:dashboard_bp',
+    '/api/jobs': 'routes.jobs:job_bp',
+    '/api/admin': 'routes.admin:admin_bp',
+    '/api/search': 'routes.search:search_bp',
+    '/api/ledger': 'routes.ledger:ledger_bp',
+    '/api/outbox': 'routes.outbox:outbox_bp',
+    '/api/recurring': 'routes.recurring:recurring_bp',
+}
+
+ROUTE_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'route_table.py')
+
+
+def resolve_blueprint(prefix):
+    module_name, attr = BLUEPRINTS[prefix].split(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class LazyView:
+    """View function that imports ``module:function`` on the first request it serves.
+
+    The URL map is complete from the start and never changes while requests
+    are being served; concurrent first requests just share Python's import
+    lock.
+    """
+
+    def __init__(self, import_name):
+        self.import_name = import_name
+        self.__name__ = import_name.partition(':')[2]
+
+    @cached_property
+    def view(self):
+        module_name, attr = self.import_name.split(':')
+        return getattr(importlib.import_module(module_name), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def register_blueprints(app):
+    """Register every blueprint now, or every URL rule with lazy views when LAZY_BLUEPRINTS is set."""
+    if app.config['LAZY_BLUEPRINTS']:
+        from route_table import ROUTES
+        views = {}  # One view per endpoint; '' and '/' rules share theirs
+        for rule, endpoint, methods, view in ROUTES:
+            app.add_url_rule(rule, endpoint, views.setdefault(endpoint, LazyView(view)), methods=methods)
+    else:
+        for prefix in BLUEPRINTS:
+            app.register_blueprint(resolve_blueprint(prefix), url_prefix=prefix)
+
+
+def route_table(app):
+    """(rule, endpoint, methods, "module:function") for each blueprint rule of an eagerly registered ``app``."""
+    routes = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint.partition('.')[0] not in app.blueprints:
+            continue  # Routes on the app itself are always registered directly
+        view = app.view_functions[rule.endpoint]
+        if getattr(importlib.import_module(view.__module__), view.__name__, None) is not view:
+            raise ValueError(f'{rule.endpoint} is not a module-level function, so it cannot be imported lazily')
+        if rule.defaults or not rule.strict_slashes or rule.subdomain or rule.host:
+            raise ValueError(f'{rule.endpoint} uses rule options route_table.py does not record')
+        routes.append((rule.rule, rule.endpoint, tuple(sorted(rule.methods - {'HEAD', 'OPTIONS'})),
+                       f'{view.__module__}:{view.__name__}'))
+    return routes
+
+
+def write_route_table(app, path=ROUTE_TABLE_PATH):
+    """Regenerate route_table.py from an eagerly registered ``app``."""
+    with open(path, 'w') as f:
+        f.write('# Generated by `LAZY_BLUEPRINTS=false flask --app app route-table` from the\n')
+        f.write('# blueprints in blueprints.py; tests/test_startup.py fails when it is stale.\n')
+        f.write('ROUTES = [\n')
+        for route in route_table(app):
+            f.write(f'    {route!r},\n')
+        f.write(']\n')
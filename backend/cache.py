@@ -0,0 +1,237 @@
+"""Pluggable cache shared by the app's memoized lookups.
+
+``CACHE_BACKEND`` selects where entries live:
+
+* ``local``  - an in-process LRU (the default); each worker has its own copy.
+* ``sqlite`` - a SQLite file at ``CACHE_URL`` shared by every worker on the host.
+* ``redis``  - any Redis-protocol server at ``CACHE_URL`` (needs the ``redis`` package).
+
+Keys live in namespaces, e.g. ``tenant:42:reports``. Invalidating a namespace
+bumps its version, which every key in it embeds, so a whole namespace is
+dropped with one write and stale entries simply expire.
+"""
+
+import asyncio
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+_MISSING = object()
+
+
+class LocalBackend:
+    """Bounded in-process LRU with per-entry expiry."""
+
+    shared = False  # Each worker process has its own entries and versions
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                return _MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def version(self, namespace):
+        with self._lock:
+            return self._versions.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class SQLiteBackend:
+    """Entries in a SQLite file, shared by every process that opens it.
+
+    Each thread keeps its own connection. WAL mode lets readers run while a
+    worker writes, and expired rows are purged every ``PURGE_EVERY`` writes.
+    """
+
+    PURGE_EVERY = 500
+    shared = True
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_entry (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_namespace (namespace TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # Connections must not cross a fork into worker processes
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value FROM cache_entry WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return pickle.loads(row[0]) if row else _MISSING
+
+    def set(self, key, value, ttl):
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entry (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time() + ttl)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute('DELETE FROM cache_entry WHERE expires_at <= ?', (time.time(),))
+
+    def version(self, namespace):
+        row = self._connect().execute(
+            'SELECT version FROM cache_namespace WHERE namespace = ?', (namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, namespace):
+        self._connect().execute(
+            'INSERT INTO cache_namespace (namespace, version) VALUES (?, 1) '
+            'ON CONFLICT (namespace) DO UPDATE SET version = version + 1',
+            (namespace,)
+        )
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute('DELETE FROM cache_entry')
+        conn.execute('DELETE FROM cache_namespace')
+
+
+class RedisBackend:
+    """Entries in a Redis-protocol server (Redis, Valkey, KeyDB, ...)."""
+
+    shared = True
+
+    def __init__(self, url, prefix):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('CACHE_BACKEND=redis requires the redis package (pip install redis)')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(key)
+        return pickle.loads(value) if value is not None else _MISSING
+
+    def set(self, key, value, ttl):
+        self.client.set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), px=max(1, int(ttl * 1000)))
+
+    def version(self, namespace):
+        return int(self.client.get(f'{self.prefix}:ns:{namespace}') or 0)
+
+    def bump(self, namespace):
+        self.client.incr(f'{self.prefix}:ns:{namespace}')
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f'{self.prefix}:*', count=1000))
+        if keys:
+            self.client.delete(*keys)
+
+
+def create_backend(config):
+    backend = config['CACHE_BACKEND']
+    if backend == 'local':
+        return LocalBackend(config['CACHE_MAX_ENTRIES'])
+    if backend == 'sqlite':
+        return SQLiteBackend(config['CACHE_URL'] or 'smoothbooks-cache.db')
+    if backend == 'redis':
+        return RedisBackend(config['CACHE_URL'] or 'redis://localhost:6379/0', config['CACHE_KEY_PREFIX'])
+    raise ValueError(f"Unknown CACHE_BACKEND '{backend}' (choose local, sqlite or redis)")
+
+
+class Cache:
+    """Namespaced cache bound to the current app's configured backend."""
+
+    def init_app(self, app):
+        app.extensions['cache'] = create_backend(app.config)
+
+    @property
+    def backend(self):
+        return current_app.extensions['cache']
+
+    @staticmethod
+    def tenant_namespace(user_id, name):
+        return f'tenant:{int(user_id)}:{name}'
+
+    def _key(self, namespace, version, key):
+        return f"{current_app.config['CACHE_KEY_PREFIX']}:{namespace}:{version}:{key}"
+
+    def get(self, namespace, key, default=None):
+        backend = self.backend
+        value = backend.get(self._key(namespace, backend.version(namespace), key))
+        return default if value is _MISSING else value
+
+    def set(self, namespace, key, value, ttl=None):
+        backend = self.backend
+        ttl = ttl if ttl is not None else current_app.config['CACHE_DEFAULT_TTL']
+        backend.set(self._key(namespace, backend.version(namespace), key), value, ttl)
+
+    def get_or_load(self, namespace, key, loader, ttl=None):
+        """Return the cached value for ``key``, calling ``loader()`` on a miss.
+
+        The value is stored under the namespace version read before loading,
+        so a value loaded while a writer invalidated the namespace is never
+        served.
+        """
+        backend = self.backend
+        cache_key = self._key(namespace, backend.version(namespace), key)
+        value = backend.get(cache_key)
+        if value is _MISSING:
+            value = loader()
+            ttl = ttl if ttl is not None else current_app.config['CACHE_DEFAULT_TTL']
+            backend.set(cache_key, value, ttl)
+        return value
+
+    async def get_or_load_async(self, namespace, key, loader, ttl=None):
+        """``get_or_load`` for a coroutine ``loader``; shares entries with it.
+
+        The backend calls block (a SQLite file, a Redis round trip), so they
+        run in a thread rather than stalling the event loop.
+        """
+        backend = self.backend
+        cache_key = self._key(namespace, await asyncio.to_thread(backend.version, namespace), key)
+        value = await asyncio.to_thread(backend.get, cache_key)
+        if value is _MISSING:
+            value = await loader()
+            ttl = ttl if ttl is not None else current_app.config['CACHE_DEFAULT_TTL']
+            await asyncio.to_thread(backend.set, cache_key, value, ttl)
+        return value
+
+    def invalidate(self, namespace):
+        """Drop every entry in ``namespace``."""
+        self.backend.bump(namespace)
+
+    def clear(self):
+        self.backend.clear()
@@ -0,0 +1,194 @@
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from extensions import db
+
+# Commands import their services when they run, so registering them adds
+# nothing to the app's cold start
+
+def register_commands(app):
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(worker_command)
+    app.cli.add_command(search_reindex_command)
+    app.cli.add_command(migrate_expense_categories_command)
+    app.cli.add_command(migrate_job_heartbeats_command)
+    app.cli.add_command(ledger_backfill_command)
+    app.cli.add_command(ledger_checkpoint_command)
+    app.cli.add_command(create_indexes_command)
+    app.cli.add_command(route_table_command)
+    app.cli.add_command(receipts_gc_command)
+    app.cli.add_command(invoice_pdfs_command)
+    app.cli.add_command(outbox_dispatch_command)
+    app.cli.add_command(recurring_generate_command)
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create any missing tables (run once per database, and after adding models)."""
+    db.create_all()
+    click.echo('Database tables created')
+
+@click.command('worker')
+@click.option('--processes', type=int, default=None, help='Number of worker processes (default: JOB_WORKER_PROCESSES).')
+@click.option('--poll-interval', type=float, default=None, help='Seconds to wait when the queue is empty.')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+@with_appcontext
+def worker_command(processes, poll_interval, burst):
+    """Run background job workers against the job table."""
+    from services.jobs import requeue_stale_jobs, run_worker_pool, work
+    
+    app = current_app._get_current_object()
+    processes = processes or app.config['JOB_WORKER_PROCESSES']
+    poll_interval = poll_interval or app.config['JOB_POLL_INTERVAL']
+    
+    requeued, failed = requeue_stale_jobs(app.config['JOB_STALE_AFTER'], app.config['JOB_MAX_ATTEMPTS'])
+    if requeued:
+        click.echo(f'Requeued {requeued} jobs whose worker stopped')
+    if failed:
+        click.echo(f'Failed {failed} jobs that ran out of attempts')
+    db.session.remove()
+    
+    click.echo(f'Starting {processes} job worker(s)')
+    if processes == 1:
+        work(app, poll_interval, burst)
+    else:
+        run_worker_pool(app.config['CONFIG_NAME'], processes, poll_interval, burst)
+
+@click.command('search-reindex')
+@with_appcontext
+def search_reindex_command():
+    """Create the full-text search index if needed and rebuild it."""
+    from services.search import rebuild_search_index
+    rebuild_search_index()
+    click.echo('Search index rebuilt')
+
+
+@click.command('migrate-expense-categories')
+@with_appcontext
+def migrate_expense_categories_command():
+    """Replace expense.category strings with per-user expense_category ids."""
+    from services.categories import migrate_expense_categories
+    counts = migrate_expense_categories()
+    if counts is None:
+        click.echo('Expense categories are already migrated')
+    else:
+        click.echo(f"Encoded {counts['encoded']} expenses; made {counts['made_private']} categories private")
+
+@click.command('migrate-job-heartbeats')
+@with_appcontext
+def migrate_job_heartbeats_command():
+    """Add the heartbeat column workers use to show a running job is alive."""
+    from services.jobs import add_heartbeat_column
+    if add_heartbeat_column():
+        click.echo('Added job.heartbeat_at')
+    else:
+        click.echo('Jobs already have heartbeats')
+
+@click.command('ledger-backfill')
+@click.option('--user-id', type=int, default=None, help='Only post this user\'s records.')
+@click.option('--batch-size', type=int, default=None, help='Source records per transaction (default: BULK_INSERT_CHUNK_SIZE).')
+@with_appcontext
+def ledger_backfill_command(user_id, batch_size):
+    """Post existing invoices, payments, expenses and payroll to the general ledger."""
+    from services.general_ledger import backfill_ledger
+    batch_size = batch_size or current_app.config['BULK_INSERT_CHUNK_SIZE']
+    written = backfill_ledger(user_id, batch_size)
+    checkpoints = written.pop('checkpoints', 0)
+    for source_type, entries in sorted(written.items()):
+        click.echo(f'{source_type}: {entries} journal entries')
+    click.echo(f'Wrote {checkpoints} balance checkpoints')
+
+@click.command('ledger-checkpoint')
+@with_appcontext
+def ledger_checkpoint_command():
+    """Store month-end ledger balance checkpoints through last month (run monthly or nightly)."""
+    from models.user import User
+    from services.general_ledger import roll_checkpoints
+    
+    written = 0
+    for (user_id,) in db.session.query(User.id).order_by(User.id).all():
+        written += roll_checkpoints(user_id)
+        db.session.commit()
+    click.echo(f'Wrote {written} balance checkpoints')
+
+@click.command('create-indexes')
+@with_appcontext
+def create_indexes_command():
+    """Create indexes declared on the models that an existing database lacks."""
+    inspector = db.inspect(db.engine)
+    created = 0
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue  # db.create_all() creates new tables with their indexes
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.engine)
+                created += 1
+    click.echo(f'Created {created} indexes')
+
+@click.command('route-table')
+@with_appcontext
+def route_table_command():
+    """Regenerate route_table.py, the URL rules registered when LAZY_BLUEPRINTS is on."""
+    from blueprints import ROUTE_TABLE_PATH, write_route_table
+    
+    app = current_app._get_current_object()
+    if app.config['LAZY_BLUEPRINTS']:
+        raise click.UsageError('Run with LAZY_BLUEPRINTS=false so the table is read from the blueprints')
+    write_route_table(app)
+    click.echo(f'Wrote {ROUTE_TABLE_PATH}')
+
+@click.command('receipts-gc')
+@click.option('--grace', type=int, default=3600, help='Keep files younger than this many seconds.')
+@with_appcontext
+def receipts_gc_command(grace):
+    """Delete stored receipt files that no expense references any more."""
+    from services.receipts import collect_garbage
+    
+    click.echo(f'Removed {collect_garbage(grace)} receipt files')
+
+@click.command('invoice-pdfs')
+@click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']), required=True, help='First issue date to render.')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), required=True, help='Last issue date to render.')
+@click.option('--user-id', type=int, default=None, help='Only this user\'s invoices (default: everyone\'s).')
+@click.option('--processes', type=int, default=None, help='Render processes (default: INVOICE_PDF_PROCESSES).')
+@with_appcontext
+def invoice_pdfs_command(start_date, end_date, user_id, processes):
+    """Render and cache invoice PDFs for a period, e.g. at month end."""
+    from services.invoice_documents import render_batch
+    
+    total, rendered = render_batch(start_date.date(), end_date.date(), user_id=user_id, processes=processes)
+    click.echo(f'Rendered {rendered} of {total} invoice PDFs ({total - rendered} already cached)')
+
+@click.command('outbox-dispatch')
+@click.option('--poll-interval', type=float, default=None, help='Seconds to wait when nothing is due (default: OUTBOX_POLL_INTERVAL).')
+@click.option('--burst', is_flag=True, help='Exit once no messages are due.')
+@with_appcontext
+def outbox_dispatch_command(poll_interval, burst):
+    """Deliver queued outbox emails in batches over one SMTP connection."""
+    from services.outbox import requeue_stale_messages, run_dispatcher
+    
+    app = current_app._get_current_object()
+    requeued, failed = requeue_stale_messages(app.config['OUTBOX_STALE_AFTER'], app.config['OUTBOX_MAX_ATTEMPTS'])
+    if requeued:
+        click.echo(f'Requeued {requeued} stale outbox messages')
+    if failed:
+        click.echo(f'Failed {failed} stale outbox messages that ran out of attempts')
+    
+    click.echo(f"Dispatching outbox via {app.config['MAIL_SERVER']}:{app.config['MAIL_PORT']}")
+    processed = run_dispatcher(app, poll_interval, burst)
+    if burst:
+        click.echo(f'Processed {processed} outbox messages')
+
+@click.command('recurring-generate')
+@click.option('--date', 'run_date', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Generate what is due by this date (default: today).')
+@with_appcontext
+def recurring_generate_command(run_date):
+    """Create the invoices and expenses due from recurring templates, for every user."""
+    from services.recurring import generate_recurring
+    
+    counts = generate_recurring(
+        run_date.date() if run_date else None, current_app.config['RECURRING_MAX_CATCH_UP']
+    )
+    click.echo(f"Generated {counts['invoices']} invoices and {counts['expenses']} expenses")
@@ -7,6 +7,84 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    
+    # Import each blueprint's routes on the first request to its URL prefix
+    LAZY_BLUEPRINTS = os.getenv('LAZY_BLUEPRINTS', 'true').lower() in ('1', 'true', 'yes')
+    
+    # ASGI entrypoint (asgi.py): async database URL (derived from DATABASE_URL by
+    # default), connections per worker, and threads serving the WSGI fallback
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')
+    ASYNC_POOL_SIZE = int(os.getenv('ASYNC_POOL_SIZE', 20))
+    ASYNC_WSGI_THREADS = int(os.getenv('ASYNC_WSGI_THREADS', 10))
+    
+    # Bulk write settings
+    BULK_INSERT_CHUNK_SIZE = int(os.getenv('BULK_INSERT_CHUNK_SIZE', 500))
+    BULK_MAX_INVOICES = int(os.getenv('BULK_MAX_INVOICES', 10000))
+    BULK_MAX_TIME_ENTRIES = int(os.getenv('BULK_MAX_TIME_ENTRIES', 50000))
+    
+    # Overtime rules in hours; set a threshold to 0 to disable it
+    OVERTIME_DAILY_THRESHOLD = float(os.getenv('OVERTIME_DAILY_THRESHOLD', 8))
+    OVERTIME_WEEKLY_THRESHOLD = float(os.getenv('OVERTIME_WEEKLY_THRESHOLD', 40))
+    WORKWEEK_START_DAY = int(os.getenv('WORKWEEK_START_DAY', 0))  # 0 = Monday
+    
+    # Payroll tax bracket/rate tables (JSON); defaults to services/tax_tables.json
+    PAYROLL_TAX_TABLES = os.getenv('PAYROLL_TAX_TABLES')
+    
+    # Background jobs (run workers with `flask worker`)
+    JOB_WORKER_PROCESSES = int(os.getenv('JOB_WORKER_PROCESSES', 2))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1.0))
+    JOB_HEARTBEAT_INTERVAL = float(os.getenv('JOB_HEARTBEAT_INTERVAL', 30))  # seconds between a running job's heartbeats
+    JOB_STALE_AFTER = int(os.getenv('JOB_STALE_AFTER', 300))  # seconds without a heartbeat before a job is requeued
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))  # runs before a job whose worker keeps dying is marked failed
+    
+    # Expense receipts, stored by content hash (default <instance>/receipts)
+    RECEIPT_STORAGE_DIR = os.getenv('RECEIPT_STORAGE_DIR')
+    RECEIPT_MAX_BYTES = int(os.getenv('RECEIPT_MAX_BYTES', 20 * 1024 * 1024))
+    RECEIPT_THUMBNAIL_SIZE = int(os.getenv('RECEIPT_THUMBNAIL_SIZE', 256))  # pixels, longest side
+    RECEIPT_CACHE_MAX_AGE = int(os.getenv('RECEIPT_CACHE_MAX_AGE', 86400))  # seconds browsers may reuse a download
+    
+    # Invoice PDFs, cached per invoice version (default <instance>/invoice-pdfs);
+    # batch runs of at least INVOICE_PDF_POOL_MIN invoices use a process pool
+    INVOICE_PDF_DIR = os.getenv('INVOICE_PDF_DIR')
+    INVOICE_PDF_PROCESSES = int(os.getenv('INVOICE_PDF_PROCESSES', 4))
+    INVOICE_PDF_POOL_MIN = int(os.getenv('INVOICE_PDF_POOL_MIN', 50))
+    
+    # Outgoing email (SMTP); sent from the outbox by `flask outbox-dispatch`
+    MAIL_SERVER = os.getenv('MAIL_SERVER', 'localhost')
+    MAIL_PORT = int(os.getenv('MAIL_PORT', 25))
+    MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'false').lower() in ('1', 'true', 'yes')
+    MAIL_USERNAME = os.getenv('MAIL_USERNAME')
+    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'billing@localhost')
+    MAIL_TIMEOUT = float(os.getenv('MAIL_TIMEOUT', 30))
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 100))
+    OUTBOX_POLL_INTERVAL = float(os.getenv('OUTBOX_POLL_INTERVAL', 2.0))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 8))
+    OUTBOX_RETRY_BASE = float(os.getenv('OUTBOX_RETRY_BASE', 30))  # seconds, doubled per failed attempt
+    OUTBOX_RETRY_MAX = float(os.getenv('OUTBOX_RETRY_MAX', 3600))
+    OUTBOX_HEARTBEAT_INTERVAL = float(os.getenv('OUTBOX_HEARTBEAT_INTERVAL', 30))  # seconds between a sending batch's heartbeats
+    OUTBOX_STALE_AFTER = int(os.getenv('OUTBOX_STALE_AFTER', 600))  # seconds without a heartbeat before a claimed batch is retried
+    
+    # Recurring templates: most periods one template may catch up on per run
+    RECURRING_MAX_CATCH_UP = int(os.getenv('RECURRING_MAX_CATCH_UP', 12))
+    
+    # Ledger exports: rows fetched and converted per batch
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 5000))
+    
+    # Admin cross-tenant analytics
+    ANALYTICS_WORKERS = int(os.getenv('ANALYTICS_WORKERS', 4))
+    ANALYTICS_PARTITION_DAYS = int(os.getenv('ANALYTICS_PARTITION_DAYS', 92))
+    
+    # App cache: 'local' (per-process LRU), 'sqlite' (file shared by workers) or 'redis'
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'local')
+    CACHE_URL = os.getenv('CACHE_URL')  # sqlite file path or redis:// URL
+    CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'smoothbooks')
+    CACHE_DEFAULT_TTL = float(os.getenv('CACHE_DEFAULT_TTL', 300))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 4096))  # local backend only
+    
+    # Reference data (expense categories, employee directory) and report caching
+    REFCACHE_TTL = float(os.getenv('REFCACHE_TTL', 30))  # seconds before local-cache workers see a change
+    REPORT_CACHE_TTL = float(os.getenv('REPORT_CACHE_TTL', 60))  # shared backends only; 'local' never caches reports
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -17,6 +95,8 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    ANALYTICS_WORKERS = 1  # the in-memory database is a single shared connection
+    CACHE_BACKEND = 'local'
 
 config = {
     'development': DevelopmentConfig,
@@ -1,2 +1,4 @@
 from flask_sqlalchemy import SQLAlchemy
-db = SQLAlchemy() 
\ No newline at end of file
+from cache import Cache
+db = SQLAlchemy()
+cache = Cache()
@@ -2,9 +2,13 @@ from extensions import db
 from datetime import datetime
 
 class Expense(db.Model):
+    __table_args__ = (
+        db.Index('ix_expense_user_category', 'user_id', 'category_id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    category = db.Column(db.String(50), nullable=False)  # office, travel, meals, etc.
+    category_id = db.Column(db.Integer, db.ForeignKey('expense_category.id'), nullable=False)  # A shared or the user's own category
     description = db.Column(db.String(200), nullable=False)
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     expense_date = db.Column(db.Date, nullable=False)
@@ -16,6 +20,12 @@ class Expense(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    category_ref = db.relationship('ExpenseCategory', lazy='joined')
+    
+    @property
+    def category(self):
+        return self.category_ref.name if self.category_ref else None
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -33,9 +43,16 @@ class Expense(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
 
+# Categories with no user_id are shared by every user; names a user adds are
+# private to them
 class ExpenseCategory(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'name', name='uq_expense_category_user_name'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(50), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
+    name = db.Column(db.String(50), nullable=False)
     description = db.Column(db.String(200))
     color = db.Column(db.String(7))  # Hex color code
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -47,4 +64,26 @@ class ExpenseCategory(db.Model):
             'description': self.description,
             'color': self.color,
             'created_at': self.created_at.isoformat()
-        } 
\ No newline at end of file
+        } 
+class ExpenseReceipt(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    expense_id = db.Column(db.Integer, db.ForeignKey('expense.id'), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    sha256 = db.Column(db.String(64), nullable=False, index=True)  # Content address of the stored file
+    filename = db.Column(db.String(255))
+    content_type = db.Column(db.String(50), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'expense_id': self.expense_id,
+            'sha256': self.sha256,
+            'filename': self.filename,
+            'content_type': self.content_type,
+            'size': self.size,
+            'url': f'/api/expenses/{self.expense_id}/receipt',
+            'thumbnail_url': f'/api/expenses/{self.expense_id}/receipt/thumbnail',
+            'created_at': self.created_at.isoformat()
+        }
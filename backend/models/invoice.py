@@ -2,6 +2,11 @@ from extensions import db
 from datetime import datetime
 
 class Invoice(db.Model):
+    __table_args__ = (
+        # Open (sent/overdue) invoices by due date, for AR aging
+        db.Index('ix_invoice_user_status_due_date', 'user_id', 'status', 'due_date'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     invoice_number = db.Column(db.String(50), unique=True, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -65,7 +70,7 @@ class InvoiceItem(db.Model):
 
 class Payment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.id'), nullable=False)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.id'), nullable=False, index=True)
     amount = db.Column(db.Numeric(10, 2), nullable=False)
     payment_date = db.Column(db.Date, nullable=False)
     payment_method = db.Column(db.String(50))  # cash, check, credit_card, bank_transfer
@@ -0,0 +1,37 @@
+from extensions import db
+from datetime import datetime
+import json
+
+class Job(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    job_type = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), default='queued', index=True)  # queued, running, succeeded, failed
+    payload = db.Column(db.Text)  # JSON arguments for the handler
+    result = db.Column(db.Text)  # JSON summary returned by the handler
+    result_data = db.deferred(db.Column(db.LargeBinary))  # Downloadable output, loaded only on download
+    result_filename = db.Column(db.String(255))
+    result_mimetype = db.Column(db.String(100))
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, default=0)
+    worker = db.Column(db.String(100))
+    heartbeat_at = db.Column(db.DateTime)  # Touched by the worker while the job runs
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'result': json.loads(self.result) if self.result else None,
+            'has_download': self.result_filename is not None,
+            'result_filename': self.result_filename,
+            'error': self.error,
+            'attempts': self.attempts,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -0,0 +1,80 @@
+from extensions import db
+from datetime import datetime
+
+class LedgerAccount(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'code', name='uq_ledger_account_code'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    code = db.Column(db.String(10), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    account_type = db.Column(db.String(20), nullable=False)  # asset, liability, equity, revenue, expense
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'code': self.code,
+            'name': self.name,
+            'account_type': self.account_type
+        }
+
+class JournalEntry(db.Model):
+    __table_args__ = (
+        db.Index('ix_journal_entry_source', 'user_id', 'source_type', 'source_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    entry_date = db.Column(db.Date, nullable=False)
+    source_type = db.Column(db.String(20), nullable=False)  # invoice, payment, expense, payroll
+    source_id = db.Column(db.Integer, nullable=False)
+    description = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    lines = db.relationship('JournalLine', backref='entry', lazy=True, cascade='all, delete-orphan')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'entry_date': self.entry_date.isoformat(),
+            'source_type': self.source_type,
+            'source_id': self.source_id,
+            'description': self.description,
+            'created_at': self.created_at.isoformat(),
+            'lines': [line.to_dict() for line in self.lines]
+        }
+
+class JournalLine(db.Model):
+    __table_args__ = (
+        # Balance tail scans read one account's lines after a checkpoint date
+        db.Index('ix_journal_line_account_date', 'account_id', 'entry_date'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.Integer, db.ForeignKey('journal_entry.id'), nullable=False, index=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('ledger_account.id'), nullable=False)
+    entry_date = db.Column(db.Date, nullable=False)  # Copied from the entry for the index above
+    debit = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    credit = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'account_id': self.account_id,
+            'debit': float(self.debit),
+            'credit': float(self.credit)
+        }
+
+class AccountBalanceCheckpoint(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('account_id', 'as_of', name='uq_account_balance_checkpoint'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('ledger_account.id'), nullable=False)
+    as_of = db.Column(db.Date, nullable=False)  # Month end the balance runs through
+    balance = db.Column(db.Numeric(14, 2), nullable=False)  # Debits minus credits
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
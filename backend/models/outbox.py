@@ -0,0 +1,39 @@
+from extensions import db
+from datetime import datetime
+
+# An email waiting to be sent, written in the same commit as the change it
+# reports; `flask outbox-dispatch` delivers pending rows in batches
+class OutboxMessage(db.Model):
+    __table_args__ = (
+        # Pending messages in delivery order, for the dispatcher's claim query
+        db.Index('ix_outbox_message_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.id', ondelete='SET NULL'))  # PDF attached when set
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='pending')  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text)
+    worker = db.Column(db.String(100))
+    claimed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'invoice_id': self.invoice_id,
+            'recipient': self.recipient,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.status == 'pending' else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat(),
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
@@ -0,0 +1,94 @@
+from extensions import db
+from datetime import datetime
+import json
+
+# An invoice or expense that `flask recurring-generate` creates on a schedule
+class RecurringTemplate(db.Model):
+    __table_args__ = (
+        # Due templates across all tenants, for the generator
+        db.Index('ix_recurring_template_active_next_run', 'active', 'next_run_date'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # invoice, expense
+    name = db.Column(db.String(100), nullable=False)
+    
+    # Schedule rule: every ``interval`` weeks/months/quarters/years from start_date
+    frequency = db.Column(db.String(20), nullable=False)  # weekly, monthly, quarterly, yearly
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date)
+    run_count = db.Column(db.Integer, nullable=False, default=0)  # Occurrences generated so far
+    next_run_date = db.Column(db.Date)  # None once the schedule has ended
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    
+    # Invoice templates
+    client_name = db.Column(db.String(100))
+    client_email = db.Column(db.String(120))
+    client_address = db.Column(db.Text)
+    tax_rate = db.Column(db.Numeric(5, 2), default=0.0)
+    due_days = db.Column(db.Integer, default=30)
+    items = db.Column(db.Text)  # JSON list of {description, quantity, unit_price}
+    
+    # Expense templates
+    category_id = db.Column(db.Integer, db.ForeignKey('expense_category.id'))
+    description = db.Column(db.String(200))
+    amount = db.Column(db.Numeric(10, 2))
+    vendor = db.Column(db.String(100))
+    payment_method = db.Column(db.String(50))
+    
+    notes = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    category_ref = db.relationship('ExpenseCategory', lazy='joined')
+    
+    def to_dict(self):
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'name': self.name,
+            'frequency': self.frequency,
+            'interval': self.interval,
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'next_run_date': self.next_run_date.isoformat() if self.next_run_date else None,
+            'run_count': self.run_count,
+            'active': self.active,
+            'notes': self.notes,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
+        if self.kind == 'invoice':
+            data.update({
+                'client_name': self.client_name,
+                'client_email': self.client_email,
+                'client_address': self.client_address,
+                'tax_rate': float(self.tax_rate or 0),
+                'due_days': self.due_days,
+                'items': json.loads(self.items or '[]')
+            })
+        else:
+            data.update({
+                'category': self.category_ref.name if self.category_ref else None,
+                'description': self.description,
+                'amount': float(self.amount) if self.amount is not None else None,
+                'vendor': self.vendor,
+                'payment_method': self.payment_method
+            })
+        return data
+
+# One generated occurrence; the unique (template, period) key is what makes
+# re-running the generator safe
+class RecurringInstance(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('template_id', 'period_date', name='uq_recurring_instance_period'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    template_id = db.Column(db.Integer, db.ForeignKey('recurring_template.id'), nullable=False)
+    period_date = db.Column(db.Date, nullable=False)
+    invoice_id = db.Column(db.Integer, db.ForeignKey('invoice.id', ondelete='SET NULL'))
+    expense_id = db.Column(db.Integer, db.ForeignKey('expense.id', ondelete='SET NULL'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,24 @@
+from extensions import db
+from datetime import datetime
+
+class TaxSummarySnapshot(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'tax_year', 'report_version', name='uq_tax_summary_snapshot'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    tax_year = db.Column(db.Integer, nullable=False)
+    report_version = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON body of the tax summary
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class TaxYearRevision(db.Model):
+    """Counts the backdated writes to one user's tax year.
+    
+    A snapshot is only stored if the revision it was computed at is still
+    current, so a write committed mid-computation cannot be hidden by it.
+    """
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    tax_year = db.Column(db.Integer, primary_key=True)
+    revision = db.Column(db.Integer, nullable=False, default=0)
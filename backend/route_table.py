@@ -0,0 +1,93 @@
+# Generated by `LAZY_BLUEPRINTS=false flask --app app route-table` from the
+# blueprints in blueprints.py; tests/test_startup.py fails when it is stale.
+ROUTES = [
+    ('/api/auth/register', 'auth.register', ('POST',), 'routes.auth:register'),
+    ('/api/auth/login', 'auth.login', ('POST',), 'routes.auth:login'),
+    ('/api/auth/profile', 'auth.get_profile', ('GET',), 'routes.auth:get_profile'),
+    ('/api/auth/profile', 'auth.update_profile', ('PUT',), 'routes.auth:update_profile'),
+    ('/api/auth/change-password', 'auth.change_password', ('POST',), 'routes.auth:change_password'),
+    ('/api/invoices/', 'invoices.get_invoices', ('GET',), 'routes.invoices:get_invoices'),
+    ('/api/invoices', 'invoices.get_invoices', ('GET',), 'routes.invoices:get_invoices'),
+    ('/api/invoices/<int:invoice_id>', 'invoices.get_invoice', ('GET',), 'routes.invoices:get_invoice'),
+    ('/api/invoices/', 'invoices.create_invoice', ('POST',), 'routes.invoices:create_invoice'),
+    ('/api/invoices', 'invoices.create_invoice', ('POST',), 'routes.invoices:create_invoice'),
+    ('/api/invoices/bulk', 'invoices.create_invoices_bulk', ('POST',), 'routes.invoices:create_invoices_bulk'),
+    ('/api/invoices/<int:invoice_id>', 'invoices.update_invoice', ('PUT',), 'routes.invoices:update_invoice'),
+    ('/api/invoices/<int:invoice_id>/items/<int:item_id>', 'invoices.update_invoice_item', ('PATCH',), 'routes.invoices:update_invoice_item'),
+    ('/api/invoices/<int:invoice_id>', 'invoices.delete_invoice', ('DELETE',), 'routes.invoices:delete_invoice'),
+    ('/api/invoices/<int:invoice_id>/payments', 'invoices.add_payment', ('POST',), 'routes.invoices:add_payment'),
+    ('/api/invoices/<int:invoice_id>/send', 'invoices.send_invoice', ('POST',), 'routes.invoices:send_invoice'),
+    ('/api/invoices/<int:invoice_id>/pdf', 'invoices.get_invoice_pdf', ('GET',), 'routes.invoices:get_invoice_pdf'),
+    ('/api/invoices/pdf/batch', 'invoices.render_invoice_pdfs', ('POST',), 'routes.invoices:render_invoice_pdfs'),
+    ('/api/expenses/', 'expenses.get_expenses', ('GET',), 'routes.expenses:get_expenses'),
+    ('/api/expenses', 'expenses.get_expenses', ('GET',), 'routes.expenses:get_expenses'),
+    ('/api/expenses/<int:expense_id>', 'expenses.get_expense', ('GET',), 'routes.expenses:get_expense'),
+    ('/api/expenses/', 'expenses.create_expense', ('POST',), 'routes.expenses:create_expense'),
+    ('/api/expenses', 'expenses.create_expense', ('POST',), 'routes.expenses:create_expense'),
+    ('/api/expenses/<int:expense_id>', 'expenses.update_expense', ('PUT',), 'routes.expenses:update_expense'),
+    ('/api/expenses/<int:expense_id>', 'expenses.delete_expense', ('DELETE',), 'routes.expenses:delete_expense'),
+    ('/api/expenses/<int:expense_id>/receipt', 'expenses.upload_receipt', ('POST',), 'routes.expenses:upload_receipt'),
+    ('/api/expenses/<int:expense_id>/receipt', 'expenses.download_receipt', ('GET',), 'routes.expenses:download_receipt'),
+    ('/api/expenses/<int:expense_id>/receipt/thumbnail', 'expenses.get_receipt_thumbnail', ('GET',), 'routes.expenses:get_receipt_thumbnail'),
+    ('/api/expenses/categories', 'expenses.get_categories', ('GET',), 'routes.expenses:get_categories'),
+    ('/api/expenses/categories', 'expenses.create_category', ('POST',), 'routes.expenses:create_category'),
+    ('/api/expenses/summary', 'expenses.get_expense_summary', ('GET',), 'routes.expenses:get_expense_summary'),
+    ('/api/payroll/employees', 'payroll.get_employees', ('GET',), 'routes.payroll:get_employees'),
+    ('/api/payroll/employees/<int:employee_id>', 'payroll.get_employee', ('GET',), 'routes.payroll:get_employee'),
+    ('/api/payroll/employees', 'payroll.create_employee', ('POST',), 'routes.payroll:create_employee'),
+    ('/api/payroll/employees/<int:employee_id>', 'payroll.update_employee', ('PUT',), 'routes.payroll:update_employee'),
+    ('/api/payroll/employees/<int:employee_id>', 'payroll.delete_employee', ('DELETE',), 'routes.payroll:delete_employee'),
+    ('/api/payroll/records', 'payroll.get_payroll_records', ('GET',), 'routes.payroll:get_payroll_records'),
+    ('/api/payroll/payroll', 'payroll.get_payroll_records', ('GET',), 'routes.payroll:get_payroll_records'),
+    ('/api/payroll/', 'payroll.get_payroll_records', ('GET',), 'routes.payroll:get_payroll_records'),
+    ('/api/payroll', 'payroll.get_payroll_records', ('GET',), 'routes.payroll:get_payroll_records'),
+    ('/api/payroll/payroll/<int:record_id>', 'payroll.get_payroll_record', ('GET',), 'routes.payroll:get_payroll_record'),
+    ('/api/payroll/payroll', 'payroll.create_payroll_record', ('POST',), 'routes.payroll:create_payroll_record'),
+    ('/api/payroll/time-entries', 'payroll.get_time_entries', ('GET',), 'routes.payroll:get_time_entries'),
+    ('/api/payroll/time-entries', 'payroll.create_time_entry', ('POST',), 'routes.payroll:create_time_entry'),
+    ('/api/payroll/time-entries/bulk', 'payroll.create_time_entries_bulk', ('POST',), 'routes.payroll:create_time_entries_bulk'),
+    ('/api/payroll/process', 'payroll.process_payroll', ('POST',), 'routes.payroll:process_payroll'),
+    ('/api/reports/financial', 'reports.get_financial_summary', ('GET',), 'routes.reports:get_financial_summary'),
+    ('/api/reports/financial-summary', 'reports.get_financial_summary', ('GET',), 'routes.reports:get_financial_summary'),
+    ('/api/reports/', 'reports.get_financial_summary', ('GET',), 'routes.reports:get_financial_summary'),
+    ('/api/reports', 'reports.get_financial_summary', ('GET',), 'routes.reports:get_financial_summary'),
+    ('/api/reports/bundle', 'reports.get_reports_bundle', ('GET',), 'routes.reports:get_reports_bundle'),
+    ('/api/reports/revenue', 'reports.get_revenue_report', ('GET',), 'routes.reports:get_revenue_report'),
+    ('/api/reports/expenses', 'reports.get_expenses_report', ('GET',), 'routes.reports:get_expenses_report'),
+    ('/api/reports/payroll', 'reports.get_payroll_report', ('GET',), 'routes.reports:get_payroll_report'),
+    ('/api/reports/tax-summary', 'reports.get_tax_summary', ('GET',), 'routes.reports:get_tax_summary'),
+    ('/api/reports/tax-summary/history', 'reports.get_tax_summary_history', ('GET',), 'routes.reports:get_tax_summary_history'),
+    ('/api/reports/ar-aging', 'reports.get_ar_aging', ('GET',), 'routes.reports:get_ar_aging'),
+    ('/api/reports/invoice-report', 'reports.get_invoice_report', ('GET',), 'routes.reports:get_invoice_report'),
+    ('/api/reports/expense-report', 'reports.get_expense_report', ('GET',), 'routes.reports:get_expense_report'),
+    ('/api/reports/export/csv', 'reports.export_csv', ('GET',), 'routes.reports:export_csv'),
+    ('/api/reports/export/columnar', 'reports.export_columnar', ('GET',), 'routes.reports:export_columnar'),
+    ('/api/reports/export/json', 'reports.export_json', ('GET',), 'routes.reports:export_json'),
+    ('/api/dashboard/overview', 'dashboard.get_dashboard_overview', ('GET',), 'routes.dashboard:get_dashboard_overview'),
+    ('/api/dashboard/bundle', 'dashboard.get_dashboard_bundle', ('GET',), 'routes.dashboard:get_dashboard_bundle'),
+    ('/api/dashboard/charts/revenue', 'dashboard.get_revenue_chart', ('GET',), 'routes.dashboard:get_revenue_chart'),
+    ('/api/dashboard/charts/expenses', 'dashboard.get_expenses_chart', ('GET',), 'routes.dashboard:get_expenses_chart'),
+    ('/api/dashboard/charts/expense-categories', 'dashboard.get_expense_categories_chart', ('GET',), 'routes.dashboard:get_expense_categories_chart'),
+    ('/api/dashboard/charts/invoice-status', 'dashboard.get_invoice_status_chart', ('GET',), 'routes.dashboard:get_invoice_status_chart'),
+    ('/api/dashboard/quick-stats', 'dashboard.get_quick_stats', ('GET',), 'routes.dashboard:get_quick_stats'),
+    ('/api/jobs/', 'jobs.get_jobs', ('GET',), 'routes.jobs:get_jobs'),
+    ('/api/jobs', 'jobs.get_jobs', ('GET',), 'routes.jobs:get_jobs'),
+    ('/api/jobs/<int:job_id>', 'jobs.get_job', ('GET',), 'routes.jobs:get_job'),
+    ('/api/jobs/<int:job_id>/result', 'jobs.get_job_result', ('GET',), 'routes.jobs:get_job_result'),
+    ('/api/admin/analytics', 'admin.get_tenant_analytics', ('GET',), 'routes.admin:get_tenant_analytics'),
+    ('/api/search/', 'search.search_records', ('GET',), 'routes.search:search_records'),
+    ('/api/search', 'search.search_records', ('GET',), 'routes.search:search_records'),
+    ('/api/ledger/accounts', 'ledger.get_accounts', ('GET',), 'routes.ledger:get_accounts'),
+    ('/api/ledger/trial-balance', 'ledger.get_trial_balance', ('GET',), 'routes.ledger:get_trial_balance'),
+    ('/api/ledger/entries', 'ledger.get_journal_entries', ('GET',), 'routes.ledger:get_journal_entries'),
+    ('/api/outbox/', 'outbox.get_outbox', ('GET',), 'routes.outbox:get_outbox'),
+    ('/api/outbox', 'outbox.get_outbox', ('GET',), 'routes.outbox:get_outbox'),
+    ('/api/outbox/<int:message_id>/retry', 'outbox.retry_message', ('POST',), 'routes.outbox:retry_message'),
+    ('/api/recurring/', 'recurring.get_templates', ('GET',), 'routes.recurring:get_templates'),
+    ('/api/recurring', 'recurring.get_templates', ('GET',), 'routes.recurring:get_templates'),
+    ('/api/recurring/<int:template_id>', 'recurring.get_template', ('GET',), 'routes.recurring:get_template'),
+    ('/api/recurring/', 'recurring.create_template', ('POST',), 'routes.recurring:create_template'),
+    ('/api/recurring', 'recurring.create_template', ('POST',), 'routes.recurring:create_template'),
+    ('/api/recurring/<int:template_id>', 'recurring.update_template', ('PUT',), 'routes.recurring:update_template'),
+    ('/api/recurring/<int:template_id>', 'recurring.delete_template', ('DELETE',), 'routes.recurring:delete_template'),
+]
@@ -0,0 +1,83 @@
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from extensions import db
+from models.user import User
+from services.tenant_analytics import collect_tenant_stats
+from datetime import datetime, date, timedelta
+from functools import wraps
+import json
+
+admin_bp = Blueprint('admin', __name__)
+
+def admin_required(fn):
+    @wraps(fn)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        user = db.session.get(User, int(get_jwt_identity()))
+        if not user or user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+@admin_bp.route('/analytics', methods=['GET'])
+@admin_required
+def get_tenant_analytics():
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    if not start_date:
+        start_date = (date.today() - timedelta(days=365)).isoformat()
+    if not end_date:
+        end_date = date.today().isoformat()
+    
+    try:
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Dates must use the YYYY-MM-DD format'}), 400
+    
+    if start_dt > end_dt:
+        return jsonify({'error': 'start_date must not be after end_date'}), 400
+    
+    stats = collect_tenant_stats(
+        current_app._get_current_object(),
+        start_dt,
+        end_dt,
+        workers=current_app.config['ANALYTICS_WORKERS'],
+        partition_days=current_app.config['ANALYTICS_PARTITION_DAYS']
+    )
+    
+    tenants = db.session.query(User.id, User.username, User.company_name).order_by(User.id).all()
+    
+    def generate():
+        # One JSON object per line: a record per tenant, then the totals
+        totals = {'tenants': 0, 'revenue': 0.0, 'expenses': 0.0, 'payroll': 0.0, 'invoice_status': {}}
+        for user_id, username, company_name in tenants:
+            tenant = stats.get(user_id)
+            record = {
+                'user_id': user_id,
+                'username': username,
+                'company_name': company_name,
+                'revenue': round(tenant['revenue'], 2) if tenant else 0.0,
+                'expenses': round(tenant['expenses'], 2) if tenant else 0.0,
+                'payroll': round(tenant['payroll'], 2) if tenant else 0.0,
+                'invoice_status': dict(tenant['invoice_status']) if tenant else {}
+            }
+            record['profit'] = round(record['revenue'] - record['expenses'] - record['payroll'], 2)
+            
+            totals['tenants'] += 1
+            totals['revenue'] += record['revenue']
+            totals['expenses'] += record['expenses']
+            totals['payroll'] += record['payroll']
+            for status, count in record['invoice_status'].items():
+                totals['invoice_status'][status] = totals['invoice_status'].get(status, 0) + count
+            
+            yield json.dumps({'type': 'tenant', **record}) + '\n'
+        
+        yield json.dumps({
+            'type': 'totals',
+            'period': {'start_date': start_date, 'end_date': end_date},
+            **{key: round(value, 2) if isinstance(value, float) else value for key, value in totals.items()}
+        }) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
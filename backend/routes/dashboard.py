@@ -2,10 +2,12 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 from extensions import db
 from models.invoice import Invoice, Payment
-from models.expense import Expense
-from models.payroll import PayrollRecord, Employee
+from models.expense import Expense, ExpenseCategory
+from models.payroll import Employee
 from datetime import datetime, date, timedelta
 from sqlalchemy import func, and_
+from services.aggregates import LedgerAggregates, dashboard_overview, dashboard_window, monthly_chart
+from services.report_cache import cached_report
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -16,94 +18,33 @@ def get_dashboard_overview():
         user_id = int(get_jwt_identity())
         print(f"Dashboard overview called for user_id: {user_id}")
         
-        # Current month
         today = date.today()
-        month_start = today.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        aggregates = LedgerAggregates(user_id, *dashboard_window(1, today))
         
-        # Last month
-        last_month_start = (month_start - timedelta(days=1)).replace(day=1)
-        last_month_end = month_start - timedelta(days=1)
-        
-        # Current month metrics
-        current_month_revenue = db.session.query(func.sum(Invoice.total_amount)).filter(
-            and_(
-                Invoice.user_id == user_id,
-                Invoice.status == 'paid',
-                Invoice.issue_date >= month_start,
-                Invoice.issue_date <= month_end
-            )
-        ).scalar() or 0
-        
-        current_month_expenses = db.session.query(func.sum(Expense.amount)).filter(
-            and_(
-                Expense.user_id == user_id,
-                Expense.expense_date >= month_start,
-                Expense.expense_date <= month_end
-            )
-        ).scalar() or 0
-        
-        current_month_payroll = db.session.query(func.sum(PayrollRecord.gross_pay)).join(Employee).filter(
-            and_(
-                Employee.user_id == user_id,
-                PayrollRecord.pay_date >= month_start,
-                PayrollRecord.pay_date <= month_end
-            )
-        ).scalar() or 0
-        
-        # Last month metrics for comparison
-        last_month_revenue = db.session.query(func.sum(Invoice.total_amount)).filter(
-            and_(
-                Invoice.user_id == user_id,
-                Invoice.status == 'paid',
-                Invoice.issue_date >= last_month_start,
-                Invoice.issue_date <= last_month_end
-            )
-        ).scalar() or 0
-        
-        last_month_expenses = db.session.query(func.sum(Expense.amount)).filter(
-            and_(
-                Expense.user_id == user_id,
-                Expense.expense_date >= last_month_start,
-                Expense.expense_date <= last_month_end
-            )
-        ).scalar() or 0
-        
-        # Calculate growth percentages
-        revenue_growth = ((float(current_month_revenue) - float(last_month_revenue)) / float(last_month_revenue) * 100) if last_month_revenue > 0 else 0
-        expense_growth = ((float(current_month_expenses) - float(last_month_expenses)) / float(last_month_expenses) * 100) if last_month_expenses > 0 else 0
-        
-        # Outstanding invoices
-        outstanding_invoices = db.session.query(func.sum(Invoice.total_amount)).filter(
-            and_(
-                Invoice.user_id == user_id,
-                Invoice.status.in_(['sent', 'overdue'])
-            )
-        ).scalar() or 0
-        
-        # Recent activity
-        recent_invoices = Invoice.query.filter_by(user_id=user_id).order_by(Invoice.created_at.desc()).limit(5).all()
-        recent_expenses = Expense.query.filter_by(user_id=user_id).order_by(Expense.created_at.desc()).limit(5).all()
+        return jsonify(dashboard_overview(aggregates, today)), 200
+    except Exception as e:
+        print(f"Error in dashboard overview: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@dashboard_bp.route('/bundle', methods=['GET'])
+@jwt_required()
+def get_dashboard_bundle():
+    """Everything the Dashboard page shows, from one set of ledger queries."""
+    try:
+        user_id = int(get_jwt_identity())
+        months = request.args.get('months', 12, type=int)
         
-        return jsonify({
-            'current_month': {
-                'revenue': float(current_month_revenue),
-                'expenses': float(current_month_expenses),
-                'payroll': float(current_month_payroll),
-                'profit': float(current_month_revenue) - float(current_month_expenses) - float(current_month_payroll)
-            },
-            'growth': {
-                'revenue_growth': revenue_growth,
-                'expense_growth': expense_growth
-            },
-            'outstanding_invoices': float(outstanding_invoices),
-            'recent_activity': {
-                'invoices': [invoice.to_dict() for invoice in recent_invoices],
-                'expenses': [expense.to_dict() for expense in recent_expenses]
+        def build():
+            today = date.today()
+            aggregates = LedgerAggregates(user_id, *dashboard_window(months, today))
+            return {
+                'overview': dashboard_overview(aggregates, today),
+                'revenue_chart': monthly_chart(aggregates, months, today, 'revenue')
             }
-        }), 200
+        
+        return jsonify(cached_report(user_id, 'dashboard-bundle', {'months': months}, build)), 200
     except Exception as e:
-        print(f"Error in dashboard overview: {e}")
+        print(f"Error in dashboard bundle: {e}")
         return jsonify({'error': str(e)}), 500
 
 @dashboard_bp.route('/charts/revenue', methods=['GET'])
@@ -112,30 +53,10 @@ def get_revenue_chart():
     user_id = int(get_jwt_identity())
     months = request.args.get('months', 12, type=int)
     
-    # Generate data for the last N months
-    chart_data = []
-    for i in range(months):
-        month_start = date.today().replace(day=1) - timedelta(days=30*i)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        revenue = db.session.query(func.sum(Invoice.total_amount)).filter(
-            and_(
-                Invoice.user_id == user_id,
-                Invoice.status == 'paid',
-                Invoice.issue_date >= month_start,
-                Invoice.issue_date <= month_end
-            )
-        ).scalar() or 0
-        
-        chart_data.append({
-            'month': month_start.strftime('%Y-%m'),
-            'revenue': float(revenue)
-        })
-    
-    # Reverse to show oldest first
-    chart_data.reverse()
+    today = date.today()
+    aggregates = LedgerAggregates(user_id, *dashboard_window(months, today))
     
-    return jsonify({'data': chart_data}), 200
+    return jsonify(monthly_chart(aggregates, months, today, 'revenue')), 200
 
 @dashboard_bp.route('/charts/expenses', methods=['GET'])
 @jwt_required()
@@ -143,29 +64,10 @@ def get_expenses_chart():
     user_id = int(get_jwt_identity())
     months = request.args.get('months', 12, type=int)
     
-    # Generate data for the last N months
-    chart_data = []
-    for i in range(months):
-        month_start = date.today().replace(day=1) - timedelta(days=30*i)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        expenses = db.session.query(func.sum(Expense.amount)).filter(
-            and_(
-                Expense.user_id == user_id,
-                Expense.expense_date >= month_start,
-                Expense.expense_date <= month_end
-            )
-        ).scalar() or 0
-        
-        chart_data.append({
-            'month': month_start.strftime('%Y-%m'),
-            'expenses': float(expenses)
-        })
-    
-    # Reverse to show oldest first
-    chart_data.reverse()
+    today = date.today()
+    aggregates = LedgerAggregates(user_id, *dashboard_window(months, today))
     
-    return jsonify({'data': chart_data}), 200
+    return jsonify(monthly_chart(aggregates, months, today, 'expenses')), 200
 
 @dashboard_bp.route('/charts/expense-categories', methods=['GET'])
 @jwt_required()
@@ -184,15 +86,15 @@ def get_expense_categories_chart():
     
     # Get expenses by category
     category_data = db.session.query(
-        Expense.category,
+        ExpenseCategory.name,
         func.sum(Expense.amount).label('total')
-    ).filter(
+    ).select_from(Expense).join(ExpenseCategory).filter(
         and_(
             Expense.user_id == user_id,
             Expense.expense_date >= start_dt,
             Expense.expense_date <= end_dt
         )
-    ).group_by(Expense.category).all()
+    ).group_by(ExpenseCategory.id).all()
     
     chart_data = [
         {'category': category, 'amount': float(total)}
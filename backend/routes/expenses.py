@@ -1,9 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
-from models.expense import Expense, ExpenseCategory
+from models.expense import Expense, ExpenseCategory, ExpenseReceipt
+from services.categories import (
+    cached_categories, category_id_subquery, category_ids, invalidate_added_categories, invalidate_categories,
+    resolve_category_id
+)
+from services.general_ledger import expense_posting, sync_postings
+from services.receipts import attach_receipt, blob_path, read_upload, receipt_thumbnail, sniff_content_type, thumbnails_available
+from services.report_cache import invalidate_reports
+from services.tax_snapshots import invalidate_tax_snapshots
 from datetime import datetime, date, timedelta
 from sqlalchemy import func
+from werkzeug.exceptions import RequestEntityTooLarge
 
 expense_bp = Blueprint('expenses', __name__)
 
@@ -21,7 +30,7 @@ def get_expenses():
     query = Expense.query.filter_by(user_id=user_id)
     
     if category:
-        query = query.filter_by(category=category)
+        query = query.filter(Expense.category_id == category_id_subquery(user_id, category))
     
     if start_date:
         query = query.filter(Expense.expense_date >= datetime.strptime(start_date, '%Y-%m-%d').date())
@@ -66,7 +75,7 @@ def create_expense():
     
     expense = Expense(
         user_id=user_id,
-        category=data['category'],
+        category_id=resolve_category_id(user_id, data['category']),
         description=data['description'],
         amount=data['amount'],
         expense_date=datetime.strptime(data['expense_date'], '%Y-%m-%d').date(),
@@ -79,7 +88,12 @@ def create_expense():
     
     try:
         db.session.add(expense)
+        db.session.flush()  # Get expense ID
+        invalidate_tax_snapshots(expense.user_id, expense.expense_date)
+        sync_postings(expense.user_id, [expense_posting(expense)])
         db.session.commit()
+        invalidate_reports(user_id)
+        invalidate_added_categories()
         
         return jsonify({
             'message': 'Expense created successfully',
@@ -100,10 +114,11 @@ def update_expense(expense_id):
         return jsonify({'error': 'Expense not found'}), 404
     
     data = request.get_json()
+    previous_expense_date = expense.expense_date
     
     # Update expense fields
     if data.get('category'):
-        expense.category = data['category']
+        expense.category_id = resolve_category_id(user_id, data['category'])
     if data.get('description'):
         expense.description = data['description']
     if data.get('amount'):
@@ -122,9 +137,13 @@ def update_expense(expense_id):
         expense.notes = data['notes']
     
     expense.updated_at = datetime.utcnow()
+    invalidate_tax_snapshots(expense.user_id, previous_expense_date, expense.expense_date)
     
     try:
+        sync_postings(expense.user_id, [expense_posting(expense)])
         db.session.commit()
+        invalidate_reports(user_id)
+        invalidate_added_categories()
         return jsonify({
             'message': 'Expense updated successfully',
             'expense': expense.to_dict()
@@ -144,33 +163,136 @@ def delete_expense(expense_id):
         return jsonify({'error': 'Expense not found'}), 404
     
     try:
+        invalidate_tax_snapshots(expense.user_id, expense.expense_date)
+        sync_postings(expense.user_id, [expense_posting(expense, deleted=True)])
+        ExpenseReceipt.query.filter_by(expense_id=expense.id).delete()  # The stored file may be shared; see receipts-gc
         db.session.delete(expense)
         db.session.commit()
+        invalidate_reports(user_id)
         return jsonify({'message': 'Expense deleted successfully'}), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Expense deletion failed'}), 500
 
+@expense_bp.route('/<int:expense_id>/receipt', methods=['POST'])
+@jwt_required()
+def upload_receipt(expense_id):
+    """Attach a receipt sent as the ``receipt`` field of a multipart body.
+    
+    The file is streamed to disk as it arrives and stored by content hash,
+    so uploading the same file twice stores it once.
+    """
+    user_id = get_jwt_identity()
+    expense = Expense.query.filter_by(id=expense_id, user_id=user_id).first()
+    
+    if not expense:
+        return jsonify({'error': 'Expense not found'}), 404
+    if not request.mimetype.startswith('multipart/form-data'):
+        return jsonify({'error': 'Send the receipt as multipart/form-data'}), 400
+    if (request.content_length or 0) > current_app.config['RECEIPT_MAX_BYTES']:
+        return jsonify({'error': f"Receipts are limited to {current_app.config['RECEIPT_MAX_BYTES']} bytes"}), 413
+    
+    try:
+        writer, filename = read_upload(request.environ)
+    except RequestEntityTooLarge as e:
+        return jsonify({'error': e.description}), 413
+    except ValueError:
+        return jsonify({'error': 'Malformed multipart body'}), 400
+    
+    if writer is None:
+        return jsonify({'error': 'receipt file is required'}), 400
+    content_type = sniff_content_type(writer.head)
+    if content_type is None:
+        writer.discard()
+        return jsonify({'error': 'Receipts must be PDF, JPEG, PNG, GIF or WebP files'}), 415
+    
+    try:
+        receipt = attach_receipt(expense, writer, filename, content_type)
+        db.session.commit()
+        invalidate_reports(user_id)  # Cached dashboards list the expense's receipt_url
+        return jsonify({
+            'message': 'Receipt uploaded successfully',
+            'receipt': receipt.to_dict(),
+            'expense': expense.to_dict()
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Receipt upload failed'}), 500
+
+def _owned_receipt(user_id, expense_id):
+    return ExpenseReceipt.query.filter_by(expense_id=expense_id, user_id=int(user_id)).first()
+
+@expense_bp.route('/<int:expense_id>/receipt', methods=['GET'])
+@jwt_required()
+def download_receipt(expense_id):
+    """Serve the receipt; supports Range and conditional requests."""
+    receipt = _owned_receipt(get_jwt_identity(), expense_id)
+    
+    if not receipt:
+        return jsonify({'error': 'Receipt not found'}), 404
+    
+    response = send_file(
+        blob_path(receipt.sha256),
+        mimetype=receipt.content_type,
+        download_name=receipt.filename or f'receipt-{expense_id}',
+        conditional=True,
+        etag=receipt.sha256,
+        max_age=current_app.config['RECEIPT_CACHE_MAX_AGE']
+    )
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    response.cache_control.private = True
+    return response
+
+@expense_bp.route('/<int:expense_id>/receipt/thumbnail', methods=['GET'])
+@jwt_required()
+def get_receipt_thumbnail(expense_id):
+    """A small JPEG of an image receipt for the expense list, rendered once per file."""
+    receipt = _owned_receipt(get_jwt_identity(), expense_id)
+    
+    if not receipt:
+        return jsonify({'error': 'Receipt not found'}), 404
+    if not receipt.content_type.startswith('image/'):
+        return jsonify({'error': 'Only image receipts have thumbnails'}), 404
+    if not thumbnails_available():
+        return jsonify({'error': 'Receipt thumbnails require Pillow to be installed'}), 501
+    
+    thumbnail = receipt_thumbnail(receipt)
+    if thumbnail is None:
+        return jsonify({'error': 'Receipt image could not be read'}), 415
+    
+    response = send_file(
+        thumbnail,
+        mimetype='image/jpeg',
+        conditional=True,
+        etag=f"{receipt.sha256}-{current_app.config['RECEIPT_THUMBNAIL_SIZE']}",
+        max_age=current_app.config['RECEIPT_CACHE_MAX_AGE']
+    )
+    response.cache_control.private = True
+    return response
+
 @expense_bp.route('/categories', methods=['GET'])
 @jwt_required()
 def get_categories():
-    categories = ExpenseCategory.query.all()
-    return jsonify({'categories': [category.to_dict() for category in categories]}), 200
+    user_id = get_jwt_identity()
+    return jsonify({'categories': cached_categories(user_id)}), 200
 
 @expense_bp.route('/categories', methods=['POST'])
 @jwt_required()
 def create_category():
+    user_id = get_jwt_identity()
     data = request.get_json()
     
     if not data.get('name'):
         return jsonify({'error': 'Category name is required'}), 400
     
-    # Check if category already exists
-    if ExpenseCategory.query.filter_by(name=data['name']).first():
+    # Check if the user already has the category, or it is shared
+    if data['name'] in category_ids(user_id):
         return jsonify({'error': 'Category already exists'}), 400
     
     category = ExpenseCategory(
+        user_id=user_id,
         name=data['name'],
         description=data.get('description'),
         color=data.get('color', '#000000')
@@ -179,6 +301,7 @@ def create_category():
     try:
         db.session.add(category)
         db.session.commit()
+        invalidate_categories()
         
         return jsonify({
             'message': 'Category created successfully',
@@ -209,11 +332,13 @@ def get_expense_summary():
     # Total expenses
     total_expenses = query.with_entities(func.sum(Expense.amount)).scalar() or 0
     
-    # Expenses by category
+    # Expenses by category, grouped on the integer id and labelled by name
     category_summary = db.session.query(
-        Expense.category,
+        ExpenseCategory.name,
         func.sum(Expense.amount).label('total')
-    ).filter_by(user_id=user_id).group_by(Expense.category).all()
+    ).select_from(Expense).join(ExpenseCategory).filter(
+        Expense.user_id == user_id
+    ).group_by(ExpenseCategory.id).all()
     
     # Monthly expenses (last 12 months)
     monthly_expenses = []
@@ -1,10 +1,21 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
 from models.invoice import Invoice, InvoiceItem, Payment
 from models.user import User
+from services.batching import chunked
+from services.general_ledger import invoice_posting, payment_posting, sync_postings
+from services.invoicing import CENTS, calculate_totals, generate_invoice_number, line_total, to_decimal
+from services.invoice_documents import discard_invoice_pdfs, invoice_pdf
+from services.jobs import enqueue_job
+from services.outbox import queue_invoice_email
+from services.report_cache import invalidate_reports
+from services.tax_snapshots import invalidate_tax_snapshots
 from datetime import datetime, date
-import uuid
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import func, insert
+from sqlalchemy.orm import selectinload
+from types import SimpleNamespace
 
 invoice_bp = Blueprint('invoices', __name__)
 
@@ -22,7 +33,11 @@ def get_invoices():
     if status:
         query = query.filter_by(status=status)
     
-    invoices = query.order_by(Invoice.created_at.desc()).paginate(
+    # to_dict includes items and payments; load them for the whole page at once
+    invoices = query.options(
+        selectinload(Invoice.items),
+        selectinload(Invoice.payments)
+    ).order_by(Invoice.created_at.desc()).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
@@ -58,13 +73,11 @@ def create_invoice():
             return jsonify({'error': f'{field} is required'}), 400
     
     # Generate invoice number
-    invoice_number = f"INV-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
+    invoice_number = generate_invoice_number()
     
     # Calculate totals
-    subtotal = sum(item['quantity'] * item['unit_price'] for item in data['items'])
     tax_rate = data.get('tax_rate', 0.0)
-    tax_amount = subtotal * (tax_rate / 100)
-    total_amount = subtotal + tax_amount
+    line_totals, subtotal, tax_amount, total_amount = calculate_totals(data['items'], tax_rate)
     
     # Create invoice
     invoice = Invoice(
@@ -88,17 +101,20 @@ def create_invoice():
         db.session.flush()  # Get invoice ID
         
         # Create invoice items
-        for item_data in data['items']:
+        for item_data, item_total in zip(data['items'], line_totals):
             item = InvoiceItem(
                 invoice_id=invoice.id,
                 description=item_data['description'],
                 quantity=item_data['quantity'],
                 unit_price=item_data['unit_price'],
-                total=item_data['quantity'] * item_data['unit_price']
+                total=item_total
             )
             db.session.add(item)
         
+        invalidate_tax_snapshots(invoice.user_id, invoice.issue_date)
+        sync_postings(invoice.user_id, [invoice_posting(invoice)])
         db.session.commit()
+        invalidate_reports(user_id)
         
         return jsonify({
             'message': 'Invoice created successfully',
@@ -109,6 +125,222 @@ def create_invoice():
         db.session.rollback()
         return jsonify({'error': 'Invoice creation failed'}), 500
 
+def _prepare_bulk_invoice(user_id, data, invoice_number):
+    """Validate one entry of a bulk request and build its insert rows.
+
+    Returns (invoice_row, item_rows) or raises ValueError with a message
+    suitable for the per-invoice result.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Invoice must be an object')
+    
+    for field in ['client_name', 'issue_date', 'due_date', 'items']:
+        if not data.get(field):
+            raise ValueError(f'{field} is required')
+    
+    try:
+        issue_date = datetime.strptime(data['issue_date'], '%Y-%m-%d').date()
+        due_date = datetime.strptime(data['due_date'], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError('Dates must use the YYYY-MM-DD format')
+    
+    try:
+        tax_rate = data.get('tax_rate', 0.0)
+        line_totals, subtotal, tax_amount, total_amount = calculate_totals(data['items'], tax_rate)
+        item_rows = [
+            {
+                'description': item_data['description'],
+                'quantity': to_decimal(item_data['quantity']),
+                'unit_price': to_decimal(item_data['unit_price']),
+                'total': item_total
+            }
+            for item_data, item_total in zip(data['items'], line_totals)
+        ]
+    except (KeyError, TypeError, InvalidOperation):
+        raise ValueError('Each item requires description, quantity and unit_price')
+    
+    invoice_row = {
+        'invoice_number': invoice_number,
+        'user_id': user_id,
+        'client_name': data['client_name'],
+        'client_email': data.get('client_email'),
+        'client_address': data.get('client_address'),
+        'issue_date': issue_date,
+        'due_date': due_date,
+        'subtotal': subtotal,
+        'tax_rate': to_decimal(tax_rate),
+        'tax_amount': tax_amount,
+        'total_amount': total_amount,
+        'status': data.get('status', 'draft'),
+        'notes': data.get('notes')
+    }
+    return invoice_row, item_rows
+
+def _insert_invoice_chunk(prepared):
+    """Insert a chunk of prepared invoices and their items in one transaction.
+
+    Returns the new invoice ids in the same order as ``prepared``.
+    """
+    invoice_ids = db.session.execute(
+        insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True),
+        [invoice_row for _, invoice_row, _ in prepared]
+    ).scalars().all()
+    
+    item_rows = []
+    for invoice_id, (_, _, items) in zip(invoice_ids, prepared):
+        for item_row in items:
+            item_rows.append(dict(item_row, invoice_id=invoice_id))
+    
+    if item_rows:
+        db.session.execute(insert(InvoiceItem), item_rows)
+    
+    invalidate_tax_snapshots(prepared[0][1]['user_id'], *{invoice_row['issue_date'] for _, invoice_row, _ in prepared})
+    # New invoices have nothing to reverse, so only the ones that post are synced
+    postings = [
+        invoice_posting(SimpleNamespace(id=invoice_id, **invoice_row))
+        for invoice_id, (_, invoice_row, _) in zip(invoice_ids, prepared)
+    ]
+    sync_postings(prepared[0][1]['user_id'], [posting for posting in postings if posting.lines])
+    db.session.commit()
+    invalidate_reports(prepared[0][1]['user_id'])
+    return invoice_ids
+
+@invoice_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def create_invoices_bulk():
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+    
+    invoices_data = data.get('invoices') if isinstance(data, dict) else None
+    if not invoices_data or not isinstance(invoices_data, list):
+        return jsonify({'error': 'invoices must be a non-empty list'}), 400
+    
+    max_invoices = current_app.config['BULK_MAX_INVOICES']
+    if len(invoices_data) > max_invoices:
+        return jsonify({'error': f'At most {max_invoices} invoices can be created per request'}), 400
+    
+    # Validate and compute totals for the whole batch in one pass
+    results = [None] * len(invoices_data)
+    prepared = []
+    used_numbers = set()
+    for index, invoice_data in enumerate(invoices_data):
+        invoice_number = generate_invoice_number()
+        while invoice_number in used_numbers:
+            invoice_number = generate_invoice_number()
+        used_numbers.add(invoice_number)
+        
+        try:
+            invoice_row, item_rows = _prepare_bulk_invoice(user_id, invoice_data, invoice_number)
+        except ValueError as e:
+            results[index] = {'index': index, 'status': 'error', 'error': str(e)}
+            continue
+        prepared.append((index, invoice_row, item_rows))
+    
+    # Insert valid invoices in chunked transactions
+    for chunk in chunked(prepared, current_app.config['BULK_INSERT_CHUNK_SIZE']):
+        try:
+            invoice_ids = _insert_invoice_chunk(chunk)
+        except Exception as e:
+            db.session.rollback()
+            for index, _, _ in chunk:
+                results[index] = {'index': index, 'status': 'error', 'error': 'Invoice creation failed'}
+            continue
+        
+        for invoice_id, (index, invoice_row, _) in zip(invoice_ids, chunk):
+            results[index] = {
+                'index': index,
+                'status': 'created',
+                'id': invoice_id,
+                'invoice_number': invoice_row['invoice_number'],
+                'total_amount': float(invoice_row['total_amount'])
+            }
+    
+    created = sum(1 for result in results if result['status'] == 'created')
+    failed = len(results) - created
+    
+    if created == 0:
+        status_code = 400
+    elif failed:
+        status_code = 207
+    else:
+        status_code = 201
+    
+    return jsonify({
+        'message': f'Created {created} of {len(results)} invoices',
+        'created': created,
+        'failed': failed,
+        'results': results
+    }), status_code
+
+def _apply_subtotal_delta(invoice, delta):
+    """Shift an invoice's subtotal by ``delta`` and recompute tax and total."""
+    invoice.subtotal = to_decimal(invoice.subtotal) + delta
+    invoice.tax_amount = (invoice.subtotal * to_decimal(invoice.tax_rate) / 100).quantize(CENTS)
+    invoice.total_amount = invoice.subtotal + invoice.tax_amount
+
+def _apply_item_changes(item, item_data):
+    """Copy changed fields from ``item_data`` onto ``item``.
+
+    Returns the change in the item's line total.
+    """
+    old_total = to_decimal(item.total)
+    
+    if 'description' in item_data and item_data['description'] != item.description:
+        item.description = item_data['description']
+    
+    quantity = to_decimal(item_data.get('quantity', item.quantity))
+    unit_price = to_decimal(item_data.get('unit_price', item.unit_price))
+    if quantity != item.quantity:
+        item.quantity = quantity
+    if unit_price != item.unit_price:
+        item.unit_price = unit_price
+    
+    new_total = line_total(quantity, unit_price)
+    if new_total != old_total:
+        item.total = new_total
+    return new_total - old_total
+
+def _sync_invoice_items(invoice, items_data):
+    """Apply a full item list to an invoice, writing only the rows that changed.
+
+    Items with an ``id`` update that line, items without one are inserted
+    and existing lines missing from the list are deleted. Totals are
+    adjusted by the difference instead of being summed from scratch.
+    """
+    existing = {item.id: item for item in invoice.items}
+    kept_ids = set()
+    delta = Decimal('0')
+    
+    try:
+        for item_data in items_data:
+            item_id = item_data.get('id')
+            if item_id is None:
+                new_total = line_total(item_data['quantity'], item_data['unit_price'])
+                invoice.items.append(InvoiceItem(
+                    description=item_data['description'],
+                    quantity=item_data['quantity'],
+                    unit_price=item_data['unit_price'],
+                    total=new_total
+                ))
+                delta += new_total
+                continue
+            
+            item = existing.get(item_id)
+            if item is None:
+                raise ValueError(f'Invoice item {item_id} not found')
+            kept_ids.add(item_id)
+            delta += _apply_item_changes(item, item_data)
+    except (KeyError, TypeError, InvalidOperation):
+        raise ValueError('Each item requires description, quantity and unit_price')
+    
+    for item_id, item in existing.items():
+        if item_id not in kept_ids:
+            invoice.items.remove(item)
+            delta -= to_decimal(item.total)
+    
+    if delta:
+        _apply_subtotal_delta(invoice, delta)
+
 @invoice_bp.route('/<int:invoice_id>', methods=['PUT'])
 @jwt_required()
 def update_invoice(invoice_id):
@@ -119,6 +351,7 @@ def update_invoice(invoice_id):
         return jsonify({'error': 'Invoice not found'}), 404
     
     data = request.get_json()
+    previous_issue_date = invoice.issue_date
     
     # Update invoice fields
     if data.get('client_name'):
@@ -138,31 +371,19 @@ def update_invoice(invoice_id):
     
     # Update items if provided
     if data.get('items'):
-        # Delete existing items
-        InvoiceItem.query.filter_by(invoice_id=invoice.id).delete()
-        
-        # Add new items
-        subtotal = 0
-        for item_data in data['items']:
-            item = InvoiceItem(
-                invoice_id=invoice.id,
-                description=item_data['description'],
-                quantity=item_data['quantity'],
-                unit_price=item_data['unit_price'],
-                total=item_data['quantity'] * item_data['unit_price']
-            )
-            db.session.add(item)
-            subtotal += item.total
-        
-        # Recalculate totals
-        invoice.subtotal = subtotal
-        invoice.tax_amount = subtotal * (invoice.tax_rate / 100)
-        invoice.total_amount = invoice.subtotal + invoice.tax_amount
+        try:
+            _sync_invoice_items(invoice, data['items'])
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
     
     invoice.updated_at = datetime.utcnow()
+    invalidate_tax_snapshots(invoice.user_id, previous_issue_date, invoice.issue_date)
+    sync_postings(invoice.user_id, [invoice_posting(invoice)])
     
     try:
         db.session.commit()
+        invalidate_reports(user_id)
         return jsonify({
             'message': 'Invoice updated successfully',
             'invoice': invoice.to_dict()
@@ -172,6 +393,52 @@ def update_invoice(invoice_id):
         db.session.rollback()
         return jsonify({'error': 'Invoice update failed'}), 500
 
+@invoice_bp.route('/<int:invoice_id>/items/<int:item_id>', methods=['PATCH'])
+@jwt_required()
+def update_invoice_item(invoice_id, item_id):
+    user_id = get_jwt_identity()
+    item = InvoiceItem.query.join(Invoice).filter(
+        InvoiceItem.id == item_id,
+        InvoiceItem.invoice_id == invoice_id,
+        Invoice.user_id == user_id
+    ).first()
+    
+    if not item:
+        return jsonify({'error': 'Invoice item not found'}), 404
+    
+    data = request.get_json()
+    
+    try:
+        delta = _apply_item_changes(item, data)
+    except (TypeError, InvalidOperation):
+        db.session.rollback()
+        return jsonify({'error': 'Invalid quantity or unit price'}), 400
+    
+    invoice = item.invoice
+    if delta:
+        _apply_subtotal_delta(invoice, delta)
+        invalidate_tax_snapshots(invoice.user_id, invoice.issue_date)
+        sync_postings(invoice.user_id, [invoice_posting(invoice)])
+    invoice.updated_at = datetime.utcnow()
+    
+    try:
+        db.session.commit()
+        invalidate_reports(user_id)
+        return jsonify({
+            'message': 'Invoice item updated successfully',
+            'item': item.to_dict(),
+            'invoice': {
+                'id': invoice.id,
+                'subtotal': float(invoice.subtotal),
+                'tax_amount': float(invoice.tax_amount),
+                'total_amount': float(invoice.total_amount)
+            }
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Invoice item update failed'}), 500
+
 @invoice_bp.route('/<int:invoice_id>', methods=['DELETE'])
 @jwt_required()
 def delete_invoice(invoice_id):
@@ -182,8 +449,12 @@ def delete_invoice(invoice_id):
         return jsonify({'error': 'Invoice not found'}), 404
     
     try:
+        invalidate_tax_snapshots(invoice.user_id, invoice.issue_date)
+        sync_postings(invoice.user_id, [invoice_posting(invoice, deleted=True)])
         db.session.delete(invoice)
         db.session.commit()
+        invalidate_reports(user_id)
+        discard_invoice_pdfs(invoice)
         return jsonify({'message': 'Invoice deleted successfully'}), 200
         
     except Exception as e:
@@ -215,13 +486,20 @@ def add_payment(invoice_id):
     
     try:
         db.session.add(payment)
+        invoice.updated_at = datetime.utcnow()  # The invoice PDF lists payments
         
         # Update invoice status if fully paid
-        total_paid = sum(p.amount for p in invoice.payments) + float(data['amount'])
-        if total_paid >= float(invoice.total_amount):
+        total_paid = db.session.query(func.sum(Payment.amount)).filter(
+            Payment.invoice_id == invoice.id
+        ).scalar() or 0
+        if float(total_paid) >= float(invoice.total_amount):
             invoice.status = 'paid'
+            invalidate_tax_snapshots(invoice.user_id, invoice.issue_date)
         
+        # A draft paid in full goes on the books along with its payment
+        sync_postings(invoice.user_id, [payment_posting(payment), invoice_posting(invoice)])
         db.session.commit()
+        invalidate_reports(user_id)
         
         return jsonify({
             'message': 'Payment added successfully',
@@ -248,7 +526,12 @@ def send_invoice(invoice_id):
     invoice.updated_at = datetime.utcnow()
     
     try:
+        sync_postings(invoice.user_id, [invoice_posting(invoice)])
+        # Delivered later by the outbox dispatcher, so the mail server's speed
+        # never reaches this request; the email commits with the status change
+        queue_invoice_email(invoice)
         db.session.commit()
+        invalidate_reports(user_id)
         return jsonify({
             'message': 'Invoice sent successfully',
             'invoice': invoice.to_dict()
@@ -256,4 +539,47 @@ def send_invoice(invoice_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': 'Failed to send invoice'}), 500 
\ No newline at end of file
+        return jsonify({'error': 'Failed to send invoice'}), 500 
+
+@invoice_bp.route('/<int:invoice_id>/pdf', methods=['GET'])
+@jwt_required()
+def get_invoice_pdf(invoice_id):
+    user_id = get_jwt_identity()
+    invoice = Invoice.query.filter_by(id=invoice_id, user_id=user_id).first()
+    
+    if not invoice:
+        return jsonify({'error': 'Invoice not found'}), 404
+    
+    # Rendered once per updated_at; later downloads are read from disk
+    response = send_file(
+        invoice_pdf(invoice),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f'{invoice.invoice_number}.pdf',
+        conditional=True
+    )
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@invoice_bp.route('/pdf/batch', methods=['POST'])
+@jwt_required()
+def render_invoice_pdfs():
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    
+    try:
+        start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+        end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'start_date and end_date are required (YYYY-MM-DD)'}), 400
+    
+    # Renders in a worker; the job's result is a zip of the PDFs
+    job = enqueue_job(int(user_id), 'invoices.render_pdfs', {
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'status': data.get('status')
+    })
+    return jsonify({
+        'message': 'PDF batch queued',
+        'job': job.to_dict()
+    }), 202
@@ -0,0 +1,68 @@
+from flask import Blueprint, request, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.job import Job
+import io
+import json
+
+job_bp = Blueprint('jobs', __name__)
+
+@job_bp.route('', methods=['GET'])
+@job_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_jobs():
+    user_id = get_jwt_identity()
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    status = request.args.get('status')
+    
+    query = Job.query.filter_by(user_id=user_id)
+    
+    if status:
+        query = query.filter_by(status=status)
+    
+    jobs = query.order_by(Job.created_at.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+    
+    return jsonify({
+        'jobs': [job.to_dict() for job in jobs.items],
+        'total': jobs.total,
+        'pages': jobs.pages,
+        'current_page': page
+    }), 200
+
+@job_bp.route('/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    user_id = get_jwt_identity()
+    job = Job.query.filter_by(id=job_id, user_id=user_id).first()
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify({'job': job.to_dict()}), 200
+
+@job_bp.route('/<int:job_id>/result', methods=['GET'])
+@jwt_required()
+def get_job_result(job_id):
+    user_id = get_jwt_identity()
+    job = Job.query.filter_by(id=job_id, user_id=user_id).first()
+    
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if job.status == 'failed':
+        return jsonify({'error': job.error or 'Job failed'}), 500
+    
+    if job.status != 'succeeded':
+        return jsonify({'error': 'Job has not finished yet', 'job': job.to_dict()}), 409
+    
+    if job.result_filename is None:
+        return jsonify({'result': json.loads(job.result) if job.result else None}), 200
+    
+    return send_file(
+        io.BytesIO(job.result_data),
+        mimetype=job.result_mimetype,
+        as_attachment=True,
+        download_name=job.result_filename
+    )
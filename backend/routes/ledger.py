@@ -0,0 +1,77 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models.ledger import JournalEntry, JournalLine, LedgerAccount
+from services.general_ledger import balances_as_of, signed_balance, trial_balance
+from datetime import datetime, date
+from decimal import Decimal
+from sqlalchemy.orm import selectinload
+
+ledger_bp = Blueprint('ledger', __name__)
+
+def _as_of_date():
+    as_of = request.args.get('as_of')
+    return datetime.strptime(as_of, '%Y-%m-%d').date() if as_of else date.today()
+
+@ledger_bp.route('/accounts', methods=['GET'])
+@jwt_required()
+def get_accounts():
+    user_id = int(get_jwt_identity())
+    try:
+        as_of = _as_of_date()
+    except ValueError:
+        return jsonify({'error': 'as_of must use the YYYY-MM-DD format'}), 400
+    
+    accounts = LedgerAccount.query.filter_by(user_id=user_id).order_by(LedgerAccount.code).all()
+    balances = balances_as_of(user_id, as_of)
+    
+    return jsonify({
+        'as_of': as_of.isoformat(),
+        'accounts': [
+            dict(
+                account.to_dict(),
+                balance=float(signed_balance(account.account_type, balances.get(account.id, Decimal('0'))))
+            )
+            for account in accounts
+        ]
+    }), 200
+
+@ledger_bp.route('/trial-balance', methods=['GET'])
+@jwt_required()
+def get_trial_balance():
+    user_id = int(get_jwt_identity())
+    try:
+        as_of = _as_of_date()
+    except ValueError:
+        return jsonify({'error': 'as_of must use the YYYY-MM-DD format'}), 400
+    
+    return jsonify(trial_balance(user_id, as_of)), 200
+
+@ledger_bp.route('/entries', methods=['GET'])
+@jwt_required()
+def get_journal_entries():
+    user_id = int(get_jwt_identity())
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    source_type = request.args.get('source_type')
+    source_id = request.args.get('source_id', type=int)
+    account_id = request.args.get('account_id', type=int)
+    
+    query = JournalEntry.query.filter_by(user_id=user_id)
+    
+    if source_type:
+        query = query.filter_by(source_type=source_type)
+    if source_id:
+        query = query.filter_by(source_id=source_id)
+    if account_id:
+        query = query.filter(JournalEntry.lines.any(JournalLine.account_id == account_id))
+    
+    entries = query.options(selectinload(JournalEntry.lines)).order_by(
+        JournalEntry.entry_date.desc(), JournalEntry.id.desc()
+    ).paginate(page=page, per_page=per_page, error_out=False)
+    
+    return jsonify({
+        'entries': [entry.to_dict() for entry in entries.items],
+        'total': entries.total,
+        'pages': entries.pages,
+        'current_page': page
+    }), 200
@@ -0,0 +1,64 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from extensions import db
+from models.outbox import OutboxMessage
+from services.outbox import outbox_counts
+from datetime import datetime
+
+outbox_bp = Blueprint('outbox', __name__)
+
+@outbox_bp.route('', methods=['GET'])
+@outbox_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_outbox():
+    user_id = get_jwt_identity()
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    status = request.args.get('status')
+    invoice_id = request.args.get('invoice_id', type=int)
+    
+    query = OutboxMessage.query.filter_by(user_id=user_id)
+    
+    if status:
+        query = query.filter_by(status=status)
+    if invoice_id:
+        query = query.filter_by(invoice_id=invoice_id)
+    
+    messages = query.order_by(OutboxMessage.id.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+    
+    return jsonify({
+        'messages': [message.to_dict() for message in messages.items],
+        'counts': outbox_counts(user_id),
+        'total': messages.total,
+        'pages': messages.pages,
+        'current_page': page
+    }), 200
+
+@outbox_bp.route('/<int:message_id>/retry', methods=['POST'])
+@jwt_required()
+def retry_message(message_id):
+    user_id = get_jwt_identity()
+    message = OutboxMessage.query.filter_by(id=message_id, user_id=user_id).first()
+    
+    if not message:
+        return jsonify({'error': 'Message not found'}), 404
+    
+    if message.status != 'failed':
+        return jsonify({'error': 'Only failed messages can be retried'}), 400
+    
+    message.status = 'pending'
+    message.attempts = 0
+    message.next_attempt_at = datetime.utcnow()
+    
+    try:
+        db.session.commit()
+        return jsonify({
+            'message': 'Message queued for delivery',
+            'outbox_message': message.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to queue message'}), 500
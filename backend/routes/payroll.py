@@ -1,9 +1,19 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
 from models.payroll import Employee, PayrollRecord, TimeEntry
-from datetime import datetime, date, timedelta
-from sqlalchemy import func
+from services.batching import chunked
+from services.employees import invalidate_employee_directory
+from services.timesheets import SAME_START_AND_END, date_parser, time_parser, compute_hours
+from services.overtime import overtime_for_period
+from services.payroll_tax import load_tax_tables, periods_per_year, calculate_withholdings_ytd
+from services.payroll_run import run_payroll
+from services.jobs import enqueue_job, wants_async
+from services.general_ledger import payroll_posting, sync_postings
+from services.report_cache import invalidate_reports
+from services.tax_snapshots import invalidate_tax_snapshots
+from datetime import datetime, date
+from sqlalchemy import func, insert
 import uuid
 
 payroll_bp = Blueprint('payroll', __name__)
@@ -101,6 +111,7 @@ def create_employee():
     try:
         db.session.add(employee)
         db.session.commit()
+        invalidate_employee_directory(employee.user_id)
         
         return jsonify({
             'message': 'Employee created successfully',
@@ -157,6 +168,7 @@ def update_employee(employee_id):
     
     try:
         db.session.commit()
+        invalidate_employee_directory(employee.user_id)
         return jsonify({
             'message': 'Employee updated successfully',
             'employee': employee.to_dict()
@@ -178,6 +190,7 @@ def delete_employee(employee_id):
     try:
         db.session.delete(employee)
         db.session.commit()
+        invalidate_employee_directory(user_id)
         return jsonify({'message': 'Employee deleted successfully'}), 200
         
     except Exception as e:
@@ -247,9 +260,27 @@ def create_payroll_record():
     if not employee:
         return jsonify({'error': 'Employee not found'}), 404
     
-    # Calculate payroll
-    regular_hours = data.get('regular_hours', 0)
-    overtime_hours = data.get('overtime_hours', 0)
+    try:
+        pay_period_start = datetime.strptime(data['pay_period_start'], '%Y-%m-%d').date()
+        pay_period_end = datetime.strptime(data['pay_period_end'], '%Y-%m-%d').date()
+        pay_date = datetime.strptime(data['pay_date'], '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Dates must use the YYYY-MM-DD format'}), 400
+    
+    # Calculate payroll; hourly employees without explicit hours are paid
+    # from their time entries using the configured overtime rules
+    regular_hours = data.get('regular_hours')
+    overtime_hours = data.get('overtime_hours')
+    
+    if employee.hourly_rate and regular_hours is None and overtime_hours is None:
+        hours = overtime_for_period(
+            user_id, pay_period_start, pay_period_end, current_app.config, [employee.id]
+        ).get(employee.id, {})
+        regular_hours = hours.get('regular_hours', 0)
+        overtime_hours = hours.get('overtime_hours', 0)
+    
+    regular_hours = regular_hours or 0
+    overtime_hours = overtime_hours or 0
     
     if employee.hourly_rate:
         regular_pay = regular_hours * float(employee.hourly_rate)
@@ -261,20 +292,27 @@ def create_payroll_record():
     
     gross_pay = regular_pay + overtime_pay
     
-    # Calculate taxes (simplified)
-    federal_tax = gross_pay * 0.15
-    state_tax = gross_pay * 0.05
-    social_security = gross_pay * 0.062
-    medicare = gross_pay * 0.0145
+    # Calculate taxes from the bracket tables, honoring year-to-date caps
+    withholdings = calculate_withholdings_ytd(
+        [employee.id],
+        [gross_pay],
+        pay_date,
+        periods_per_year=periods_per_year(pay_period_start, pay_period_end),
+        tables=load_tax_tables(current_app.config['PAYROLL_TAX_TABLES'])
+    )
+    federal_tax = withholdings['federal_tax'][0]
+    state_tax = withholdings['state_tax'][0]
+    social_security = withholdings['social_security'][0]
+    medicare = withholdings['medicare'][0]
     other_deductions = data.get('other_deductions', 0)
     
-    net_pay = gross_pay - federal_tax - state_tax - social_security - medicare - other_deductions
+    net_pay = gross_pay - withholdings['total'][0] - other_deductions
     
     record = PayrollRecord(
         employee_id=data['employee_id'],
-        pay_period_start=datetime.strptime(data['pay_period_start'], '%Y-%m-%d').date(),
-        pay_period_end=datetime.strptime(data['pay_period_end'], '%Y-%m-%d').date(),
-        pay_date=datetime.strptime(data['pay_date'], '%Y-%m-%d').date(),
+        pay_period_start=pay_period_start,
+        pay_period_end=pay_period_end,
+        pay_date=pay_date,
         regular_hours=regular_hours,
         overtime_hours=overtime_hours,
         regular_pay=regular_pay,
@@ -292,7 +330,11 @@ def create_payroll_record():
     
     try:
         db.session.add(record)
+        db.session.flush()  # Get record ID
+        invalidate_tax_snapshots(employee.user_id, record.pay_period_start)
+        sync_postings(employee.user_id, [payroll_posting(record)])
         db.session.commit()
+        invalidate_reports(user_id)
         
         return jsonify({
             'message': 'Payroll record created successfully',
@@ -354,18 +396,22 @@ def create_time_entry():
         return jsonify({'error': 'Employee not found'}), 404
     
     # Calculate hours worked
-    start_time = datetime.strptime(data['start_time'], '%H:%M').time()
-    end_time = datetime.strptime(data['end_time'], '%H:%M').time()
-    
-    start_dt = datetime.combine(datetime.strptime(data['date'], '%Y-%m-%d').date(), start_time)
-    end_dt = datetime.combine(datetime.strptime(data['date'], '%Y-%m-%d').date(), end_time)
-    
-    hours_worked = (end_dt - start_dt).total_seconds() / 3600
-    is_overtime = hours_worked > 8
+    try:
+        entry_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+        start_time = datetime.strptime(data['start_time'], '%H:%M').time()
+        end_time = datetime.strptime(data['end_time'], '%H:%M').time()
+    except ValueError:
+        return jsonify({'error': 'Invalid date or time format'}), 400
+    if start_time == end_time:
+        return jsonify({'error': SAME_START_AND_END}), 400
+    
+    hours, overtime = compute_hours([start_time], [end_time], current_app.config['OVERTIME_DAILY_THRESHOLD'])
+    hours_worked = hours[0]
+    is_overtime = overtime[0]
     
     entry = TimeEntry(
         employee_id=data['employee_id'],
-        date=datetime.strptime(data['date'], '%Y-%m-%d').date(),
+        date=entry_date,
         start_time=start_time,
         end_time=end_time,
         hours_worked=hours_worked,
@@ -386,78 +432,148 @@ def create_time_entry():
         db.session.rollback()
         return jsonify({'error': 'Time entry creation failed'}), 500
 
+@payroll_bp.route('/time-entries/bulk', methods=['POST'])
+@jwt_required()
+def create_time_entries_bulk():
+    user_id = int(get_jwt_identity())
+    data = request.get_json()
+    
+    entries_data = data.get('entries') if isinstance(data, dict) else None
+    if not entries_data or not isinstance(entries_data, list):
+        return jsonify({'error': 'entries must be a non-empty list'}), 400
+    
+    max_entries = current_app.config['BULK_MAX_TIME_ENTRIES']
+    if len(entries_data) > max_entries:
+        return jsonify({'error': f'At most {max_entries} time entries can be created per request'}), 400
+    
+    results = [None] * len(entries_data)
+    required_fields = ['employee_id', 'date', 'start_time', 'end_time']
+    
+    def reject(index, error):
+        results[index] = {'index': index, 'status': 'error', 'error': error}
+    
+    # Validate and parse each row, converting repeated dates/times only once
+    parse_date = date_parser()
+    parse_time = time_parser()
+    valid = []
+    for index, entry_data in enumerate(entries_data):
+        if not isinstance(entry_data, dict):
+            reject(index, 'Time entry must be an object')
+            continue
+        missing = next((field for field in required_fields if not entry_data.get(field)), None)
+        if missing:
+            reject(index, f'{missing} is required')
+            continue
+        try:
+            row = (
+                index,
+                int(entry_data['employee_id']),
+                parse_date(entry_data['date']),
+                parse_time(entry_data['start_time']),
+                parse_time(entry_data['end_time']),
+                entry_data.get('notes')
+            )
+        except (TypeError, ValueError):
+            reject(index, 'Invalid employee, date or time format')
+            continue
+        if row[3] == row[4]:
+            reject(index, SAME_START_AND_END)
+            continue
+        valid.append(row)
+    
+    # Verify every referenced employee belongs to the user in one query
+    employee_ids = {row[1] for row in valid}
+    owned_ids = set()
+    if employee_ids:
+        owned_ids = {
+            employee_id for (employee_id,) in db.session.query(Employee.id).filter(
+                Employee.user_id == user_id,
+                Employee.id.in_(employee_ids)
+            )
+        }
+    
+    accepted = []
+    for row in valid:
+        if row[1] in owned_ids:
+            accepted.append(row)
+        else:
+            reject(row[0], 'Employee not found')
+    
+    # Compute hours for the whole batch in one pass
+    hours_worked, is_overtime = compute_hours(
+        [row[3] for row in accepted],
+        [row[4] for row in accepted],
+        current_app.config['OVERTIME_DAILY_THRESHOLD']
+    )
+    
+    rows = [
+        (index, {
+            'employee_id': employee_id,
+            'date': entry_date,
+            'start_time': start_time,
+            'end_time': end_time,
+            'hours_worked': hours,
+            'is_overtime': overtime,
+            'notes': notes
+        })
+        for (index, employee_id, entry_date, start_time, end_time, notes), hours, overtime
+        in zip(accepted, hours_worked, is_overtime)
+    ]
+    
+    # Insert in chunked transactions
+    for chunk in chunked(rows, current_app.config['BULK_INSERT_CHUNK_SIZE']):
+        try:
+            entry_ids = db.session.execute(
+                insert(TimeEntry).returning(TimeEntry.id, sort_by_parameter_order=True),
+                [row for _, row in chunk]
+            ).scalars().all()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for index, _ in chunk:
+                reject(index, 'Time entry creation failed')
+            continue
+        
+        for entry_id, (index, row) in zip(entry_ids, chunk):
+            results[index] = {
+                'index': index,
+                'status': 'created',
+                'id': entry_id,
+                'hours_worked': row['hours_worked'],
+                'is_overtime': row['is_overtime']
+            }
+    
+    created = sum(1 for result in results if result['status'] == 'created')
+    failed = len(results) - created
+    
+    if created == 0:
+        status_code = 400
+    elif failed:
+        status_code = 207
+    else:
+        status_code = 201
+    
+    return jsonify({
+        'message': f'Created {created} of {len(results)} time entries',
+        'created': created,
+        'failed': failed,
+        'results': results
+    }), status_code
+
 @payroll_bp.route('/process', methods=['POST'])
 @jwt_required()
 def process_payroll():
     user_id = get_jwt_identity()
     
     try:
-        # Get all active employees
-        employees = Employee.query.filter_by(user_id=user_id, status='active').all()
-        
-        # Get time entries for the current pay period (last 2 weeks)
-        end_date = date.today()
-        start_date = end_date - timedelta(days=14)
-        
-        time_entries = TimeEntry.query.join(Employee).filter(
-            Employee.user_id == user_id,
-            TimeEntry.date >= start_date,
-            TimeEntry.date <= end_date
-        ).all()
+        if wants_async(request.args):
+            job = enqueue_job(int(user_id), 'payroll.process', {'end_date': date.today().isoformat()})
+            return jsonify({
+                'message': 'Payroll processing queued',
+                'job': job.to_dict()
+            }), 202
         
-        # Group time entries by employee
-        employee_hours = {}
-        for entry in time_entries:
-            if entry.employee_id not in employee_hours:
-                employee_hours[entry.employee_id] = 0
-            employee_hours[entry.employee_id] += entry.hours_worked
-        
-        # Create payroll records for each employee
-        created_records = []
-        for employee in employees:
-            total_hours = employee_hours.get(employee.id, 0)
-            
-            if total_hours > 0:
-                # Calculate pay based on hourly rate or salary
-                if employee.hourly_rate:
-                    gross_pay = total_hours * employee.hourly_rate
-                else:
-                    # Assume salary is monthly, calculate pro-rated amount
-                    gross_pay = (employee.salary / 30) * 14  # 2 weeks
-                
-                # Simple tax calculation (15% for demo)
-                tax_amount = gross_pay * 0.15
-                net_pay = gross_pay - tax_amount
-                
-                # Check if payroll record already exists for this period
-                existing_record = PayrollRecord.query.filter_by(
-                    employee_id=employee.id,
-                    pay_period_start=start_date,
-                    pay_period_end=end_date
-                ).first()
-                
-                if not existing_record:
-                    record = PayrollRecord(
-                        employee_id=employee.id,
-                        pay_period_start=start_date,
-                        pay_period_end=end_date,
-                        pay_date=end_date,
-                        regular_hours=min(total_hours, 80),  # 80 hours for 2 weeks
-                        overtime_hours=max(0, total_hours - 80),
-                        regular_pay=min(total_hours, 80) * (employee.hourly_rate or (employee.salary / 160)),
-                        overtime_pay=max(0, total_hours - 80) * (employee.hourly_rate or (employee.salary / 160)) * 1.5,
-                        gross_pay=gross_pay,
-                        federal_tax=tax_amount * 0.6,  # 60% of total tax
-                        state_tax=tax_amount * 0.2,   # 20% of total tax
-                        social_security=tax_amount * 0.15,  # 15% of total tax
-                        medicare=tax_amount * 0.05,   # 5% of total tax
-                        net_pay=net_pay,
-                        status='pending'
-                    )
-                    db.session.add(record)
-                    created_records.append(record)
-        
-        db.session.commit()
+        created_records = run_payroll(user_id, current_app.config)
         
         return jsonify({
             'message': f'Payroll processed successfully. Created {len(created_records)} records.',
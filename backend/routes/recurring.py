@@ -0,0 +1,188 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from extensions import db
+from models.recurring import RecurringInstance, RecurringTemplate
+from services.categories import invalidate_added_categories, resolve_category_id
+from services.recurring import FREQUENCIES, reschedule
+from datetime import datetime
+import json
+
+recurring_bp = Blueprint('recurring', __name__)
+
+SCHEDULE_FIELDS = ('frequency', 'interval', 'start_date', 'end_date')
+REQUIRED_FIELDS = {
+    'invoice': ['name', 'frequency', 'start_date', 'client_name', 'items'],
+    'expense': ['name', 'frequency', 'start_date', 'category', 'description', 'amount']
+}
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+def _validate(data, kind):
+    if data.get('frequency') is not None and data['frequency'] not in FREQUENCIES:
+        return f"frequency must be one of {', '.join(FREQUENCIES)}"
+    if data.get('interval') is not None and (not isinstance(data['interval'], int) or data['interval'] < 1):
+        return 'interval must be a positive integer'
+    if kind == 'invoice' and 'items' in data:
+        if not data['items']:
+            return 'At least one item is required'
+        for item in data['items']:
+            if not item.get('description') or item.get('quantity') is None or item.get('unit_price') is None:
+                return 'Each item needs description, quantity and unit_price'
+    return None
+
+def _apply(template, data):
+    """Copy the fields present in ``data`` onto ``template``."""
+    for field in ('name', 'frequency', 'interval', 'notes', 'active'):
+        if field in data:
+            setattr(template, field, data[field])
+    for field in ('start_date', 'end_date'):
+        if field in data:
+            setattr(template, field, _parse_date(data[field]))
+    
+    if template.kind == 'invoice':
+        for field in ('client_name', 'client_email', 'client_address', 'tax_rate', 'due_days'):
+            if field in data:
+                setattr(template, field, data[field])
+        if 'items' in data:
+            template.items = json.dumps([
+                {'description': item['description'], 'quantity': item['quantity'], 'unit_price': item['unit_price']}
+                for item in data['items']
+            ])
+    else:
+        if data.get('category'):
+            template.category_id = resolve_category_id(template.user_id, data['category'])
+        for field in ('description', 'amount', 'vendor', 'payment_method'):
+            if field in data:
+                setattr(template, field, data[field])
+
+@recurring_bp.route('', methods=['GET'])
+@recurring_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_templates():
+    user_id = get_jwt_identity()
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    kind = request.args.get('kind')
+    
+    query = RecurringTemplate.query.filter_by(user_id=user_id)
+    
+    if kind:
+        query = query.filter_by(kind=kind)
+    
+    templates = query.order_by(RecurringTemplate.id.desc()).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+    
+    return jsonify({
+        'templates': [template.to_dict() for template in templates.items],
+        'total': templates.total,
+        'pages': templates.pages,
+        'current_page': page
+    }), 200
+
+@recurring_bp.route('/<int:template_id>', methods=['GET'])
+@jwt_required()
+def get_template(template_id):
+    user_id = get_jwt_identity()
+    template = RecurringTemplate.query.filter_by(id=template_id, user_id=user_id).first()
+    
+    if not template:
+        return jsonify({'error': 'Recurring template not found'}), 404
+    
+    return jsonify({'template': template.to_dict()}), 200
+
+@recurring_bp.route('', methods=['POST'])
+@recurring_bp.route('/', methods=['POST'])
+@jwt_required()
+def create_template():
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    kind = data.get('kind')
+    if kind not in ('invoice', 'expense'):
+        return jsonify({'error': 'kind must be invoice or expense'}), 400
+    
+    # Validate required fields
+    for field in REQUIRED_FIELDS[kind]:
+        if not data.get(field):
+            return jsonify({'error': f'{field} is required'}), 400
+    
+    error = _validate(data, kind)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    template = RecurringTemplate(user_id=user_id, kind=kind, interval=1, active=True)
+    _apply(template, data)
+    reschedule(template)
+    
+    try:
+        db.session.add(template)
+        db.session.commit()
+        invalidate_added_categories()
+        
+        return jsonify({
+            'message': 'Recurring template created successfully',
+            'template': template.to_dict()
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Recurring template creation failed'}), 500
+
+@recurring_bp.route('/<int:template_id>', methods=['PUT'])
+@jwt_required()
+def update_template(template_id):
+    user_id = get_jwt_identity()
+    template = RecurringTemplate.query.filter_by(id=template_id, user_id=user_id).first()
+    
+    if not template:
+        return jsonify({'error': 'Recurring template not found'}), 404
+    
+    data = request.get_json()
+    
+    # Required fields may be changed but not cleared
+    for field in REQUIRED_FIELDS[template.kind]:
+        if field in data and not data[field]:
+            return jsonify({'error': f'{field} is required'}), 400
+    
+    error = _validate(data, template.kind)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    _apply(template, data)
+    if any(field in data for field in SCHEDULE_FIELDS):
+        reschedule(template)
+    template.updated_at = datetime.utcnow()
+    
+    try:
+        db.session.commit()
+        invalidate_added_categories()
+        return jsonify({
+            'message': 'Recurring template updated successfully',
+            'template': template.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Recurring template update failed'}), 500
+
+@recurring_bp.route('/<int:template_id>', methods=['DELETE'])
+@jwt_required()
+def delete_template(template_id):
+    user_id = get_jwt_identity()
+    template = RecurringTemplate.query.filter_by(id=template_id, user_id=user_id).first()
+    
+    if not template:
+        return jsonify({'error': 'Recurring template not found'}), 404
+    
+    try:
+        # Generated invoices and expenses are kept; only the link to them goes
+        RecurringInstance.query.filter_by(template_id=template.id).delete()
+        db.session.delete(template)
+        db.session.commit()
+        return jsonify({'message': 'Recurring template deleted successfully'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Recurring template deletion failed'}), 500
@@ -1,18 +1,35 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify, send_file, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
 from models.invoice import Invoice, Payment
 from models.expense import Expense
 from models.payroll import PayrollRecord, Employee
 from models.user import User
+from services.aggregates import LedgerAggregates, expenses_report, financial_summary, range_start, reports_window, revenue_report
+from services.categories import category_id_subquery
+from services.columnar_export import COLUMNAR_FORMATS, export_filename, stream_arrow, write_parquet
+from services.csv_export import build_csv
+from services.jobs import enqueue_job, wants_async
+from services.ledgers import LEDGER_DATASETS, ledger_query
+from services.ndjson_export import NDJSON_DATASETS, gzip_stream, iter_ledger_ndjson
+from services.receivables import aging_report
+from services.report_cache import cached_report
+from services.tax_snapshots import is_closed_year, load_snapshots, store_snapshots, tax_year_revisions
 from datetime import datetime, date, timedelta
 from sqlalchemy import func, and_
-import csv
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+import importlib.util
 import io
 import json
+import tempfile
 
 report_bp = Blueprint('reports', __name__)
 
+# Bump when the tax summary calculation changes so stored snapshots are recomputed
+# (2: snapshots stored before tax_year_revision guarded them may be stale)
+TAX_SUMMARY_VERSION = 2
+
 @report_bp.route('', methods=['GET'])
 @report_bp.route('/', methods=['GET'])
 @report_bp.route('/financial-summary', methods=['GET'])
@@ -37,115 +54,45 @@ def get_financial_summary():
     print(f"Financial summary request for user {user_id}")
     print(f"Date range: {start_dt} to {end_dt}")
     
-    # Total revenue (paid invoices)
-    total_revenue = db.session.query(func.sum(Invoice.total_amount)).filter(
-        and_(
-            Invoice.user_id == user_id,
-            Invoice.status == 'paid',
-            Invoice.issue_date >= start_dt,
-            Invoice.issue_date <= end_dt
-        )
-    ).scalar() or 0
+    aggregates = LedgerAggregates(user_id, *reports_window(start_dt, end_dt))
     
-    # Outstanding invoices
-    outstanding_invoices = db.session.query(func.sum(Invoice.total_amount)).filter(
-        and_(
-            Invoice.user_id == user_id,
-            Invoice.status.in_(['sent', 'overdue']),
-            Invoice.issue_date >= start_dt,
-            Invoice.issue_date <= end_dt
-        )
-    ).scalar() or 0
-    
-    # Total expenses
-    total_expenses = db.session.query(func.sum(Expense.amount)).filter(
-        and_(
-            Expense.user_id == user_id,
-            Expense.expense_date >= start_dt,
-            Expense.expense_date <= end_dt
-        )
-    ).scalar() or 0
-    
-    # Payroll expenses
-    payroll_expenses = db.session.query(func.sum(PayrollRecord.gross_pay)).join(Employee).filter(
-        and_(
-            Employee.user_id == user_id,
-            PayrollRecord.pay_period_start >= start_dt,
-            PayrollRecord.pay_period_start <= end_dt
-        )
-    ).scalar() or 0
-    
-    # Debug logging
-    print(f"Total revenue: {total_revenue}")
-    print(f"Outstanding invoices: {outstanding_invoices}")
-    print(f"Total expenses: {total_expenses}")
-    print(f"Payroll expenses: {payroll_expenses}")
-    
-    # Net profit
-    net_profit = float(total_revenue) - float(total_expenses) - float(payroll_expenses)
-    
-    # Monthly breakdown
-    monthly_data = []
-    current_date = start_dt
-    while current_date <= end_dt:
-        month_start = current_date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_revenue = db.session.query(func.sum(Invoice.total_amount)).filter(
-            and_(
-                Invoice.user_id == user_id,
-                Invoice.status == 'paid',
-                Invoice.issue_date >= month_start,
-                Invoice.issue_date <= month_end
-            )
-        ).scalar() or 0
-        
-        month_expenses = db.session.query(func.sum(Expense.amount)).filter(
-            and_(
-                Expense.user_id == user_id,
-                Expense.expense_date >= month_start,
-                Expense.expense_date <= month_end
-            )
-        ).scalar() or 0
-        
-        monthly_data.append({
-            'month': month_start.strftime('%Y-%m'),
-            'revenue': float(month_revenue),
-            'expenses': float(month_expenses),
-            'profit': float(month_revenue) - float(month_expenses)
-        })
-        
-        current_date = (month_start + timedelta(days=32)).replace(day=1)
-    
-    # Calculate profit margin
-    profit_margin = (net_profit / float(total_revenue) * 100) if float(total_revenue) > 0 else 0
+    return jsonify(financial_summary(aggregates, start_dt, end_dt)), 200
+
+@report_bp.route('/bundle', methods=['GET'])
+@jwt_required()
+def get_reports_bundle():
+    """The Reports page's financial summary, revenue and expense data in one response.
+    
+    ``start_date``/``end_date`` select the financial summary period (default
+    the last 365 days) and ``range`` the revenue and expense charts, exactly
+    as the individual endpoints do; all three are computed from one set of
+    ledger queries covering both periods.
+    """
+    user_id = get_jwt_identity()
+    range_param = request.args.get('range', 'month')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
     
-    # Get outstanding invoice count
-    outstanding_count = db.session.query(func.count(Invoice.id)).filter(
-        and_(
-            Invoice.user_id == user_id,
-            Invoice.status.in_(['sent', 'overdue']),
-            Invoice.issue_date >= start_dt,
-            Invoice.issue_date <= end_dt
-        )
-    ).scalar() or 0
+    today = date.today()
+    try:
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else today - timedelta(days=365)
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else today
+    except ValueError:
+        return jsonify({'error': 'Dates must use the YYYY-MM-DD format'}), 400
+    
+    range_dt = range_start(range_param, today)
+    
+    def build():
+        window_start, window_end = reports_window(min(start_dt, range_dt), max(end_dt, today))
+        aggregates = LedgerAggregates(user_id, window_start, window_end)
+        return {
+            'financial': financial_summary(aggregates, start_dt, end_dt),
+            'revenue': revenue_report(aggregates, range_dt, today),
+            'expenses': expenses_report(aggregates, range_dt, today)
+        }
     
-    return jsonify({
-        'period': {
-            'start_date': start_date,
-            'end_date': end_date
-        },
-        'total_revenue': float(total_revenue),
-        'outstanding_amount': float(outstanding_invoices),
-        'outstanding_count': outstanding_count,
-        'total_expenses': float(total_expenses),
-        'payroll_expenses': float(payroll_expenses),
-        'net_profit': net_profit,
-        'profit_margin': profit_margin,
-        'revenue_growth': 0,  # Placeholder for future implementation
-        'expense_growth': 0,  # Placeholder for future implementation
-        'monthly_breakdown': monthly_data
-    }), 200
+    params = {'range': range_param, 'start_date': start_dt.isoformat(), 'end_date': end_dt.isoformat()}
+    return jsonify(cached_report(user_id, 'reports-bundle', params, build)), 200
 
 @report_bp.route('/revenue', methods=['GET'])
 @jwt_required()
@@ -153,45 +100,11 @@ def get_revenue_report():
     user_id = get_jwt_identity()
     range_param = request.args.get('range', 'month')
     
-    # Calculate date range based on parameter
     end_date = date.today()
-    if range_param == 'week':
-        start_date = end_date - timedelta(days=7)
-    elif range_param == 'month':
-        start_date = end_date - timedelta(days=30)
-    elif range_param == 'quarter':
-        start_date = end_date - timedelta(days=90)
-    elif range_param == 'year':
-        start_date = end_date - timedelta(days=365)
-    else:
-        start_date = end_date - timedelta(days=30)
-    
-    # Get monthly revenue data
-    monthly_data = []
-    current_date = start_date
-    while current_date <= end_date:
-        month_start = current_date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_revenue = db.session.query(func.sum(Invoice.total_amount)).filter(
-            and_(
-                Invoice.user_id == user_id,
-                Invoice.status == 'paid',
-                Invoice.issue_date >= month_start,
-                Invoice.issue_date <= month_end
-            )
-        ).scalar() or 0
-        
-        monthly_data.append({
-            'month': month_start.strftime('%Y-%m'),
-            'revenue': float(month_revenue)
-        })
-        
-        current_date = (month_start + timedelta(days=32)).replace(day=1)
+    start_date = range_start(range_param, end_date)
+    aggregates = LedgerAggregates(user_id, *reports_window(start_date, end_date))
     
-    return jsonify({
-        'data': monthly_data
-    }), 200
+    return jsonify(revenue_report(aggregates, start_date, end_date)), 200
 
 @report_bp.route('/expenses', methods=['GET'])
 @jwt_required()
@@ -199,42 +112,11 @@ def get_expenses_report():
     user_id = get_jwt_identity()
     range_param = request.args.get('range', 'month')
     
-    # Calculate date range based on parameter
     end_date = date.today()
-    if range_param == 'week':
-        start_date = end_date - timedelta(days=7)
-    elif range_param == 'month':
-        start_date = end_date - timedelta(days=30)
-    elif range_param == 'quarter':
-        start_date = end_date - timedelta(days=90)
-    elif range_param == 'year':
-        start_date = end_date - timedelta(days=365)
-    else:
-        start_date = end_date - timedelta(days=30)
+    start_date = range_start(range_param, end_date)
+    aggregates = LedgerAggregates(user_id, start_date, end_date)
     
-    # Get expense data by category
-    expense_data = db.session.query(
-        Expense.category,
-        func.sum(Expense.amount).label('amount')
-    ).filter(
-        and_(
-            Expense.user_id == user_id,
-            Expense.expense_date >= start_date,
-            Expense.expense_date <= end_date
-        )
-    ).group_by(Expense.category).all()
-    
-    chart_data = [
-        {
-            'name': category,
-            'amount': float(amount)
-        }
-        for category, amount in expense_data
-    ]
-    
-    return jsonify({
-        'data': chart_data
-    }), 200
+    return jsonify(expenses_report(aggregates, start_date, end_date)), 200
 
 @report_bp.route('/payroll', methods=['GET'])
 @jwt_required()
@@ -282,14 +164,9 @@ def get_payroll_report():
         'payroll_data': payroll_summary
     }), 200
 
-@report_bp.route('/tax-summary', methods=['GET'])
-@jwt_required()
-def get_tax_summary():
-    user_id = get_jwt_identity()
-    year = request.args.get('year', date.today().year)
-    
-    start_date = date(int(year), 1, 1)
-    end_date = date(int(year), 12, 31)
+def _compute_tax_summary(user_id, year):
+    start_date = date(year, 1, 1)
+    end_date = date(year, 12, 31)
     
     # Revenue for tax year
     total_revenue = db.session.query(func.sum(Invoice.total_amount)).filter(
@@ -327,7 +204,7 @@ def get_tax_summary():
     # Estimated taxes (simplified calculation)
     estimated_tax = net_income * 0.25  # 25% estimated tax rate
     
-    return jsonify({
+    return {
         'tax_year': year,
         'income': {
             'gross_revenue': gross_income,
@@ -342,8 +219,68 @@ def get_tax_summary():
             'estimated_tax': estimated_tax,
             'effective_tax_rate': (estimated_tax / gross_income * 100) if gross_income > 0 else 0
         }
+    }
+
+def _tax_summaries(user_id, years):
+    """Tax summaries for ``years``, served from snapshots for closed years.
+
+    Closed years missing a snapshot are computed once and persisted; the
+    current and future years are always computed live.
+    """
+    closed_years = [year for year in years if is_closed_year(year)]
+    summaries = load_snapshots(user_id, closed_years, TAX_SUMMARY_VERSION) if closed_years else {}
+    # Read before computing, so a write that lands meanwhile blocks the store
+    revisions = tax_year_revisions(user_id, [year for year in closed_years if year not in summaries])
+    
+    for year in years:
+        if year not in summaries:
+            summaries[year] = _compute_tax_summary(user_id, year)
+    
+    computed = {year: summaries[year] for year in revisions}
+    if store_snapshots(user_id, TAX_SUMMARY_VERSION, computed, revisions):
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request stored the same snapshot first
+            db.session.rollback()
+    
+    return [summaries[year] for year in years]
+
+@report_bp.route('/tax-summary', methods=['GET'])
+@jwt_required()
+def get_tax_summary():
+    user_id = int(get_jwt_identity())
+    year = request.args.get('year', date.today().year, type=int)
+    
+    return jsonify(_tax_summaries(user_id, [year])[0]), 200
+
+@report_bp.route('/tax-summary/history', methods=['GET'])
+@jwt_required()
+def get_tax_summary_history():
+    user_id = int(get_jwt_identity())
+    end_year = request.args.get('end_year', date.today().year, type=int)
+    start_year = request.args.get('start_year', end_year - 4, type=int)
+    
+    if start_year > end_year or end_year - start_year >= 50:
+        return jsonify({'error': 'Invalid year range'}), 400
+    
+    return jsonify({
+        'summaries': _tax_summaries(user_id, list(range(start_year, end_year + 1)))
     }), 200
 
+@report_bp.route('/ar-aging', methods=['GET'])
+@jwt_required()
+def get_ar_aging():
+    user_id = int(get_jwt_identity())
+    as_of = request.args.get('as_of')
+    
+    try:
+        as_of = datetime.strptime(as_of, '%Y-%m-%d').date() if as_of else date.today()
+    except ValueError:
+        return jsonify({'error': 'as_of must use the YYYY-MM-DD format'}), 400
+    
+    return jsonify(aging_report(user_id, as_of)), 200
+
 @report_bp.route('/invoice-report', methods=['GET'])
 @jwt_required()
 def get_invoice_report():
@@ -373,7 +310,10 @@ def get_invoice_report():
     if status:
         query = query.filter(Invoice.status == status)
     
-    invoices = query.order_by(Invoice.issue_date.desc()).all()
+    invoices = query.options(
+        selectinload(Invoice.items),
+        selectinload(Invoice.payments)
+    ).order_by(Invoice.issue_date.desc()).all()
     
     # Calculate summary
     total_invoiced = sum(invoice.total_amount for invoice in invoices)
@@ -427,7 +367,7 @@ def get_expense_report():
     query = query.filter(Expense.expense_date <= end_date)
     
     if category:
-        query = query.filter(Expense.category == category)
+        query = query.filter(Expense.category_id == category_id_subquery(user_id, category))
     
     expenses = query.order_by(Expense.expense_date.desc()).all()
     
@@ -472,84 +412,108 @@ def export_csv():
     else:
         start_date = end_date - timedelta(days=30)
     
-    start_dt = start_date
-    end_dt = end_date
-    
-    # Create CSV data
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    if report_type == 'invoices':
-        writer.writerow(['Invoice Number', 'Client', 'Issue Date', 'Due Date', 'Amount', 'Status'])
-        
-        invoices = Invoice.query.filter(
-            and_(
-                Invoice.user_id == user_id,
-                Invoice.issue_date >= start_dt,
-                Invoice.issue_date <= end_dt
-            )
-        ).all()
-        
-        for invoice in invoices:
-            writer.writerow([
-                invoice.invoice_number,
-                invoice.client_name,
-                invoice.issue_date.isoformat(),
-                invoice.due_date.isoformat(),
-                invoice.total_amount,
-                invoice.status
-            ])
-    
-    elif report_type == 'expenses':
-        writer.writerow(['Date', 'Category', 'Description', 'Amount', 'Vendor', 'Status'])
-        
-        expenses = Expense.query.filter(
-            and_(
-                Expense.user_id == user_id,
-                Expense.expense_date >= start_dt,
-                Expense.expense_date <= end_dt
-            )
-        ).all()
-        
-        for expense in expenses:
-            writer.writerow([
-                expense.expense_date.isoformat(),
-                expense.category,
-                expense.description,
-                expense.amount,
-                expense.vendor or '',
-                expense.status
-            ])
-    
-    elif report_type == 'payroll':
-        writer.writerow(['Employee', 'Pay Period', 'Gross Pay', 'Net Pay', 'Status'])
-        
-        records = PayrollRecord.query.join(Employee).filter(
-            and_(
-                Employee.user_id == user_id,
-                PayrollRecord.pay_period_start >= start_dt,
-                PayrollRecord.pay_period_start <= end_dt
-            )
-        ).all()
-        
-        for record in records:
-            writer.writerow([
-                f"{record.employee.first_name} {record.employee.last_name}",
-                f"{record.pay_period_start.isoformat()} - {record.pay_period_end.isoformat()}",
-                record.gross_pay,
-                record.net_pay,
-                record.status
-            ])
+    if wants_async(request.args):
+        job = enqueue_job(int(user_id), 'reports.export_csv', {
+            'type': report_type,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat()
+        })
+        return jsonify({
+            'message': 'Export queued',
+            'job': job.to_dict()
+        }), 202
     
     # Create response
-    output.seek(0)
     return send_file(
-        io.BytesIO(output.getvalue().encode('utf-8')),
+        io.BytesIO(build_csv(user_id, report_type, start_date, end_date)),
         mimetype='text/csv',
         as_attachment=True,
         download_name=f'{report_type}_report_{start_date}_to_{end_date}.csv'
     )
 
+@report_bp.route('/export/columnar', methods=['GET'])
+@jwt_required()
+def export_columnar():
+    user_id = get_jwt_identity()
+    dataset = request.args.get('dataset', 'invoices')
+    export_format = request.args.get('format', 'parquet')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    if dataset not in LEDGER_DATASETS:
+        return jsonify({'error': f"dataset must be one of: {', '.join(LEDGER_DATASETS)}"}), 400
+    if export_format not in COLUMNAR_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(COLUMNAR_FORMATS)}"}), 400
+    
+    if not start_date:
+        start_date = (date.today() - timedelta(days=30)).isoformat()
+    if not end_date:
+        end_date = date.today().isoformat()
+    
+    try:
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'Dates must use the YYYY-MM-DD format'}), 400
+    
+    if importlib.util.find_spec('pyarrow') is None:
+        return jsonify({'error': 'Columnar export requires pyarrow to be installed'}), 501
+    
+    if wants_async(request.args):
+        if export_format != 'parquet':
+            return jsonify({'error': 'Queued exports are written as parquet'}), 400
+        job = enqueue_job(int(user_id), 'reports.export_ledger', {
+            'dataset': dataset,
+            'start_date': start_dt.isoformat(),
+            'end_date': end_dt.isoformat()
+        })
+        return jsonify({
+            'message': 'Export queued',
+            'job': job.to_dict()
+        }), 202
+    
+    statement = ledger_query(dataset, user_id, start_dt, end_dt)
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    mimetype = COLUMNAR_FORMATS[export_format][0]
+    download_name = export_filename(dataset, start_dt, end_dt, export_format)
+    
+    if export_format == 'arrow':
+        # The IPC stream format needs no footer, so batches go out as they are read
+        return Response(
+            stream_with_context(stream_arrow(statement, batch_size)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={download_name}'}
+        )
+    
+    # Parquet writes its footer last, so spool to a temporary file first
+    output = tempfile.TemporaryFile()
+    write_parquet(statement, output, batch_size)
+    output.seek(0)
+    return send_file(output, mimetype=mimetype, as_attachment=True, download_name=download_name)
+
+def _export_ledger_ndjson(user_id, start_dt, end_dt):
+    datasets = request.args.get('datasets')
+    datasets = datasets.split(',') if datasets else list(NDJSON_DATASETS)
+    unknown = [dataset for dataset in datasets if dataset not in NDJSON_DATASETS]
+    if unknown:
+        return jsonify({'error': f"datasets must be drawn from: {', '.join(NDJSON_DATASETS)}"}), 400
+    
+    chunks = iter_ledger_ndjson(
+        user_id, datasets, start_dt, end_dt, current_app.config['EXPORT_BATCH_SIZE']
+    )
+    download_name = f'ledger_{start_dt}_to_{end_dt}.ndjson'
+    mimetype = 'application/x-ndjson'
+    if request.args.get('compress') == 'gzip':
+        chunks = gzip_stream(chunks)
+        download_name += '.gz'
+        mimetype = 'application/gzip'
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={download_name}'}
+    )
+
 @report_bp.route('/export/json', methods=['GET'])
 @jwt_required()
 def export_json():
@@ -566,6 +530,9 @@ def export_json():
     start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
     end_dt = datetime.strptime(end_date, '%Y-%m-%d').date()
     
+    if report_type == 'ledger':
+        return _export_ledger_ndjson(user_id, start_dt, end_dt)
+    
     data = {}
     
     if report_type == 'financial_summary':
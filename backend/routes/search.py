@@ -0,0 +1,33 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from services.search import search, SEARCH_SOURCES
+
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route('', methods=['GET'])
+@search_bp.route('/', methods=['GET'])
+@jwt_required()
+def search_records():
+    user_id = get_jwt_identity()
+    query = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), 100)
+    types = request.args.get('types')
+    
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+    
+    if types:
+        types = [name.strip() for name in types.split(',') if name.strip()]
+        unknown = [name for name in types if name not in SEARCH_SOURCES]
+        if unknown:
+            return jsonify({'error': f"Unknown search type: {', '.join(unknown)}"}), 400
+    
+    results, total = search(user_id, query, types, page, per_page)
+    
+    return jsonify({
+        'results': results,
+        'total': total,
+        'pages': (total + per_page - 1) // per_page,
+        'current_page': page
+    }), 200
@@ -0,0 +1,358 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from extensions import db
+from models.invoice import Invoice
+from models.expense import Expense, ExpenseCategory
+from models.payroll import Employee, PayrollRecord
+
+OUTSTANDING_STATUSES = ('sent', 'overdue')
+RANGE_DAYS = {'week': 7, 'month': 30, 'quarter': 90, 'year': 365}
+LEDGERS = ('invoices', 'expenses', 'payroll')
+
+
+def range_start(range_param, end_date):
+    """Start date for the reports' ``range=`` parameter (defaults to a month)."""
+    return end_date - timedelta(days=RANGE_DAYS.get(range_param, 30))
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def month_end(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def shift_month(day, months):
+    """First day of the month ``months`` away from ``day``'s month."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def months_between(start_date, end_date):
+    """First day of every calendar month from start_date's to end_date's."""
+    months = []
+    current = month_start(start_date)
+    while current <= end_date:
+        months.append(current)
+        current = shift_month(current, 1)
+    return months
+
+
+def invoice_days_statement(user_id, start_date, end_date):
+    return db.select(
+        Invoice.issue_date,
+        Invoice.status,
+        func.sum(Invoice.total_amount),
+        func.count(Invoice.id)
+    ).where(
+        Invoice.user_id == user_id,
+        Invoice.issue_date >= start_date,
+        Invoice.issue_date <= end_date
+    ).group_by(Invoice.issue_date, Invoice.status)
+
+
+def expense_days_statement(user_id, start_date, end_date):
+    return db.select(
+        Expense.expense_date,
+        ExpenseCategory.id,
+        ExpenseCategory.name,
+        func.sum(Expense.amount)
+    ).select_from(Expense).join(ExpenseCategory).where(
+        Expense.user_id == user_id,
+        Expense.expense_date >= start_date,
+        Expense.expense_date <= end_date
+    ).group_by(Expense.expense_date, ExpenseCategory.id)
+
+
+def payroll_days_statement(user_id, start_date, end_date):
+    return db.select(
+        PayrollRecord.pay_period_start,
+        PayrollRecord.pay_date,
+        func.sum(PayrollRecord.gross_pay)
+    ).join(Employee).where(
+        Employee.user_id == user_id,
+        db.or_(
+            PayrollRecord.pay_period_start.between(start_date, end_date),
+            PayrollRecord.pay_date.between(start_date, end_date)
+        )
+    ).group_by(PayrollRecord.pay_period_start, PayrollRecord.pay_date)
+
+
+class LedgerAggregates:
+    """Daily ledger totals for one user, loaded once and sliced many ways.
+
+    Each ledger is read with a single grouped query per day over the window
+    [start_date, end_date]; revenue, outstanding, expense, category and
+    payroll figures for any range or month inside the window are then summed
+    from those rows. Dashboard and report sections built from the same
+    instance share the queries.
+    """
+
+    def __init__(self, user_id, start_date, end_date):
+        self.user_id = int(user_id)
+        self.start_date = start_date
+        self.end_date = end_date
+        self._invoices = None
+        self._expenses = None
+        self._payroll = None
+
+    def covers(self, start_date, end_date):
+        return self.start_date <= start_date and end_date <= self.end_date
+
+    def statements(self, ledgers=LEDGERS):
+        """{ledger: day query} for callers that run the queries themselves."""
+        builders = {
+            'invoices': invoice_days_statement,
+            'expenses': expense_days_statement,
+            'payroll': payroll_days_statement
+        }
+        return {ledger: builders[ledger](self.user_id, self.start_date, self.end_date) for ledger in ledgers}
+
+    def preload(self, invoices=None, expenses=None, payroll=None):
+        """Use day rows already fetched with ``statements()`` instead of querying."""
+        self._invoices = invoices if invoices is not None else self._invoices
+        self._expenses = expenses if expenses is not None else self._expenses
+        self._payroll = payroll if payroll is not None else self._payroll
+        return self
+
+    @property
+    def invoice_days(self):
+        """[(issue_date, status, total_amount, count)]"""
+        if self._invoices is None:
+            self._invoices = db.session.execute(
+                invoice_days_statement(self.user_id, self.start_date, self.end_date)
+            ).all()
+        return self._invoices
+
+    @property
+    def expense_days(self):
+        """[(expense_date, category_id, category_name, amount)]"""
+        if self._expenses is None:
+            self._expenses = db.session.execute(
+                expense_days_statement(self.user_id, self.start_date, self.end_date)
+            ).all()
+        return self._expenses
+
+    @property
+    def payroll_days(self):
+        """[(pay_period_start, pay_date, gross_pay)]"""
+        if self._payroll is None:
+            self._payroll = db.session.execute(
+                payroll_days_statement(self.user_id, self.start_date, self.end_date)
+            ).all()
+        return self._payroll
+
+    def revenue(self, start_date, end_date):
+        """Total of paid invoices issued in the range."""
+        return sum(
+            (total for day, status, total, _ in self.invoice_days
+             if status == 'paid' and start_date <= day <= end_date),
+            0
+        )
+
+    def outstanding(self, start_date, end_date):
+        """(total, count) of sent or overdue invoices issued in the range."""
+        total = count = 0
+        for day, status, amount, invoices in self.invoice_days:
+            if status in OUTSTANDING_STATUSES and start_date <= day <= end_date:
+                total += amount
+                count += invoices
+        return total, count
+
+    def expenses(self, start_date, end_date):
+        return sum(
+            (amount for day, _, _, amount in self.expense_days if start_date <= day <= end_date),
+            0
+        )
+
+    def expenses_by_category(self, start_date, end_date):
+        """[(category name, total)] ordered by category id."""
+        totals = {}
+        for day, category_id, name, amount in self.expense_days:
+            if start_date <= day <= end_date:
+                key = (category_id, name)
+                totals[key] = totals.get(key, 0) + amount
+        return [(name, total) for (_, name), total in sorted(totals.items())]
+
+    def payroll_by_period_start(self, start_date, end_date):
+        return sum(
+            (gross for period_start, _, gross in self.payroll_days if start_date <= period_start <= end_date),
+            0
+        )
+
+    def payroll_by_pay_date(self, start_date, end_date):
+        return sum(
+            (gross for _, pay_date, gross in self.payroll_days if start_date <= pay_date <= end_date),
+            0
+        )
+
+    def monthly(self, months, ledger):
+        """{month start: total} of 'revenue' or 'expenses' for each given month."""
+        totals = defaultdict(int)
+        if ledger == 'revenue':
+            for day, status, total, _ in self.invoice_days:
+                if status == 'paid':
+                    totals[month_start(day)] += total
+        else:
+            for day, _, _, amount in self.expense_days:
+                totals[month_start(day)] += amount
+        return {month: totals.get(month, 0) for month in months}
+
+
+def chart_months(months, today):
+    """First day of each of the last ``months`` calendar months, oldest first."""
+    return [shift_month(today, -i) for i in reversed(range(months))]
+
+
+def dashboard_window(months, today):
+    """Dates the dashboard overview and a ``months``-long chart read from."""
+    first = shift_month(today, -max(months - 1, 1))
+    return first, month_end(today)
+
+
+def reports_window(start_date, end_date):
+    """Dates the financial summary for [start_date, end_date] reads from."""
+    return month_start(start_date), month_end(end_date)
+
+
+def outstanding_total_statement(user_id):
+    # Outstanding invoices are not limited to the dashboard window
+    return db.select(func.sum(Invoice.total_amount)).where(
+        Invoice.user_id == user_id,
+        Invoice.status.in_(OUTSTANDING_STATUSES)
+    )
+
+
+def recent_invoices_statement(user_id):
+    return db.select(Invoice).where(Invoice.user_id == user_id).options(
+        selectinload(Invoice.items),
+        selectinload(Invoice.payments)
+    ).order_by(Invoice.created_at.desc()).limit(5)
+
+
+def recent_expenses_statement(user_id):
+    return db.select(Expense).where(Expense.user_id == user_id).order_by(Expense.created_at.desc()).limit(5)
+
+
+def dashboard_overview(aggregates, today):
+    user_id = aggregates.user_id
+    return overview_from_rows(
+        aggregates,
+        today,
+        db.session.execute(outstanding_total_statement(user_id)).scalar(),
+        db.session.execute(recent_invoices_statement(user_id)).scalars().all(),
+        db.session.execute(recent_expenses_statement(user_id)).scalars().all()
+    )
+
+
+def overview_from_rows(aggregates, today, outstanding_invoices, recent_invoices, recent_expenses):
+    """The dashboard overview from aggregates and the already-fetched outstanding/recent rows."""
+    current_start = month_start(today)
+    current_end = month_end(today)
+    last_start = shift_month(today, -1)
+    last_end = current_start - timedelta(days=1)
+
+    current_month_revenue = aggregates.revenue(current_start, current_end)
+    current_month_expenses = aggregates.expenses(current_start, current_end)
+    current_month_payroll = aggregates.payroll_by_pay_date(current_start, current_end)
+    last_month_revenue = aggregates.revenue(last_start, last_end)
+    last_month_expenses = aggregates.expenses(last_start, last_end)
+
+    # Calculate growth percentages
+    revenue_growth = ((float(current_month_revenue) - float(last_month_revenue)) / float(last_month_revenue) * 100) if last_month_revenue > 0 else 0
+    expense_growth = ((float(current_month_expenses) - float(last_month_expenses)) / float(last_month_expenses) * 100) if last_month_expenses > 0 else 0
+
+    return {
+        'current_month': {
+            'revenue': float(current_month_revenue),
+            'expenses': float(current_month_expenses),
+            'payroll': float(current_month_payroll),
+            'profit': float(current_month_revenue) - float(current_month_expenses) - float(current_month_payroll)
+        },
+        'growth': {
+            'revenue_growth': revenue_growth,
+            'expense_growth': expense_growth
+        },
+        'outstanding_invoices': float(outstanding_invoices or 0),
+        'recent_activity': {
+            'invoices': [invoice.to_dict() for invoice in recent_invoices],
+            'expenses': [expense.to_dict() for expense in recent_expenses]
+        }
+    }
+
+
+def monthly_chart(aggregates, months, today, ledger):
+    """{'data': [{'month', ledger}]} for the last ``months`` calendar months."""
+    totals = aggregates.monthly(chart_months(months, today), ledger)
+    return {
+        'data': [
+            {'month': month.strftime('%Y-%m'), ledger: float(total)}
+            for month, total in totals.items()
+        ]
+    }
+
+
+def financial_summary(aggregates, start_date, end_date):
+    total_revenue = aggregates.revenue(start_date, end_date)
+    outstanding_amount, outstanding_count = aggregates.outstanding(start_date, end_date)
+    total_expenses = aggregates.expenses(start_date, end_date)
+    payroll_expenses = aggregates.payroll_by_period_start(start_date, end_date)
+
+    # Net profit
+    net_profit = float(total_revenue) - float(total_expenses) - float(payroll_expenses)
+
+    # Monthly breakdown covers whole calendar months
+    months = months_between(start_date, end_date)
+    revenue = aggregates.monthly(months, 'revenue')
+    expenses = aggregates.monthly(months, 'expenses')
+    monthly_data = [
+        {
+            'month': month.strftime('%Y-%m'),
+            'revenue': float(revenue[month]),
+            'expenses': float(expenses[month]),
+            'profit': float(revenue[month]) - float(expenses[month])
+        }
+        for month in months
+    ]
+
+    # Calculate profit margin
+    profit_margin = (net_profit / float(total_revenue) * 100) if float(total_revenue) > 0 else 0
+
+    return {
+        'period': {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat()
+        },
+        'total_revenue': float(total_revenue),
+        'outstanding_amount': float(outstanding_amount),
+        'outstanding_count': outstanding_count,
+        'total_expenses': float(total_expenses),
+        'payroll_expenses': float(payroll_expenses),
+        'net_profit': net_profit,
+        'profit_margin': profit_margin,
+        'revenue_growth': 0,  # Placeholder for future implementation
+        'expense_growth': 0,  # Placeholder for future implementation
+        'monthly_breakdown': monthly_data
+    }
+
+
+def revenue_report(aggregates, start_date, end_date):
+    totals = aggregates.monthly(months_between(start_date, end_date), 'revenue')
+    return {
+        'data': [
+            {'month': month.strftime('%Y-%m'), 'revenue': float(total)}
+            for month, total in totals.items()
+        ]
+    }
+
+
+def expenses_report(aggregates, start_date, end_date):
+    return {
+        'data': [
+            {'name': category, 'amount': float(amount)}
+            for category, amount in aggregates.expenses_by_category(start_date, end_date)
+        ]
+    }
@@ -0,0 +1,46 @@
+import asyncio
+from services.aggregates import (
+    LEDGERS, LedgerAggregates, outstanding_total_statement, overview_from_rows,
+    recent_expenses_statement, recent_invoices_statement
+)
+
+
+def _rows(result):
+    return result.all()
+
+
+def _scalar(result):
+    return result.scalar()
+
+
+def _objects(result):
+    return result.scalars().all()
+
+
+async def _fetch(sessions, statement, shape):
+    # One session (and connection) per statement so independent queries overlap
+    async with sessions() as session:
+        return shape(await session.execute(statement))
+
+
+async def load_aggregates(sessions, user_id, start_date, end_date, ledgers=LEDGERS):
+    """LedgerAggregates for the window with ``ledgers``' day rows fetched concurrently."""
+    aggregates = LedgerAggregates(user_id, start_date, end_date)
+    statements = aggregates.statements(ledgers)
+    rows = await asyncio.gather(*(_fetch(sessions, statement, _rows) for statement in statements.values()))
+    return aggregates.preload(**dict(zip(statements, rows)))
+
+
+async def load_dashboard(sessions, user_id, start_date, end_date, today):
+    """(aggregates, overview) with the ledger, outstanding and recent-activity reads in flight at once."""
+    aggregates = LedgerAggregates(user_id, start_date, end_date)
+    statements = aggregates.statements()
+    user_id = aggregates.user_id
+    results = await asyncio.gather(
+        *(_fetch(sessions, statement, _rows) for statement in statements.values()),
+        _fetch(sessions, outstanding_total_statement(user_id), _scalar),
+        _fetch(sessions, recent_invoices_statement(user_id), _objects),
+        _fetch(sessions, recent_expenses_statement(user_id), _objects)
+    )
+    aggregates.preload(**dict(zip(statements, results)))
+    return aggregates, overview_from_rows(aggregates, today, *results[len(statements):])
@@ -0,0 +1,185 @@
+from datetime import datetime
+from sqlalchemy import MetaData, inspect, or_, select, text
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models.expense import ExpenseCategory
+from services.refcache import reference_cache
+
+DEFAULT_CATEGORY_COLOR = '#000000'
+
+
+def _visible(user_id):
+    """Filter for the categories ``user_id`` may use: its own and the shared ones."""
+    return or_(ExpenseCategory.user_id == int(user_id), ExpenseCategory.user_id.is_(None))
+
+
+def cached_categories(user_id):
+    """Return the user's and the shared categories as a list of dicts, cached per process."""
+    return reference_cache.get('categories', f'all:{int(user_id)}', lambda: [
+        category.to_dict()
+        for category in ExpenseCategory.query.filter(_visible(user_id)).order_by(ExpenseCategory.id)
+    ])
+
+
+def category_ids(user_id):
+    """Return a cached {name: id} map of the categories visible to ``user_id``.
+    
+    A user's own category wins over a shared one of the same name.
+    """
+    return reference_cache.get('categories', f'ids:{int(user_id)}', lambda: dict(
+        db.session.query(ExpenseCategory.name, ExpenseCategory.id).filter(
+            _visible(user_id)
+        ).order_by(ExpenseCategory.user_id.isnot(None)).all()
+    ))
+
+
+def invalidate_categories():
+    """Call after committing a new or changed category."""
+    reference_cache.bump('categories')
+
+
+def invalidate_added_categories():
+    """Call after committing a transaction that used ``resolve_category_id``.
+    
+    Bumps the cache only if the transaction created a category.
+    """
+    if db.session.info.pop('categories_added', False):
+        invalidate_categories()
+
+
+def category_id_subquery(user_id, name):
+    """Scalar subquery resolving a category name to its id for ``user_id``, for filters."""
+    return select(ExpenseCategory.id).where(
+        ExpenseCategory.name == name, _visible(user_id)
+    ).order_by(ExpenseCategory.user_id.is_(None)).limit(1).scalar_subquery()
+
+
+def _lookup_category_id(user_id, name):
+    return db.session.query(ExpenseCategory.id).filter(
+        ExpenseCategory.name == name, _visible(user_id)
+    ).order_by(ExpenseCategory.user_id.is_(None)).limit(1).scalar()
+
+
+def resolve_category_id(user_id, name):
+    """Return the id of ``user_id``'s category ``name``, creating it if it is new.
+    
+    Expenses have always accepted free-form category names, so unknown names
+    are added as categories private to the user rather than rejected. The
+    insert runs in a savepoint so a concurrent create of the same name does
+    not abort the caller's transaction. The cache is bumped once the caller
+    commits (see ``invalidate_added_categories``), so no other request can
+    cache a category that is later rolled back.
+    """
+    category_id = category_ids(user_id).get(name)
+    if category_id is not None:
+        return category_id
+    
+    # The cache may lag another process; check the table before creating
+    category_id = _lookup_category_id(user_id, name)
+    if category_id is not None:
+        return category_id
+    
+    category = ExpenseCategory(user_id=int(user_id), name=name, color=DEFAULT_CATEGORY_COLOR)
+    try:
+        with db.session.begin_nested():
+            db.session.add(category)
+        db.session.info['categories_added'] = True
+        return category.id
+    except IntegrityError:
+        return _lookup_category_id(user_id, name)
+
+
+def _scope_category_table(conn):
+    """Swap expense_category's global unique name for a per-user one."""
+    if conn.dialect.name == 'sqlite':
+        # SQLite cannot drop the inline UNIQUE (name); copy into a rebuilt table
+        metadata = MetaData()
+        db.metadata.tables['user'].to_metadata(metadata)
+        scoped = ExpenseCategory.__table__.to_metadata(metadata, name='expense_category_scoped')
+        scoped.create(conn)
+        conn.execute(text(
+            'INSERT INTO expense_category_scoped (id, name, description, color, created_at) '
+            'SELECT id, name, description, color, created_at FROM expense_category'
+        ))
+        conn.execute(text('DROP TABLE expense_category'))
+        conn.execute(text('ALTER TABLE expense_category_scoped RENAME TO expense_category'))
+        return
+    
+    for constraint in inspect(conn).get_unique_constraints('expense_category'):
+        if constraint['column_names'] == ['name']:
+            conn.execute(text(f'ALTER TABLE expense_category DROP CONSTRAINT {constraint["name"]}'))
+    conn.execute(text('ALTER TABLE expense_category ADD COLUMN user_id INTEGER REFERENCES "user" (id)'))
+    conn.execute(text(
+        'ALTER TABLE expense_category ADD CONSTRAINT uq_expense_category_user_name UNIQUE (user_id, name)'
+    ))
+    conn.execute(text('CREATE INDEX ix_expense_category_user_id ON expense_category (user_id)'))
+
+
+def _make_single_tenant_categories_private(conn):
+    """Give each shared category that only one user references to that user."""
+    usage = 'SELECT user_id, category_id FROM expense'
+    if inspect(conn).has_table('recurring_template'):
+        usage += ' UNION SELECT user_id, category_id FROM recurring_template WHERE category_id IS NOT NULL'
+    return conn.execute(text(
+        f'UPDATE expense_category SET user_id = '
+        f'(SELECT MIN(u.user_id) FROM ({usage}) u WHERE u.category_id = expense_category.id) '
+        f'WHERE user_id IS NULL AND id IN '
+        f'(SELECT u.category_id FROM ({usage}) u GROUP BY u.category_id HAVING COUNT(DISTINCT u.user_id) = 1)'
+    )).rowcount
+
+
+def migrate_expense_categories():
+    """Move expenses onto per-user expense_category ids.
+    
+    Databases from before categories were scoped get expense_category.user_id
+    in place of the global unique name; categories only one user references
+    become private to that user and the rest stay shared. Legacy
+    expense.category strings are then encoded as ids, creating a category
+    for the user when neither they nor the shared list have the name, and
+    the string column is dropped. Returns {'encoded': expenses,
+    'made_private': categories}, or None if there was nothing to migrate.
+    """
+    inspector = inspect(db.engine)
+    columns = {column['name'] for column in inspector.get_columns('expense')}
+    unscoped = 'user_id' not in {column['name'] for column in inspector.get_columns('expense_category')}
+    if 'category' not in columns and not unscoped:
+        return None
+    
+    dialect = db.engine.dialect.name
+    encoded = 0
+    with db.engine.begin() as conn:
+        if unscoped:
+            _scope_category_table(conn)
+    
+        if 'category' in columns:
+            if 'category_id' not in columns:
+                conn.execute(text(
+                    'ALTER TABLE expense ADD COLUMN category_id INTEGER REFERENCES expense_category (id)'
+                ))
+    
+            visible = 'c.name = {0}.category AND (c.user_id = {0}.user_id OR c.user_id IS NULL)'
+            conn.execute(text(
+                'INSERT INTO expense_category (user_id, name, color, created_at) '
+                'SELECT DISTINCT e.user_id, e.category, :color, :created_at FROM expense e '
+                f'WHERE NOT EXISTS (SELECT 1 FROM expense_category c WHERE {visible.format("e")})'
+            ), {'color': DEFAULT_CATEGORY_COLOR, 'created_at': datetime.utcnow()})
+    
+            # A user's own category wins over a shared one of the same name
+            encoded = conn.execute(text(
+                'UPDATE expense SET category_id = '
+                f'(SELECT c.id FROM expense_category c WHERE {visible.format("expense")} '
+                'ORDER BY c.user_id IS NULL LIMIT 1) '
+                'WHERE category_id IS NULL'
+            )).rowcount
+    
+            conn.execute(text(
+                'CREATE INDEX IF NOT EXISTS ix_expense_user_category ON expense (user_id, category_id)'
+            ))
+            conn.execute(text('ALTER TABLE expense DROP COLUMN category'))
+            if dialect == 'postgresql':
+                conn.execute(text('ALTER TABLE expense ALTER COLUMN category_id SET NOT NULL'))
+    
+        made_private = _make_single_tenant_categories_private(conn) if unscoped else 0
+    
+    invalidate_categories()
+    return {'encoded': encoded, 'made_private': made_private}
@@ -0,0 +1,98 @@
+from models.invoice import Invoice
+from models.expense import Expense
+from models.payroll import PayrollRecord, Employee
+from services.employees import employee_directory
+from datetime import date
+from sqlalchemy import and_
+import csv
+import io
+
+
+def build_csv(user_id, report_type, start_date, end_date):
+    """Render an invoices, expenses or payroll report as CSV bytes."""
+    start_dt = start_date
+    end_dt = end_date
+    
+    # Create CSV data
+    output = io.StringIO()
+    writer = csv.writer(output)
+    
+    if report_type == 'invoices':
+        writer.writerow(['Invoice Number', 'Client', 'Issue Date', 'Due Date', 'Amount', 'Status'])
+        
+        invoices = Invoice.query.filter(
+            and_(
+                Invoice.user_id == user_id,
+                Invoice.issue_date >= start_dt,
+                Invoice.issue_date <= end_dt
+            )
+        ).all()
+        
+        for invoice in invoices:
+            writer.writerow([
+                invoice.invoice_number,
+                invoice.client_name,
+                invoice.issue_date.isoformat(),
+                invoice.due_date.isoformat(),
+                invoice.total_amount,
+                invoice.status
+            ])
+    
+    elif report_type == 'expenses':
+        writer.writerow(['Date', 'Category', 'Description', 'Amount', 'Vendor', 'Status'])
+        
+        expenses = Expense.query.filter(
+            and_(
+                Expense.user_id == user_id,
+                Expense.expense_date >= start_dt,
+                Expense.expense_date <= end_dt
+            )
+        ).all()
+        
+        for expense in expenses:
+            writer.writerow([
+                expense.expense_date.isoformat(),
+                expense.category,
+                expense.description,
+                expense.amount,
+                expense.vendor or '',
+                expense.status
+            ])
+    
+    elif report_type == 'payroll':
+        writer.writerow(['Employee', 'Pay Period', 'Gross Pay', 'Net Pay', 'Status'])
+        
+        records = PayrollRecord.query.join(Employee).filter(
+            and_(
+                Employee.user_id == user_id,
+                PayrollRecord.pay_period_start >= start_dt,
+                PayrollRecord.pay_period_start <= end_dt
+            )
+        ).all()
+        
+        employees = employee_directory(user_id)
+        for record in records:
+            employee = employees.get(record.employee_id) or record.employee
+            writer.writerow([
+                f"{employee.first_name} {employee.last_name}",
+                f"{record.pay_period_start.isoformat()} - {record.pay_period_end.isoformat()}",
+                record.gross_pay,
+                record.net_pay,
+                record.status
+            ])
+    
+    return output.getvalue().encode('utf-8')
+
+
+def export_csv_job(user_id, payload, config):
+    """Job handler for ``reports.export_csv``."""
+    report_type = payload['type']
+    start_date = date.fromisoformat(payload['start_date'])
+    end_date = date.fromisoformat(payload['end_date'])
+    data = build_csv(user_id, report_type, start_date, end_date)
+    return {
+        'data': data,
+        'filename': f'{report_type}_report_{start_date}_to_{end_date}.csv',
+        'mimetype': 'text/csv',
+        'bytes': len(data)
+    }
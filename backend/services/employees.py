@@ -0,0 +1,32 @@
+from collections import namedtuple
+from extensions import db
+from models.payroll import Employee
+from services.refcache import reference_cache
+
+# Detached, read-only view of the employee columns shown next to other records.
+# With the local cache backend an edit made in another worker can take
+# REFCACHE_TTL seconds to show up, so anything that computes pay or inserts
+# rows for an employee loads the Employee row instead.
+EmployeeRef = namedtuple('EmployeeRef', 'id first_name last_name')
+
+
+def _namespace(user_id):
+    return f'employees:{int(user_id)}'
+
+
+def employee_directory(user_id):
+    """Return {employee id: EmployeeRef} for a user's employees, cached."""
+    user_id = int(user_id)
+    
+    def load():
+        rows = db.session.query(
+            Employee.id, Employee.first_name, Employee.last_name
+        ).filter(Employee.user_id == user_id).all()
+        return {row.id: EmployeeRef(*row) for row in rows}
+    
+    return reference_cache.get(_namespace(user_id), 'directory', load)
+
+
+def invalidate_employee_directory(user_id):
+    """Call after committing any write to the user's employees."""
+    reference_cache.bump(_namespace(user_id))
@@ -0,0 +1,404 @@
+from collections import defaultdict, namedtuple
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy import and_, bindparam, func, insert, or_, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager
+from extensions import db
+from models.invoice import Invoice, Payment
+from models.expense import Expense
+from models.payroll import Employee, PayrollRecord
+from models.ledger import AccountBalanceCheckpoint, JournalEntry, JournalLine, LedgerAccount
+from models.user import User
+from services.refcache import reference_cache
+
+CENTS = Decimal('0.01')
+
+# Every user's chart of accounts: code -> (name, account type)
+CHART_OF_ACCOUNTS = {
+    '1000': ('Cash', 'asset'),
+    '1200': ('Accounts Receivable', 'asset'),
+    '2100': ('Sales Tax Payable', 'liability'),
+    '2200': ('Payroll Liabilities', 'liability'),
+    '4000': ('Sales Revenue', 'revenue'),
+    '6000': ('Operating Expenses', 'expense'),
+    '6100': ('Payroll Expense', 'expense'),
+}
+CASH, RECEIVABLES, SALES_TAX, PAYROLL_LIABILITIES, REVENUE, OPERATING_EXPENSES, PAYROLL_EXPENSE = CHART_OF_ACCOUNTS
+DEBIT_NORMAL_TYPES = ('asset', 'expense')
+
+# Drafts are not yet receivable, so they stay off the books
+POSTED_INVOICE_STATUSES = ('sent', 'paid', 'overdue')
+
+# What one source document should contribute to the ledger.
+# lines is a list of (account code, debit, credit); an empty list takes the
+# source off the books.
+Posting = namedtuple('Posting', 'source_type source_id entry_date lines description')
+
+
+def _money(value):
+    return Decimal(str(value or 0)).quantize(CENTS)
+
+
+def invoice_posting(invoice, deleted=False):
+    """Receivable against revenue and sales tax, dated on issue."""
+    lines = []
+    if not deleted and invoice.status in POSTED_INVOICE_STATUSES:
+        lines = [
+            (RECEIVABLES, _money(invoice.total_amount), 0),
+            (REVENUE, 0, _money(invoice.subtotal)),
+            (SALES_TAX, 0, _money(invoice.tax_amount)),
+        ]
+    return Posting('invoice', invoice.id, invoice.issue_date, lines, f'Invoice {invoice.invoice_number}')
+
+
+def payment_posting(payment):
+    """Cash received against the invoice's receivable."""
+    amount = _money(payment.amount)
+    lines = [(CASH, amount, 0), (RECEIVABLES, 0, amount)]
+    return Posting(
+        'payment', payment.id, payment.payment_date, lines, f'Payment for invoice {payment.invoice.invoice_number}'
+    )
+
+
+def expense_posting(expense, deleted=False):
+    """Operating expense paid from cash."""
+    amount = _money(expense.amount)
+    lines = [] if deleted else [(OPERATING_EXPENSES, amount, 0), (CASH, 0, amount)]
+    return Posting('expense', expense.id, expense.expense_date, lines, f'Expense: {expense.description}'[:200])
+
+
+def payroll_posting(record):
+    """Gross pay expensed; net pay from cash, withholdings held as a liability."""
+    gross_pay = _money(record.gross_pay)
+    net_pay = _money(record.net_pay)
+    lines = [(PAYROLL_EXPENSE, gross_pay, 0), (CASH, 0, net_pay), (PAYROLL_LIABILITIES, 0, gross_pay - net_pay)]
+    return Posting(
+        'payroll', record.id, record.pay_date, lines,
+        f'Payroll {record.pay_period_start} to {record.pay_period_end}'
+    )
+
+
+def _load_account_ids(user_id):
+    return dict(db.session.query(LedgerAccount.code, LedgerAccount.id).filter_by(user_id=user_id).all())
+
+
+def account_ids(user_id):
+    """Return {code: account id} for a user, creating missing accounts.
+
+    The chart is created on a user's first posting. The insert runs in a
+    savepoint so a concurrent first posting does not abort the caller's
+    transaction.
+    """
+    namespace = f'ledger:{user_id}'
+    ids = reference_cache.get(namespace, 'accounts', lambda: _load_account_ids(user_id))
+    if len(ids) == len(CHART_OF_ACCOUNTS):
+        return ids
+
+    missing = [code for code in CHART_OF_ACCOUNTS if code not in ids]
+    if missing:
+        # A stale cache entry only costs a failed insert and a reload
+        ids = dict(ids)
+        try:
+            with db.session.begin_nested():
+                created = db.session.execute(
+                    insert(LedgerAccount).returning(LedgerAccount.code, LedgerAccount.id),
+                    [
+                        {
+                            'user_id': user_id,
+                            'code': code,
+                            'name': CHART_OF_ACCOUNTS[code][0],
+                            'account_type': CHART_OF_ACCOUNTS[code][1]
+                        }
+                        for code in missing
+                    ]
+                ).all()
+            ids.update(created)
+        except IntegrityError:
+            ids = _load_account_ids(user_id)
+    # Don't cache ids that may still be rolled back with the caller's transaction
+    reference_cache.bump(namespace)
+    return ids
+
+
+def _posted_balances(user_id, postings):
+    """{(source_type, source_id): {(account id, date): debits - credits}} already on the books."""
+    keys = list({(posting.source_type, posting.source_id) for posting in postings})
+    rows = db.session.query(
+        JournalEntry.source_type,
+        JournalEntry.source_id,
+        JournalLine.account_id,
+        JournalLine.entry_date,
+        func.sum(JournalLine.debit - JournalLine.credit)
+    ).join(JournalEntry.lines).filter(
+        JournalEntry.user_id == user_id,
+        tuple_(JournalEntry.source_type, JournalEntry.source_id).in_(keys)
+    ).group_by(
+        JournalEntry.source_type, JournalEntry.source_id, JournalLine.account_id, JournalLine.entry_date
+    ).all()
+
+    posted = defaultdict(dict)
+    for source_type, source_id, account_id, entry_date, net in rows:
+        posted[(source_type, source_id)][(account_id, entry_date)] = _money(net)
+    return posted
+
+
+def sync_postings(user_id, postings):
+    """Bring the ledger in line with ``postings``; the caller commits.
+
+    The ledger is append-only: for each source the difference between what
+    it should contribute and what is already posted is written as a new
+    balanced journal entry (an adjustment on edit, a reversal on delete), so
+    calling this again with unchanged sources writes nothing. Balance
+    checkpoints on or after each affected date are shifted by the same
+    amounts, keeping them valid for backdated writes.
+
+    Returns the number of journal entries written.
+    """
+    if not postings:
+        return 0
+
+    user_id = int(user_id)
+    posted = _posted_balances(user_id, postings)
+    accounts = None
+
+    entries = []
+    for posting in postings:
+        key = (posting.source_type, posting.source_id)
+        if not posting.lines and not posted.get(key):
+            continue
+        if accounts is None:
+            accounts = account_ids(user_id)
+
+        delta = defaultdict(Decimal)
+        for code, debit, credit in posting.lines:
+            delta[(accounts[code], posting.entry_date)] += _money(debit) - _money(credit)
+        for account_date, net in posted.get(key, {}).items():
+            delta[account_date] -= net
+
+        # One entry per date; each is balanced because both sides were
+        by_date = defaultdict(list)
+        for (account_id, entry_date), net in delta.items():
+            if net:
+                by_date[entry_date].append((account_id, net))
+
+        if key not in posted:
+            description = posting.description
+        elif posting.lines:
+            description = f'{posting.description} (adjusted)'
+        else:
+            description = f'{posting.description} (reversed)'
+        for entry_date, lines in sorted(by_date.items()):
+            entries.append((posting, entry_date, description, lines))
+
+    if not entries:
+        return 0
+
+    entry_ids = db.session.execute(
+        insert(JournalEntry).returning(JournalEntry.id, sort_by_parameter_order=True),
+        [
+            {
+                'user_id': user_id,
+                'entry_date': entry_date,
+                'source_type': posting.source_type,
+                'source_id': posting.source_id,
+                'description': description
+            }
+            for posting, entry_date, description, _ in entries
+        ]
+    ).scalars().all()
+
+    line_rows = []
+    checkpoint_shifts = defaultdict(Decimal)
+    for entry_id, (_, entry_date, _, lines) in zip(entry_ids, entries):
+        for account_id, net in lines:
+            line_rows.append({
+                'entry_id': entry_id,
+                'account_id': account_id,
+                'entry_date': entry_date,
+                'debit': net if net > 0 else Decimal('0'),
+                'credit': -net if net < 0 else Decimal('0')
+            })
+            checkpoint_shifts[(account_id, entry_date)] += net
+    db.session.execute(insert(JournalLine), line_rows)
+
+    checkpoints = AccountBalanceCheckpoint.__table__
+    db.session.execute(
+        update(checkpoints).where(
+            checkpoints.c.account_id == bindparam('shift_account_id'),
+            checkpoints.c.as_of >= bindparam('shift_date')
+        ).values(balance=checkpoints.c.balance + bindparam('shift_amount')),
+        [
+            {'shift_account_id': account_id, 'shift_date': entry_date, 'shift_amount': net}
+            for (account_id, entry_date), net in checkpoint_shifts.items()
+            if net
+        ]
+    )
+    return len(entries)
+
+
+def _latest_checkpoints(user_id, as_of):
+    """Subquery of each account's newest checkpoint on or before ``as_of``."""
+    return select(
+        AccountBalanceCheckpoint.account_id,
+        func.max(AccountBalanceCheckpoint.as_of).label('as_of')
+    ).join(LedgerAccount).where(
+        LedgerAccount.user_id == user_id,
+        AccountBalanceCheckpoint.as_of <= as_of
+    ).group_by(AccountBalanceCheckpoint.account_id).subquery()
+
+
+def _tail_activity(user_id, latest, as_of):
+    """Net movement per (account, day) after each account's checkpoint through ``as_of``."""
+    return db.session.query(
+        JournalLine.account_id,
+        JournalLine.entry_date,
+        func.sum(JournalLine.debit - JournalLine.credit)
+    ).join(LedgerAccount).outerjoin(latest, JournalLine.account_id == latest.c.account_id).filter(
+        LedgerAccount.user_id == user_id,
+        JournalLine.entry_date <= as_of,
+        or_(latest.c.as_of.is_(None), JournalLine.entry_date > latest.c.as_of)
+    ).group_by(JournalLine.account_id, JournalLine.entry_date).all()
+
+
+def balances_as_of(user_id, as_of):
+    """Return {account id: debits minus credits through ``as_of``}.
+
+    Each balance is the account's newest checkpoint at or before the date
+    plus a scan of the lines after it, which the (account_id, entry_date)
+    index keeps to the days since that checkpoint.
+    """
+    user_id = int(user_id)
+    latest = _latest_checkpoints(user_id, as_of)
+
+    balances = defaultdict(Decimal)
+    checkpoint_rows = db.session.query(
+        AccountBalanceCheckpoint.account_id,
+        AccountBalanceCheckpoint.balance
+    ).join(latest, and_(
+        AccountBalanceCheckpoint.account_id == latest.c.account_id,
+        AccountBalanceCheckpoint.as_of == latest.c.as_of
+    )).all()
+    for account_id, balance in checkpoint_rows:
+        balances[account_id] += _money(balance)
+
+    for account_id, _, net in _tail_activity(user_id, latest, as_of):
+        balances[account_id] += _money(net)
+    return balances
+
+
+def signed_balance(account_type, balance):
+    """Present a debits-minus-credits balance on the account's normal side."""
+    return balance if account_type in DEBIT_NORMAL_TYPES else -balance
+
+
+def trial_balance(user_id, as_of):
+    user_id = int(user_id)
+    accounts = LedgerAccount.query.filter_by(user_id=user_id).order_by(LedgerAccount.code).all()
+    balances = balances_as_of(user_id, as_of)
+
+    rows = []
+    total_debits = total_credits = Decimal('0')
+    for account in accounts:
+        balance = balances.get(account.id, Decimal('0'))
+        debit = balance if balance > 0 else Decimal('0')
+        credit = -balance if balance < 0 else Decimal('0')
+        total_debits += debit
+        total_credits += credit
+        rows.append(dict(account.to_dict(), debit=float(debit), credit=float(credit)))
+
+    return {
+        'as_of': as_of.isoformat(),
+        'accounts': rows,
+        'total_debits': float(total_debits),
+        'total_credits': float(total_credits),
+        'balanced': total_debits == total_credits
+    }
+
+
+def _month_end(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+
+
+def roll_checkpoints(user_id, through=None):
+    """Store month-end balance checkpoints up to ``through``; the caller commits.
+
+    ``through`` defaults to the end of last month. A checkpoint is written
+    for every month with activity after the account's newest checkpoint,
+    so later balance reads only scan the lines since then. Returns the
+    number of checkpoints written.
+    """
+    user_id = int(user_id)
+    through = through or date.today().replace(day=1) - timedelta(days=1)
+    latest = _latest_checkpoints(user_id, through)
+
+    running = defaultdict(Decimal)
+    for account_id, balance in db.session.query(
+        AccountBalanceCheckpoint.account_id,
+        AccountBalanceCheckpoint.balance
+    ).join(latest, and_(
+        AccountBalanceCheckpoint.account_id == latest.c.account_id,
+        AccountBalanceCheckpoint.as_of == latest.c.as_of
+    )):
+        running[account_id] = _money(balance)
+
+    month_ends = defaultdict(dict)
+    activity = sorted(_tail_activity(user_id, latest, through), key=lambda row: (row[0], row[1]))
+    for account_id, entry_date, net in activity:
+        running[account_id] += _money(net)
+        month_ends[account_id][_month_end(entry_date)] = running[account_id]
+
+    rows = [
+        {'account_id': account_id, 'as_of': as_of, 'balance': balance}
+        for account_id, balances in month_ends.items()
+        for as_of, balance in balances.items()
+    ]
+    if rows:
+        db.session.execute(insert(AccountBalanceCheckpoint), rows)
+    return len(rows)
+
+
+def _iter_batches(query, model, batch_size):
+    """Yield lists of ``model`` rows in id order, one keyset page at a time."""
+    last_id = 0
+    while True:
+        rows = query.filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def backfill_ledger(user_id=None, batch_size=500):
+    """Post every existing invoice, payment, expense and payroll record, then roll checkpoints.
+
+    Safe to re-run: sources that are already posted correctly write
+    nothing. Commits after each batch. Returns {source type: entries
+    written, 'checkpoints': checkpoints written}.
+    """
+    user_ids = [user_id] if user_id else [uid for (uid,) in db.session.query(User.id).order_by(User.id)]
+    written = defaultdict(int)
+
+    for uid in user_ids:
+        sources = [
+            ('invoice', Invoice, Invoice.query.filter_by(user_id=uid), invoice_posting),
+            ('payment', Payment, Payment.query.join(Payment.invoice).filter(Invoice.user_id == uid).options(
+                contains_eager(Payment.invoice)
+            ), payment_posting),
+            ('expense', Expense, Expense.query.filter_by(user_id=uid), expense_posting),
+            ('payroll', PayrollRecord, PayrollRecord.query.join(Employee).filter(Employee.user_id == uid), payroll_posting),
+        ]
+        for source_type, model, query, build in sources:
+            for rows in _iter_batches(query, model, batch_size):
+                written[source_type] += sync_postings(uid, [build(row) for row in rows])
+                db.session.commit()
+
+        # Rebuild checkpoints from the full history, which also repairs any a
+        # concurrent write left stale
+        AccountBalanceCheckpoint.query.filter(
+            AccountBalanceCheckpoint.account_id.in_(select(LedgerAccount.id).where(LedgerAccount.user_id == uid))
+        ).delete(synchronize_session=False)
+        written['checkpoints'] += roll_checkpoints(uid)
+        db.session.commit()
+
+    return dict(written)
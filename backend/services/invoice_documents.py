@@ -0,0 +1,133 @@
+import io
+import os
+import shutil
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from multiprocessing import get_context
+from flask import current_app
+from sqlalchemy.orm import selectinload
+from models.invoice import Invoice
+from services.batching import chunked
+from services.invoice_pdf import layout_version, write_invoice_pdf
+
+BATCH_LOAD_SIZE = 500  # Invoices loaded (with items and payments) at a time in batch runs
+
+
+def pdf_dir():
+    """Root of the rendered PDF cache (INVOICE_PDF_DIR, default <instance>/invoice-pdfs)."""
+    return os.path.abspath(current_app.config['INVOICE_PDF_DIR'] or os.path.join(current_app.instance_path, 'invoice-pdfs'))
+
+
+def cached_pdf_path(invoice):
+    """Where this version of the invoice's PDF lives.
+
+    The name carries ``updated_at`` and the layout's hash, so an edit or a
+    new layout makes a fresh render and anything else is a cache hit.
+    """
+    version = invoice.updated_at.strftime('%Y%m%dT%H%M%S%f')
+    return os.path.join(pdf_dir(), str(invoice.user_id), str(invoice.id), f'{version}-{layout_version()}.pdf')
+
+
+def invoice_pdf(invoice):
+    """Path of the invoice's PDF, rendered only if this version is not cached yet."""
+    path = cached_pdf_path(invoice)
+    if not os.path.exists(path):
+        write_invoice_pdf(invoice.to_dict(), path)
+    return path
+
+
+def discard_invoice_pdfs(invoice):
+    """Remove a deleted invoice's rendered PDFs."""
+    shutil.rmtree(os.path.join(pdf_dir(), str(invoice.user_id), str(invoice.id)), ignore_errors=True)
+
+
+def render_invoice_pdfs(invoices, pool=None, processes=1):
+    """Make sure each invoice's current PDF is cached; returns (paths, rendered count).
+
+    Invoices already rendered at their ``updated_at`` are skipped. The rest
+    are spread over ``pool`` (a process pool of ``processes`` workers) when
+    one is given, else rendered here.
+    """
+    paths = [cached_pdf_path(invoice) for invoice in invoices]
+    pending = [(invoice.to_dict(), path) for invoice, path in zip(invoices, paths) if not os.path.exists(path)]
+    if pool is not None and len(pending) > 1:
+        list(pool.map(
+            write_invoice_pdf,
+            [data for data, _ in pending],
+            [path for _, path in pending],
+            chunksize=max(1, len(pending) // (processes * 4))
+        ))
+    else:
+        for data, path in pending:
+            write_invoice_pdf(data, path)
+    return paths, len(pending)
+
+
+def batch_invoices_query(start_date, end_date, user_id=None, status=None):
+    query = Invoice.query.filter(Invoice.issue_date >= start_date, Invoice.issue_date <= end_date)
+    if user_id is not None:
+        query = query.filter(Invoice.user_id == user_id)
+    if status:
+        query = query.filter(Invoice.status == status)
+    return query
+
+
+def render_batch(start_date, end_date, user_id=None, status=None, processes=None, on_chunk=None):
+    """Render every matching invoice's PDF, a chunk of invoices at a time.
+
+    Runs of at least INVOICE_PDF_POOL_MIN invoices render across a pool of
+    ``processes`` (default INVOICE_PDF_PROCESSES). Returns (invoice count,
+    rendered count); ``on_chunk(invoices, paths)`` is called after each
+    chunk is on disk.
+    """
+    config = current_app.config
+    processes = processes or config['INVOICE_PDF_PROCESSES']
+    invoice_ids = [
+        invoice_id for (invoice_id,) in batch_invoices_query(start_date, end_date, user_id, status)
+        .with_entities(Invoice.id).order_by(Invoice.issue_date, Invoice.id)
+    ]
+    # Workers are spawned on the first render, so a fully cached run starts none;
+    # they only import the renderer, not the app
+    pool = None
+    if processes > 1 and len(invoice_ids) >= config['INVOICE_PDF_POOL_MIN']:
+        pool = ProcessPoolExecutor(max_workers=processes, mp_context=get_context('spawn'))
+    rendered = 0
+    try:
+        for ids in chunked(invoice_ids, BATCH_LOAD_SIZE):
+            invoices = Invoice.query.options(
+                selectinload(Invoice.items), selectinload(Invoice.payments)
+            ).filter(Invoice.id.in_(ids)).order_by(Invoice.issue_date, Invoice.id).all()
+            paths, count = render_invoice_pdfs(invoices, pool, processes)
+            rendered += count
+            if on_chunk is not None:
+                on_chunk(invoices, paths)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return len(invoice_ids), rendered
+
+
+def render_pdfs_job(user_id, payload, config):
+    """Job handler for ``invoices.render_pdfs``: a zip of the period's invoice PDFs."""
+    start_date = date.fromisoformat(payload['start_date'])
+    end_date = date.fromisoformat(payload['end_date'])
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:  # PDF streams are already compressed
+        def add_to_archive(invoices, paths):
+            for invoice, path in zip(invoices, paths):
+                archive.write(path, f'{invoice.invoice_number}.pdf')
+
+        total, rendered = render_batch(
+            start_date, end_date, user_id=user_id, status=payload.get('status'), on_chunk=add_to_archive
+        )
+    data = output.getvalue()
+    return {
+        'data': data,
+        'filename': f'invoices_{start_date}_to_{end_date}.zip',
+        'mimetype': 'application/zip',
+        'invoices': total,
+        'rendered': rendered,
+        'cached': total - rendered,
+        'bytes': len(data)
+    }
@@ -0,0 +1,153 @@
+"""Invoice PDF renderer.
+
+Pages are drawn by the Jinja layout in ``invoice_layout.j2``, which is
+compiled once per process, and wrapped in a minimal PDF 1.4 document using
+the standard Type 1 fonts, so no PDF library is needed. The module imports
+nothing from the app, which keeps batch render processes quick to start.
+"""
+
+import functools
+import hashlib
+import os
+import tempfile
+import zlib
+from datetime import datetime
+from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+LAYOUT_DIR = os.path.dirname(os.path.abspath(__file__))
+LAYOUT_NAME = 'invoice_layout.j2'
+
+ITEMS_PER_PAGE = 24  # Item rows the layout fits on one page
+
+# Font resource name -> standard Type 1 font (glyph widths are built into readers)
+FONTS = (('F1', 'Helvetica'), ('F2', 'Helvetica-Bold'), ('F3', 'Courier'))
+COURIER_ADVANCE = 0.6  # Courier glyph width per point of font size
+
+
+def pdf_text(value):
+    """Text for a PDF string literal: single line, WinAnsi characters, escaped."""
+    text = ' '.join(str(value).split())
+    text = text.encode('cp1252', errors='replace').decode('cp1252')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def money(value):
+    return f'{round(float(value or 0), 2) + 0.0:,.2f}'  # + 0.0 turns -0.0 into 0.0
+
+
+def quantity(value):
+    return f'{float(value or 0):,.2f}'.rstrip('0').rstrip('.')
+
+
+def right(text, x, size=10):
+    """Start position for Courier ``text`` to end at ``x``."""
+    return f'{x - COURIER_ADVANCE * size * len(str(text)):.1f}'
+
+
+@functools.lru_cache(maxsize=None)
+def layout_template():
+    """The compiled page layout; parsed and compiled on first use in each process."""
+    environment = Environment(
+        loader=FileSystemLoader(LAYOUT_DIR),
+        undefined=StrictUndefined,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        auto_reload=False
+    )
+    environment.filters.update(pdf=pdf_text, money=money, quantity=quantity)
+    environment.globals['right'] = right
+    return environment.get_template(LAYOUT_NAME)
+
+
+@functools.lru_cache(maxsize=None)
+def layout_version():
+    """Short hash of the layout source; part of every cached PDF's key."""
+    with open(os.path.join(LAYOUT_DIR, LAYOUT_NAME), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def _pdf_date(value):
+    return datetime.fromisoformat(value).strftime("D:%Y%m%d%H%M%SZ")
+
+
+def build_pdf(page_streams, title, modified):
+    """Assemble content streams into PDF bytes, one page per stream."""
+    first_page = 3 + len(FONTS)
+    page_ids = [first_page + 2 * i for i in range(len(page_streams))]
+    info_id = first_page + 2 * len(page_streams)
+    fonts = ' '.join(f'/{name} {3 + i} 0 R' for i, (name, _) in enumerate(FONTS))
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>".encode()
+    ]
+    for _, base_font in FONTS:
+        objects.append(f'<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding /WinAnsiEncoding >>'.encode())
+    for page_id, stream in zip(page_ids, page_streams):
+        content = zlib.compress(stream.encode('cp1252'))
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << {fonts} >> >> /Contents {page_id + 1} 0 R >>'.encode()
+        )
+        objects.append(
+            f'<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n'.encode() + content + b'\nendstream'
+        )
+    objects.append(
+        f'<< /Title ({pdf_text(title)}) /Producer (SmoothBooks) /ModDate ({modified}) >>'.encode('cp1252')
+    )
+
+    out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info {info_id} 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return bytes(out)
+
+
+def render_invoice_pdf(invoice):
+    """PDF bytes for an ``Invoice.to_dict()`` payload.
+
+    The output depends only on the payload and the layout, so the same
+    invoice version always renders to the same bytes.
+    """
+    template = layout_template()
+    items = invoice['items']
+    pages = max(1, -(-len(items) // ITEMS_PER_PAGE))
+    streams = [
+        template.render(
+            invoice=invoice,
+            items=items[page * ITEMS_PER_PAGE:(page + 1) * ITEMS_PER_PAGE],
+            page=page + 1,
+            pages=pages,
+            last_page=page == pages - 1
+        )
+        for page in range(pages)
+    ]
+    return build_pdf(streams, f"Invoice {invoice['invoice_number']}", _pdf_date(invoice['updated_at']))
+
+
+def write_invoice_pdf(invoice, path):
+    """Render ``invoice`` to ``path`` atomically and return the path.
+
+    Older versions of the same invoice in the folder are removed. Batch
+    renders call this in worker processes.
+    """
+    data = render_invoice_pdf(invoice)
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as out:
+        out.write(data)
+    os.replace(tmp_path, path)
+    for name in os.listdir(folder):
+        stale = os.path.join(folder, name)
+        if stale != path and name.endswith('.pdf'):
+            try:
+                os.unlink(stale)
+            except OSError:
+                pass  # Already removed by another render, or open for download on Windows
+    return path
@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+CENTS = Decimal('0.01')
+
+
+def to_decimal(value):
+    return Decimal(str(value))
+
+
+def generate_invoice_number():
+    return f"INV-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
+
+
+def line_total(quantity, unit_price):
+    return (to_decimal(quantity) * to_decimal(unit_price)).quantize(CENTS)
+
+
+def calculate_totals(items, tax_rate):
+    """Return (line_totals, subtotal, tax_amount, total_amount) for a list of items."""
+    line_totals = [line_total(item['quantity'], item['unit_price']) for item in items]
+    subtotal = sum(line_totals, Decimal('0'))
+    tax_amount = (subtotal * to_decimal(tax_rate) / 100).quantize(CENTS)
+    return line_totals, subtotal, tax_amount, subtotal + tax_amount
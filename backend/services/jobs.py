@@ -0,0 +1,220 @@
+import importlib
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from extensions import db
+from models.job import Job
+from sqlalchemy import func, inspect, text, update
+from sqlalchemy.exc import SQLAlchemyError
+
+# Job type -> "module:function". Handlers are imported on first use and
+# called as handler(user_id, payload, config); they return a JSON-able dict.
+# A dict may carry downloadable output under 'data' (bytes) together with
+# 'filename' and 'mimetype'.
+JOB_HANDLERS = {
+    'payroll.process': 'services.payroll_run:process_payroll_job',
+    'reports.export_csv': 'services.csv_export:export_csv_job',
+    'reports.export_ledger': 'services.columnar_export:export_ledger_job',
+    'invoices.render_pdfs': 'services.invoice_documents:render_pdfs_job',
+}
+
+
+def wants_async(args):
+    """True when a request asks for its work to be queued (``?async=1``)."""
+    return args.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def enqueue_job(user_id, job_type, payload=None):
+    """Persist a queued job and return it; the caller's transaction is committed."""
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job type: {job_type}')
+    
+    job = Job(
+        user_id=user_id,
+        job_type=job_type,
+        payload=json.dumps(payload or {}),
+        status='queued'
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def resolve_handler(job_type):
+    module_name, func_name = JOB_HANDLERS[job_type].split(':')
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def claim_next_job(worker_name):
+    """Atomically move the oldest queued job to running and return it.
+
+    The conditional UPDATE makes the claim safe when several worker
+    processes poll the same table.
+    """
+    while True:
+        job_id = db.session.query(Job.id).filter(Job.status == 'queued').order_by(Job.id).limit(1).scalar()
+        if job_id is None:
+            db.session.commit()
+            return None
+        
+        claimed = db.session.execute(
+            update(Job).where(Job.id == job_id, Job.status == 'queued').values(
+                status='running',
+                worker=worker_name,
+                started_at=datetime.utcnow(),
+                heartbeat_at=datetime.utcnow(),
+                attempts=Job.attempts + 1
+            )
+        ).rowcount
+        db.session.commit()
+        
+        if claimed:
+            return db.session.get(Job, job_id)
+
+
+def run_job(job, config):
+    """Execute a claimed job and record its result or error."""
+    job_id = job.id
+    try:
+        handler = resolve_handler(job.job_type)
+        output = handler(job.user_id, json.loads(job.payload or '{}'), config) or {}
+    except Exception as e:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.status = 'failed'
+        job.error = f'{type(e).__name__}: {e}'
+    else:
+        job = db.session.get(Job, job_id)
+        data = output.pop('data', None)
+        if data is not None:
+            job.result_data = data
+            job.result_filename = output.pop('filename', f'job_{job_id}')
+            job.result_mimetype = output.pop('mimetype', 'application/octet-stream')
+        job.result = json.dumps(output)
+        job.status = 'succeeded'
+    
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    return job
+
+
+class Heartbeat:
+    """Touch a running job's heartbeat_at from a background thread.
+
+    Uses its own connections, so beats continue while the handler holds a
+    transaction. A beat that fails (e.g. SQLite is busy) is skipped; the
+    stale cutoff spans several intervals.
+    """
+
+    def __init__(self, engine, job_id, worker_name, interval):
+        self.engine = engine
+        self.job_id = job_id
+        self.worker_name = worker_name
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f'job-heartbeat-{job_id}', daemon=True)
+
+    def beat(self):
+        with self.engine.begin() as conn:
+            conn.execute(update(Job).where(
+                Job.id == self.job_id, Job.worker == self.worker_name, Job.status == 'running'
+            ).values(heartbeat_at=datetime.utcnow()))
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.beat()
+            except SQLAlchemyError:
+                pass
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+
+def requeue_stale_jobs(stale_after, max_attempts):
+    """Recover running jobs whose worker has stopped sending heartbeats.
+
+    A job with no heartbeat for ``stale_after`` seconds lost its worker.
+    It goes back to the queue, or is marked failed once it has been tried
+    ``max_attempts`` times, so a job that kills its worker cannot loop.
+    Jobs of live workers are left alone. Returns (requeued, failed).
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=stale_after)
+    # Rows claimed before heartbeats existed fall back to started_at
+    stale = (Job.status == 'running', func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff)
+    failed = db.session.execute(
+        update(Job).where(*stale, Job.attempts >= max_attempts).values(
+            status='failed',
+            worker=None,
+            finished_at=now,
+            error=f'Worker stopped responding; gave up after {max_attempts} attempts'
+        )
+    ).rowcount
+    requeued = db.session.execute(update(Job).where(*stale).values(status='queued', worker=None)).rowcount
+    db.session.commit()
+    return requeued, failed
+
+
+def add_heartbeat_column():
+    """Add job.heartbeat_at to a database created before it existed; returns False if present."""
+    if 'heartbeat_at' in {column['name'] for column in inspect(db.engine).get_columns('job')}:
+        return False
+    with db.engine.begin() as conn:
+        conn.execute(text('ALTER TABLE job ADD COLUMN heartbeat_at TIMESTAMP'))
+    return True
+
+
+def work(app, poll_interval=1.0, burst=False):
+    """Process jobs until interrupted, or until the queue is empty in burst mode."""
+    worker_name = f'{socket.gethostname()}:{os.getpid()}'
+    with app.app_context():
+        while True:
+            job = claim_next_job(worker_name)
+            if job is None:
+                if burst:
+                    return
+                time.sleep(poll_interval)
+                continue
+            
+            with Heartbeat(db.engine, job.id, worker_name, app.config['JOB_HEARTBEAT_INTERVAL']):
+                run_job(job, app.config)
+            db.session.remove()
+
+
+def _worker_process(config_name, poll_interval, burst):
+    from app import create_app
+    work(create_app(config_name), poll_interval, burst)
+
+
+def run_worker_pool(config_name, processes, poll_interval=1.0, burst=False):
+    """Run ``processes`` local worker processes polling the job table.
+
+    Uses the spawn start method so each worker builds its own app and
+    database engine, which also keeps the pool working on Windows.
+    """
+    context = get_context('spawn')
+    workers = [
+        context.Process(target=_worker_process, args=(config_name, poll_interval, burst), name=f'job-worker-{i}')
+        for i in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        for process in workers:
+            process.terminate()
+        for process in workers:
+            process.join()
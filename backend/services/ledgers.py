@@ -0,0 +1,72 @@
+from sqlalchemy import select
+from extensions import db
+from models.invoice import Invoice, InvoiceItem, Payment
+from models.expense import Expense, ExpenseCategory
+from models.payroll import Employee, PayrollRecord, TimeEntry
+
+
+def _invoices(user_id, start_date, end_date):
+    return select(*Invoice.__table__.columns).where(
+        Invoice.user_id == user_id,
+        Invoice.issue_date.between(start_date, end_date)
+    ).order_by(Invoice.id)
+
+
+def _invoice_items(user_id, start_date, end_date):
+    return select(*InvoiceItem.__table__.columns).join(Invoice).where(
+        Invoice.user_id == user_id,
+        Invoice.issue_date.between(start_date, end_date)
+    ).order_by(InvoiceItem.invoice_id, InvoiceItem.id)
+
+
+def _payments(user_id, start_date, end_date):
+    return select(*Payment.__table__.columns).join(Invoice).where(
+        Invoice.user_id == user_id,
+        Payment.payment_date.between(start_date, end_date)
+    ).order_by(Payment.id)
+
+
+def _expenses(user_id, start_date, end_date):
+    columns = [column for column in Expense.__table__.columns if column.name != 'category_id']
+    return select(*columns, ExpenseCategory.name.label('category')).join(ExpenseCategory).where(
+        Expense.user_id == user_id,
+        Expense.expense_date.between(start_date, end_date)
+    ).order_by(Expense.id)
+
+
+def _payroll_records(user_id, start_date, end_date):
+    return select(*PayrollRecord.__table__.columns).join(Employee).where(
+        Employee.user_id == user_id,
+        PayrollRecord.pay_period_start.between(start_date, end_date)
+    ).order_by(PayrollRecord.id)
+
+
+def _time_entries(user_id, start_date, end_date):
+    return select(*TimeEntry.__table__.columns).join(Employee).where(
+        Employee.user_id == user_id,
+        TimeEntry.date.between(start_date, end_date)
+    ).order_by(TimeEntry.id)
+
+
+# Ledger name -> select over a user's rows dated within [start_date, end_date]
+LEDGER_DATASETS = {
+    'invoices': _invoices,
+    'invoice_items': _invoice_items,
+    'payments': _payments,
+    'expenses': _expenses,
+    'payroll_records': _payroll_records,
+    'time_entries': _time_entries,
+}
+
+
+def ledger_query(dataset, user_id, start_date, end_date):
+    if dataset not in LEDGER_DATASETS:
+        raise ValueError(f'Unknown dataset: {dataset}')
+    return LEDGER_DATASETS[dataset](int(user_id), start_date, end_date)
+
+
+def iter_row_batches(statement, batch_size):
+    """Yield lists of result rows without loading the whole result."""
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        yield rows
@@ -0,0 +1,95 @@
+import json
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+from sqlalchemy import select
+from extensions import db
+from models.invoice import InvoiceItem, Payment
+from services.ledgers import ledger_query, iter_row_batches
+
+# Ledgers available to the NDJSON export; invoice items and payments are
+# nested inside their invoice rather than exported on their own
+NDJSON_DATASETS = ('invoices', 'expenses', 'payroll_records', 'time_entries')
+
+RECORD_TYPES = {
+    'invoices': 'invoice',
+    'expenses': 'expense',
+    'payroll_records': 'payroll_record',
+    'time_entries': 'time_entry',
+}
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _encode(record):
+    return json.dumps(record, default=_json_default, separators=(',', ':')) + '\n'
+
+
+def _children_by_invoice(model, invoice_ids):
+    children = defaultdict(list)
+    rows = db.session.execute(
+        select(*model.__table__.columns).where(model.invoice_id.in_(invoice_ids)).order_by(model.id)
+    )
+    for row in rows:
+        children[row.invoice_id].append(dict(row._mapping))
+    return children
+
+
+def _invoice_batches(user_id, start_date, end_date, batch_size):
+    statement = ledger_query('invoices', user_id, start_date, end_date)
+    for rows in iter_row_batches(statement, batch_size):
+        invoice_ids = [row.id for row in rows]
+        items = _children_by_invoice(InvoiceItem, invoice_ids)
+        payments = _children_by_invoice(Payment, invoice_ids)
+        batch = []
+        for row in rows:
+            record = {'record_type': 'invoice', **row._mapping}
+            record['items'] = items.get(row.id, [])
+            record['payments'] = payments.get(row.id, [])
+            batch.append(record)
+        yield batch
+
+
+def _flat_batches(dataset, user_id, start_date, end_date, batch_size):
+    record_type = RECORD_TYPES[dataset]
+    statement = ledger_query(dataset, user_id, start_date, end_date)
+    for rows in iter_row_batches(statement, batch_size):
+        yield [{'record_type': record_type, **row._mapping} for row in rows]
+
+
+def iter_ledger_ndjson(user_id, datasets, start_date, end_date, batch_size):
+    """Yield the requested ledgers as newline-delimited JSON, one chunk per batch.
+    
+    The first line describes the export; every following line is one record
+    tagged with its ``record_type``. Only one batch is held in memory.
+    """
+    yield _encode({
+        'record_type': 'export',
+        'datasets': list(datasets),
+        'start_date': start_date,
+        'end_date': end_date
+    })
+    for dataset in datasets:
+        if dataset == 'invoices':
+            batches = _invoice_batches(user_id, start_date, end_date, batch_size)
+        else:
+            batches = _flat_batches(dataset, user_id, start_date, end_date, batch_size)
+        for batch in batches:
+            yield ''.join(_encode(record) for record in batch)
+
+
+def gzip_stream(chunks, level=6):
+    """Compress a stream of text chunks into a single gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
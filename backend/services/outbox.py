@@ -0,0 +1,291 @@
+import os
+import smtplib
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from sqlalchemy import update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
+from extensions import db
+from models.invoice import Invoice
+from models.outbox import OutboxMessage
+from services.invoice_documents import invoice_pdf
+
+# Errors about one message; the SMTP session stays usable for the rest of the batch
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+def queue_invoice_email(invoice):
+    """Add the "invoice sent" email to the session; it commits with the status change.
+
+    Returns the message, or None when the invoice has no client email.
+    """
+    if not invoice.client_email:
+        return None
+    message = OutboxMessage(
+        user_id=invoice.user_id,
+        invoice_id=invoice.id,
+        recipient=invoice.client_email,
+        subject=f'Invoice {invoice.invoice_number}',
+        body=(
+            f'Hello {invoice.client_name},\n\n'
+            f'Please find attached invoice {invoice.invoice_number} for {float(invoice.total_amount):,.2f}, '
+            f'due {invoice.due_date.isoformat()}.\n\n'
+            'Thank you for your business.\n'
+        )
+    )
+    db.session.add(message)
+    return message
+
+
+class SMTPConnection:
+    """One SMTP session reused across messages and batches, reopened if the server drops it."""
+
+    def __init__(self, config):
+        self.config = config
+        self.client = None
+
+    def open(self):
+        config = self.config
+        client = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=config['MAIL_TIMEOUT'])
+        if config['MAIL_USE_TLS']:
+            client.starttls()
+        if config['MAIL_USERNAME']:
+            client.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        self.client = client
+
+    def send(self, message):
+        if self.client is None:
+            self.open()
+        try:
+            self.client.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Idle sessions time out between batches; retry once on a fresh one
+            self.open()
+            self.client.send_message(message)
+
+    def close(self):
+        if self.client is None:
+            return
+        try:
+            self.client.quit()
+        except (smtplib.SMTPException, OSError):
+            self.client.close()
+        self.client = None
+
+
+def build_email(message, invoice, config):
+    email = EmailMessage()
+    email['From'] = config['MAIL_DEFAULT_SENDER']
+    email['To'] = message.recipient
+    email['Subject'] = message.subject
+    # Stable per row, so a message resent after a crash can be recognised as a duplicate
+    domain = config['MAIL_DEFAULT_SENDER'].rpartition('@')[2].rstrip('>') or 'localhost'
+    email['Message-ID'] = f'<outbox-{message.id}.{message.created_at:%Y%m%d%H%M%S}@{domain}>'
+    email.set_content(message.body)
+    if invoice is not None:
+        with open(invoice_pdf(invoice), 'rb') as f:
+            email.add_attachment(
+                f.read(), maintype='application', subtype='pdf', filename=f'{invoice.invoice_number}.pdf'
+            )
+    return email
+
+
+def is_permanent(error):
+    """True for 5xx SMTP replies, which retrying will not fix."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def retry_delay(attempts, config):
+    """Exponential backoff: OUTBOX_RETRY_BASE seconds doubled per failed attempt, capped."""
+    return min(config['OUTBOX_RETRY_BASE'] * 2 ** (attempts - 1), config['OUTBOX_RETRY_MAX'])
+
+
+def record_failure(message, error, config, now):
+    message.last_error = f'{type(error).__name__}: {error}'[:1000]
+    message.worker = None
+    if is_permanent(error) or message.attempts >= config['OUTBOX_MAX_ATTEMPTS']:
+        message.status = 'failed'
+    else:
+        message.status = 'pending'
+        message.next_attempt_at = now + timedelta(seconds=retry_delay(message.attempts, config))
+
+
+def claim_batch(worker_name, size):
+    """Move up to ``size`` due messages to sending and return them.
+
+    The conditional UPDATE keeps two dispatchers from claiming the same rows.
+    """
+    now = datetime.utcnow()
+    message_ids = [
+        message_id for (message_id,) in db.session.query(OutboxMessage.id).filter(
+            OutboxMessage.status == 'pending', OutboxMessage.next_attempt_at <= now
+        ).order_by(OutboxMessage.next_attempt_at, OutboxMessage.id).limit(size)
+    ]
+    if not message_ids:
+        db.session.commit()
+        return []
+
+    db.session.execute(
+        update(OutboxMessage).where(OutboxMessage.id.in_(message_ids), OutboxMessage.status == 'pending').values(
+            status='sending', worker=worker_name, claimed_at=now, attempts=OutboxMessage.attempts + 1
+        )
+    )
+    db.session.commit()
+    return OutboxMessage.query.filter(
+        OutboxMessage.id.in_(message_ids), OutboxMessage.worker == worker_name, OutboxMessage.claimed_at == now
+    ).order_by(OutboxMessage.id).all()
+
+
+class ClaimHeartbeat:
+    """Refresh ``claimed_at`` on a dispatcher's sending messages from a background thread.
+
+    A live dispatcher keeps its claim fresh however slowly the batch goes,
+    so ``requeue_stale_messages`` only takes messages from one that died.
+    Uses its own connections; a beat that fails (e.g. SQLite is busy) is
+    skipped, as the stale cutoff spans several intervals.
+    """
+
+    def __init__(self, engine, worker_name, interval):
+        self.engine = engine
+        self.worker_name = worker_name
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='outbox-heartbeat', daemon=True)
+
+    def beat(self):
+        with self.engine.begin() as conn:
+            conn.execute(update(OutboxMessage).where(
+                OutboxMessage.worker == self.worker_name, OutboxMessage.status == 'sending'
+            ).values(claimed_at=datetime.utcnow()))
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.beat()
+            except SQLAlchemyError:
+                pass
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+
+def dispatch_batch(connection, worker_name, config):
+    """Claim and send one batch over ``connection``; returns the number of messages claimed.
+
+    Message-level rejections are recorded per message. If the server cannot
+    be reached or breaks the session, the rest of the batch is retried later.
+    Each outcome commits as soon as it is known, so a dispatcher that dies
+    mid-batch does not resend the messages it already delivered.
+    """
+    messages = claim_batch(worker_name, config['OUTBOX_BATCH_SIZE'])
+    if not messages:
+        return 0
+    
+    # The batch's messages and invoices stay loaded across the per-message commits
+    session = db.session()
+    session.expire_on_commit = False
+
+    invoice_ids = {message.invoice_id for message in messages if message.invoice_id is not None}
+    invoices = {
+        invoice.id: invoice
+        for invoice in Invoice.query.options(selectinload(Invoice.items), selectinload(Invoice.payments))
+        .filter(Invoice.id.in_(invoice_ids))
+    } if invoice_ids else {}
+
+    try:
+        with ClaimHeartbeat(db.engine, worker_name, config['OUTBOX_HEARTBEAT_INTERVAL']):
+            _send_batch(connection, messages, invoices, config)
+    finally:
+        session.expire_on_commit = True
+    return len(messages)
+
+
+def _send_batch(connection, messages, invoices, config):
+    for position, message in enumerate(messages):
+        try:
+            connection.send(build_email(message, invoices.get(message.invoice_id), config))
+        except MESSAGE_ERRORS as e:
+            record_failure(message, e, config, datetime.utcnow())
+        except (smtplib.SMTPException, OSError) as e:
+            connection.close()
+            for unsent in messages[position:]:
+                record_failure(unsent, e, config, datetime.utcnow())
+            db.session.commit()
+            break
+        except Exception as e:
+            record_failure(message, e, config, datetime.utcnow())  # e.g. the attachment failed to render
+        else:
+            message.status = 'sent'
+            message.sent_at = datetime.utcnow()
+            message.worker = None
+            message.last_error = None
+        db.session.commit()
+
+
+def requeue_stale_messages(stale_after, max_attempts):
+    """Recover messages stuck in sending because a dispatcher died mid-batch.
+
+    Live dispatchers keep ``claimed_at`` fresh (see ``ClaimHeartbeat``),
+    so only messages whose claim is ``stale_after`` seconds old are taken back.
+    They return to pending, or are marked failed once they have been
+    claimed ``max_attempts`` times, so a message that crashes the
+    dispatcher cannot loop forever. Returns (requeued, failed).
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=stale_after)
+    stale = (OutboxMessage.status == 'sending', OutboxMessage.claimed_at < cutoff)
+    failed = db.session.execute(
+        update(OutboxMessage).where(*stale, OutboxMessage.attempts >= max_attempts).values(
+            status='failed',
+            worker=None,
+            last_error=f'Dispatcher stopped while sending; gave up after {max_attempts} attempts'
+        )
+    ).rowcount
+    requeued = db.session.execute(update(OutboxMessage).where(*stale).values(status='pending', worker=None)).rowcount
+    db.session.commit()
+    return requeued, failed
+
+
+def run_dispatcher(app, poll_interval=None, burst=False):
+    """Deliver outbox messages until interrupted, or until none are due in burst mode.
+
+    Burst mode returns the number of messages processed. The SMTP session
+    stays open while batches keep coming and closes when the outbox runs dry.
+    """
+    config = app.config
+    poll_interval = poll_interval or config['OUTBOX_POLL_INTERVAL']
+    worker_name = f'{socket.gethostname()}:{os.getpid()}'
+    connection = SMTPConnection(config)
+    processed = 0
+    with app.app_context():
+        try:
+            while True:
+                claimed = dispatch_batch(connection, worker_name, config)
+                db.session.remove()
+                processed += claimed
+                if claimed:
+                    continue
+                connection.close()
+                if burst:
+                    return processed
+                time.sleep(poll_interval)
+        finally:
+            connection.close()
+
+
+def outbox_counts(user_id):
+    """Message count per status for the user's outbox."""
+    rows = db.session.query(OutboxMessage.status, db.func.count(OutboxMessage.id)).filter(
+        OutboxMessage.user_id == user_id
+    ).group_by(OutboxMessage.status)
+    return {status: count for status, count in rows}
@@ -0,0 +1,138 @@
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+from extensions import db
+from models.payroll import Employee, TimeEntry
+from sqlalchemy import func
+
+
+def workweek_start(day, week_start_day=0):
+    """Return the first day of the workweek containing ``day``.
+
+    ``week_start_day`` follows ``date.weekday()`` (0 = Monday).
+    """
+    return day - timedelta(days=(day.weekday() - week_start_day) % 7)
+
+
+def split_days(daily_hours, daily_threshold=None, weekly_threshold=None):
+    """Split one workweek of (date, hours) pairs into per-day (date, regular, overtime).
+
+    Hours over the daily threshold are overtime for that day. Remaining
+    regular hours that push the week past the weekly threshold are
+    overtime as well. A threshold of None or 0 disables that rule.
+    """
+    regular = 0.0
+    split = []
+    for day, hours in daily_hours:
+        day_overtime = max(0.0, hours - daily_threshold) if daily_threshold else 0.0
+        day_regular = hours - day_overtime
+        
+        if weekly_threshold and regular + day_regular > weekly_threshold:
+            spill = regular + day_regular - weekly_threshold
+            day_regular -= spill
+            day_overtime += spill
+        
+        regular += day_regular
+        split.append((day, day_regular, day_overtime))
+    return split
+
+
+def split_week(daily_hours, daily_threshold=None, weekly_threshold=None):
+    """Split one workweek of (date, hours) pairs into regular and overtime hours."""
+    split = split_days(daily_hours, daily_threshold, weekly_threshold)
+    return round(sum(day[1] for day in split), 2), round(sum(day[2] for day in split), 2)
+
+
+def compute_overtime(rows, daily_threshold=8, weekly_threshold=40, week_start_day=0, start_date=None, end_date=None):
+    """Compute regular/overtime hours per employee per workweek.
+
+    ``rows`` is a sequence of (employee_id, date, hours) tuples, typically
+    one per employee per day and sorted by employee then date. Returns a
+    dict keyed by employee id with period totals and a per-week breakdown.
+
+    Weeks are always split whole, so the weekly threshold sees every day of
+    a week that straddles ``start_date`` or ``end_date``; only the days
+    inside the period are counted towards the result.
+    """
+    rows = sorted(rows, key=lambda row: (row[0], row[1]))
+    summary = {}
+    
+    for employee_id, employee_rows in groupby(rows, key=lambda row: row[0]):
+        # Collapse to daily totals, then bucket the days by workweek
+        days = defaultdict(float)
+        for _, day, hours in employee_rows:
+            days[day] += float(hours)
+        
+        weeks = []
+        total_regular = 0.0
+        total_overtime = 0.0
+        for week, week_days in groupby(sorted(days.items()), key=lambda item: workweek_start(item[0], week_start_day)):
+            in_period = [
+                (regular, overtime)
+                for day, regular, overtime in split_days(week_days, daily_threshold, weekly_threshold)
+                if (start_date is None or day >= start_date) and (end_date is None or day <= end_date)
+            ]
+            if not in_period:
+                continue
+            regular = round(sum(day[0] for day in in_period), 2)
+            overtime = round(sum(day[1] for day in in_period), 2)
+            weeks.append({
+                'week_start': week.isoformat(),
+                'regular_hours': regular,
+                'overtime_hours': overtime
+            })
+            total_regular += regular
+            total_overtime += overtime
+        
+        if weeks:
+            summary[employee_id] = {
+                'regular_hours': round(total_regular, 2),
+                'overtime_hours': round(total_overtime, 2),
+                'weeks': weeks
+            }
+    
+    return summary
+
+
+def load_daily_hours(user_id, start_date, end_date, employee_ids=None):
+    """Query time entries aggregated to (employee_id, date, hours) rows."""
+    query = db.session.query(
+        TimeEntry.employee_id,
+        TimeEntry.date,
+        func.sum(TimeEntry.hours_worked)
+    ).join(Employee).filter(
+        Employee.user_id == user_id,
+        TimeEntry.date >= start_date,
+        TimeEntry.date <= end_date
+    )
+    
+    if employee_ids is not None:
+        query = query.filter(TimeEntry.employee_id.in_(employee_ids))
+    
+    return query.group_by(TimeEntry.employee_id, TimeEntry.date).order_by(
+        TimeEntry.employee_id, TimeEntry.date
+    ).all()
+
+
+def overtime_for_period(user_id, start_date, end_date, config, employee_ids=None):
+    """Run the overtime engine over a pay period using thresholds from ``config``.
+
+    Hours are loaded for the whole workweeks the period touches, so a week
+    split across two pay periods reaches its weekly threshold in whichever
+    period it does.
+    """
+    week_start_day = config['WORKWEEK_START_DAY']
+    rows = load_daily_hours(
+        user_id,
+        workweek_start(start_date, week_start_day),
+        workweek_start(end_date, week_start_day) + timedelta(days=6),
+        employee_ids
+    )
+    return compute_overtime(
+        rows,
+        daily_threshold=config['OVERTIME_DAILY_THRESHOLD'],
+        weekly_threshold=config['OVERTIME_WEEKLY_THRESHOLD'],
+        week_start_day=week_start_day,
+        start_date=start_date,
+        end_date=end_date
+    )
@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+from extensions import db
+from models.payroll import Employee, PayrollRecord
+from services.overtime import overtime_for_period, workweek_start
+from services.payroll_tax import load_tax_tables, periods_per_year, calculate_withholdings_ytd
+from services.general_ledger import payroll_posting, sync_postings
+from services.report_cache import invalidate_reports
+from services.tax_snapshots import invalidate_tax_snapshots
+
+
+def run_payroll(user_id, config, end_date=None):
+    """Create pending payroll records for a user's active employees.
+
+    Covers the last two complete workweeks up to ``end_date`` (today by
+    default), so a run on any day of a week pays the same period and no day
+    falls in two periods. Skips employees that already have a record for
+    that period and commits. Returns the created records.
+    """
+    # Get all active employees
+    employees = Employee.query.filter_by(user_id=user_id, status='active').all()
+    
+    # Current pay period: 14 days ending the day before the next workweek starts
+    end_date = workweek_start((end_date or date.today()) + timedelta(days=1), config['WORKWEEK_START_DAY']) - timedelta(days=1)
+    start_date = end_date - timedelta(days=13)
+    
+    # Regular/overtime hours per employee from the overtime engine
+    employee_hours = overtime_for_period(user_id, start_date, end_date, config)
+    
+    # Employees that already have a record for this period
+    existing_ids = {
+        employee_id for (employee_id,) in db.session.query(PayrollRecord.employee_id).join(Employee).filter(
+            Employee.user_id == user_id,
+            PayrollRecord.pay_period_start == start_date,
+            PayrollRecord.pay_period_end == end_date
+        )
+    }
+    
+    # Compute gross pay for each employee
+    pay_run = []
+    for employee in employees:
+        hours = employee_hours.get(employee.id, {})
+        regular_hours = hours.get('regular_hours', 0)
+        overtime_hours = hours.get('overtime_hours', 0)
+        
+        if regular_hours + overtime_hours <= 0 or employee.id in existing_ids:
+            continue
+        
+        # Calculate pay based on hourly rate or salary
+        if employee.hourly_rate:
+            rate = float(employee.hourly_rate)
+            regular_pay = regular_hours * rate
+            overtime_pay = overtime_hours * rate * 1.5
+            gross_pay = regular_pay + overtime_pay
+        else:
+            # Assume salary is monthly, calculate pro-rated amount
+            rate = float(employee.salary) / 160
+            regular_pay = regular_hours * rate
+            overtime_pay = overtime_hours * rate * 1.5
+            gross_pay = (float(employee.salary) / 30) * 14  # 2 weeks
+        
+        pay_run.append((employee, regular_hours, overtime_hours, regular_pay, overtime_pay, gross_pay))
+    
+    # Withholdings for the whole run in one call
+    withholdings = calculate_withholdings_ytd(
+        [run[0].id for run in pay_run],
+        [run[5] for run in pay_run],
+        end_date,
+        periods_per_year=periods_per_year(start_date, end_date),
+        tables=load_tax_tables(config['PAYROLL_TAX_TABLES'])
+    )
+    
+    # Create payroll records for each employee
+    created_records = []
+    for i, (employee, regular_hours, overtime_hours, regular_pay, overtime_pay, gross_pay) in enumerate(pay_run):
+        record = PayrollRecord(
+            employee_id=employee.id,
+            pay_period_start=start_date,
+            pay_period_end=end_date,
+            pay_date=end_date,
+            regular_hours=regular_hours,
+            overtime_hours=overtime_hours,
+            regular_pay=regular_pay,
+            overtime_pay=overtime_pay,
+            gross_pay=gross_pay,
+            federal_tax=withholdings['federal_tax'][i],
+            state_tax=withholdings['state_tax'][i],
+            social_security=withholdings['social_security'][i],
+            medicare=withholdings['medicare'][i],
+            net_pay=gross_pay - withholdings['total'][i],
+            status='pending'
+        )
+        db.session.add(record)
+        created_records.append(record)
+    
+    if created_records:
+        db.session.flush()  # Get record IDs
+        invalidate_tax_snapshots(user_id, start_date)
+        sync_postings(user_id, [payroll_posting(record) for record in created_records])
+    db.session.commit()
+    if created_records:
+        invalidate_reports(user_id)
+    return created_records
+
+
+def process_payroll_job(user_id, payload, config):
+    """Job handler for ``payroll.process``."""
+    end_date = date.fromisoformat(payload['end_date']) if payload.get('end_date') else None
+    created_records = run_payroll(user_id, config, end_date)
+    return {'records_created': len(created_records)}
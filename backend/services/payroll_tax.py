@@ -0,0 +1,136 @@
+import json
+import os
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+from extensions import db
+from models.payroll import PayrollRecord
+from sqlalchemy import func
+
+DEFAULT_TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tax_tables.json')
+
+
+class BracketTable:
+    """Progressive brackets with the tax owed at each bracket floor precomputed."""
+    
+    def __init__(self, brackets, standard_deduction=0):
+        brackets = sorted(brackets, key=lambda bracket: bracket['over'])
+        self.floors = [float(bracket['over']) for bracket in brackets]
+        self.rates = [float(bracket['rate']) for bracket in brackets]
+        self.standard_deduction = float(standard_deduction)
+        
+        self.base_tax = [0.0]
+        for i in range(1, len(self.floors)):
+            width = self.floors[i] - self.floors[i - 1]
+            self.base_tax.append(self.base_tax[-1] + width * self.rates[i - 1])
+    
+    def annual_tax(self, annual_income):
+        taxable = annual_income - self.standard_deduction
+        if taxable <= 0:
+            return 0.0
+        i = bisect_right(self.floors, taxable) - 1
+        return self.base_tax[i] + (taxable - self.floors[i]) * self.rates[i]
+
+
+class TaxTables:
+    def __init__(self, data):
+        self.tax_year = data.get('tax_year')
+        self.federal = BracketTable(data['federal']['brackets'], data['federal'].get('standard_deduction', 0))
+        self.state = BracketTable(data['state']['brackets'], data['state'].get('standard_deduction', 0))
+        self.social_security_rate = float(data['social_security']['rate'])
+        self.social_security_wage_base = float(data['social_security']['wage_base'])
+        self.medicare_rate = float(data['medicare']['rate'])
+        self.medicare_additional_rate = float(data['medicare']['additional_rate'])
+        self.medicare_additional_threshold = float(data['medicare']['additional_threshold'])
+
+
+@lru_cache(maxsize=None)
+def load_tax_tables(path=None):
+    """Load and cache the bracket/rate tables; each file is parsed once per process."""
+    with open(path or DEFAULT_TABLES_PATH) as f:
+        return TaxTables(json.load(f))
+
+
+def periods_per_year(pay_period_start, pay_period_end):
+    """Infer the pay frequency from the length of a pay period."""
+    days = (pay_period_end - pay_period_start).days + 1
+    if days <= 8:
+        return 52
+    if days <= 14:
+        return 26
+    if days <= 16:
+        return 24
+    return 12
+
+
+def calculate_withholdings(gross_pays, periods_per_year=26, ytd_gross=None, tables=None):
+    """Compute withholdings for a whole pay run in one call.
+
+    ``gross_pays`` is a sequence of gross pay amounts for the period and
+    ``ytd_gross`` an optional parallel sequence of gross pay already paid
+    this year, which applies the social security wage base and the
+    additional medicare threshold. Returns a dict of parallel lists.
+    """
+    tables = tables or load_tax_tables()
+    gross = [float(amount) for amount in gross_pays]
+    ytd = [float(amount) for amount in ytd_gross] if ytd_gross is not None else [0.0] * len(gross)
+    
+    # Income tax: annualize the period's pay, apply brackets, de-annualize
+    federal_tax = [round(tables.federal.annual_tax(amount * periods_per_year) / periods_per_year, 2) for amount in gross]
+    state_tax = [round(tables.state.annual_tax(amount * periods_per_year) / periods_per_year, 2) for amount in gross]
+    
+    # Social security stops once year-to-date wages reach the wage base
+    wage_base = tables.social_security_wage_base
+    social_security = [
+        round(max(0.0, min(amount, wage_base - paid)) * tables.social_security_rate, 2)
+        for amount, paid in zip(gross, ytd)
+    ]
+    
+    # Medicare has no cap but adds a surcharge above the threshold
+    threshold = tables.medicare_additional_threshold
+    medicare = [
+        round(
+            amount * tables.medicare_rate
+            + (max(0.0, paid + amount - threshold) - max(0.0, paid - threshold)) * tables.medicare_additional_rate,
+            2
+        )
+        for amount, paid in zip(gross, ytd)
+    ]
+    
+    total = [round(sum(taxes), 2) for taxes in zip(federal_tax, state_tax, social_security, medicare)]
+    
+    return {
+        'federal_tax': federal_tax,
+        'state_tax': state_tax,
+        'social_security': social_security,
+        'medicare': medicare,
+        'total': total
+    }
+
+
+def load_ytd_gross(employee_ids, pay_date):
+    """Gross pay per employee paid earlier in ``pay_date``'s calendar year."""
+    if not employee_ids:
+        return {}
+    
+    rows = db.session.query(
+        PayrollRecord.employee_id,
+        func.sum(PayrollRecord.gross_pay)
+    ).filter(
+        PayrollRecord.employee_id.in_(employee_ids),
+        PayrollRecord.pay_date >= date(pay_date.year, 1, 1),
+        PayrollRecord.pay_date < pay_date
+    ).group_by(PayrollRecord.employee_id).all()
+    
+    return {employee_id: float(total or 0) for employee_id, total in rows}
+
+
+def calculate_withholdings_ytd(employee_ids, gross_pays, pay_date, periods_per_year=26, tables=None):
+    """Year-to-date aware variant that looks up prior gross pay for the run."""
+    ytd = load_ytd_gross(list(employee_ids), pay_date)
+    return calculate_withholdings(
+        gross_pays,
+        periods_per_year=periods_per_year,
+        ytd_gross=[ytd.get(employee_id, 0.0) for employee_id in employee_ids],
+        tables=tables
+    )
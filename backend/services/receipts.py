@@ -0,0 +1,208 @@
+import hashlib
+import importlib.util
+import os
+import tempfile
+import time
+from flask import current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import parse_form_data
+from extensions import db
+from models.expense import ExpenseReceipt
+
+# Leading bytes -> content type. Receipts are served back to browsers, so the
+# type comes from the file itself rather than the client's claim.
+RECEIPT_SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'RIFF', 'image/webp'),  # Checked for WEBP at offset 8 below
+)
+
+
+def storage_dir():
+    """Root of the receipt store (RECEIPT_STORAGE_DIR, default <instance>/receipts)."""
+    return os.path.abspath(current_app.config['RECEIPT_STORAGE_DIR'] or os.path.join(current_app.instance_path, 'receipts'))
+
+
+def blob_path(sha256):
+    """Where the file with this content hash lives, fanned out by its first bytes."""
+    return os.path.join(storage_dir(), 'blobs', sha256[:2], sha256[2:4], sha256)
+
+
+def thumbnail_path(sha256, size):
+    return os.path.join(storage_dir(), 'thumbnails', sha256[:2], f'{sha256}-{size}.jpg')
+
+
+def sniff_content_type(head):
+    for signature, content_type in RECEIPT_SIGNATURES:
+        if head.startswith(signature):
+            if content_type == 'image/webp' and head[8:12] != b'WEBP':
+                return None
+            return content_type
+    return None
+
+
+class HashingFileWriter:
+    """Writable file for the multipart parser that hashes and counts as it spools to disk.
+
+    The temporary file sits in the store's own ``tmp`` directory so the
+    finished upload is moved into place with an atomic rename.
+    """
+
+    def __init__(self, directory, max_bytes):
+        os.makedirs(directory, exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(dir=directory, prefix='upload-', delete=False)
+        self.path = self.file.name
+        self.max_bytes = max_bytes
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise RequestEntityTooLarge(f'Receipts are limited to {self.max_bytes} bytes')
+        if len(self.head) < 16:
+            self.head += chunk[:16 - len(self.head)]
+        self.sha256.update(chunk)
+        return self.file.write(chunk)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # The parser rewinds finished parts; the digest covers what was written
+        return self.file.seek(offset, whence)
+
+    def read(self, size=-1):
+        return self.file.read(size)
+
+    def close(self):
+        self.file.close()
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def read_upload(environ, field='receipt'):
+    """Stream the multipart body's ``field`` file to disk and return its (writer, filename).
+
+    Only the file part touches disk; it is written in the parser's chunks and
+    never held in memory whole. Returns (None, None) if the field is missing.
+    Other file parts in the body are discarded.
+    """
+    config = current_app.config
+    writers = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        writer = HashingFileWriter(os.path.join(storage_dir(), 'tmp'), config['RECEIPT_MAX_BYTES'])
+        writers.append(writer)
+        return writer
+
+    try:
+        # Werkzeug applies max_form_memory_size to the decoder's buffer while it
+        # streams file parts too, so it is bounded by the upload limit rather
+        # than a small field limit, which binary files trip at random
+        _, _, files = parse_form_data(
+            environ,
+            stream_factory=stream_factory,
+            max_content_length=config['RECEIPT_MAX_BYTES'],
+            max_form_memory_size=config['RECEIPT_MAX_BYTES'],
+            silent=False
+        )
+    except Exception:
+        for writer in writers:
+            writer.discard()
+        raise
+
+    upload = files.get(field)
+    for writer in writers:
+        if upload is None or writer is not upload.stream:
+            writer.discard()
+    if upload is None:
+        return None, None
+    upload.stream.close()
+    return upload.stream, upload.filename
+
+
+def store_blob(writer):
+    """Move a finished upload to its content address and return the hex digest.
+
+    A file with the same content already in the store is kept and the upload
+    dropped, so duplicates take no extra space. Concurrent uploads of the
+    same file each rename onto the same path, which is atomic.
+    """
+    sha256 = writer.sha256.hexdigest()
+    path = blob_path(sha256)
+    if os.path.exists(path):
+        writer.discard()
+        os.utime(path)  # Restarts receipts-gc's grace period for a file about to be referenced again
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(writer.path, path)
+    return sha256
+
+
+def attach_receipt(expense, writer, filename, content_type):
+    """Store the upload and point the expense at it (the caller commits)."""
+    sha256 = store_blob(writer)
+    receipt = ExpenseReceipt.query.filter_by(expense_id=expense.id).first()
+    if receipt is None:
+        receipt = ExpenseReceipt(expense_id=expense.id, user_id=expense.user_id)
+        db.session.add(receipt)
+    receipt.sha256 = sha256
+    receipt.filename = filename
+    receipt.content_type = content_type
+    receipt.size = writer.size
+    expense.receipt_url = f'/api/expenses/{expense.id}/receipt'
+    return receipt
+
+
+def thumbnails_available():
+    return importlib.util.find_spec('PIL') is not None
+
+
+def receipt_thumbnail(receipt):
+    """Path of a JPEG thumbnail for an image receipt, rendered once per content hash.
+
+    Returns None when Pillow cannot decode the image, e.g. a PNG whose header
+    passed the upload check but whose body is corrupt.
+    """
+    size = current_app.config['RECEIPT_THUMBNAIL_SIZE']
+    path = thumbnail_path(receipt.sha256, size)
+    if not os.path.exists(path):
+        from PIL import Image
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.jpg')
+        try:
+            with os.fdopen(fd, 'wb') as out, Image.open(blob_path(receipt.sha256)) as image:
+                image.thumbnail((size, size))
+                image.convert('RGB').save(out, 'JPEG', quality=80)
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+            # UnidentifiedImageError is an OSError; some decoders report broken data as SyntaxError
+            os.remove(tmp_path)
+            return None
+        os.replace(tmp_path, path)
+    return path
+
+
+def collect_garbage(grace_seconds=3600):
+    """Delete stored files no receipt references, and stale temporary uploads.
+
+    Files newer than ``grace_seconds`` are kept: an upload is moved into the
+    store just before its receipt row commits. Returns the number removed.
+    """
+    referenced = {sha256 for (sha256,) in db.session.query(ExpenseReceipt.sha256).distinct()}
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    for folder in ('blobs', 'thumbnails', 'tmp'):
+        for root, _, names in os.walk(os.path.join(storage_dir(), folder)):
+            for name in names:
+                path = os.path.join(root, name)
+                sha256 = name.split('-')[0]
+                if (folder == 'tmp' or sha256 not in referenced) and os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+                    removed += 1
+    return removed
@@ -0,0 +1,69 @@
+from datetime import timedelta
+from sqlalchemy import case, func, select
+from extensions import db
+from models.invoice import Invoice, Payment
+
+# (bucket, most days past due it holds); the last bucket is open-ended
+AGING_BUCKETS = [('current', -1), ('0_30', 30), ('31_60', 60), ('61_90', 90), ('90_plus', None)]
+
+# Invoices the rest of the app reports as outstanding
+OPEN_STATUSES = ('sent', 'overdue')
+
+
+def aging_report(user_id, as_of):
+    """Open balances by client and days past due as of ``as_of``.
+
+    Each open invoice's balance is its total minus its payments, read with a
+    correlated sum on payment.invoice_id. Invoices are bucketed by comparing
+    due_date with cut-off dates computed up front, so the report is one
+    grouped query that reads only open invoices through the
+    (user_id, status, due_date) index.
+    """
+    paid = select(func.coalesce(func.sum(Payment.amount), 0)).where(
+        Payment.invoice_id == Invoice.id
+    ).correlate(Invoice).scalar_subquery()
+    open_invoices = select(
+        Invoice.id,
+        Invoice.client_name,
+        Invoice.due_date,
+        (Invoice.total_amount - paid).label('balance')
+    ).where(
+        Invoice.user_id == user_id,
+        Invoice.status.in_(OPEN_STATUSES)
+    ).subquery()
+
+    bucket = case(
+        *[
+            (open_invoices.c.due_date >= as_of - timedelta(days=max_days), name)
+            for name, max_days in AGING_BUCKETS
+            if max_days is not None
+        ],
+        else_=AGING_BUCKETS[-1][0]
+    )
+
+    rows = db.session.query(
+        open_invoices.c.client_name,
+        bucket,
+        func.sum(open_invoices.c.balance),
+        func.count(open_invoices.c.id)
+    ).filter(open_invoices.c.balance > 0).group_by(open_invoices.c.client_name, bucket).all()
+
+    buckets = [name for name, _ in AGING_BUCKETS]
+    clients = {}
+    totals = dict.fromkeys(buckets, 0.0)
+    for client_name, bucket_name, amount, count in rows:
+        client = clients.setdefault(client_name, dict(
+            {'client_name': client_name, 'total': 0.0, 'invoice_count': 0},
+            **dict.fromkeys(buckets, 0.0)
+        ))
+        client[bucket_name] += float(amount)
+        client['total'] += float(amount)
+        client['invoice_count'] += count
+        totals[bucket_name] += float(amount)
+
+    return {
+        'as_of': as_of.isoformat(),
+        'buckets': buckets,
+        'clients': sorted(clients.values(), key=lambda client: (-client['total'], client['client_name'])),
+        'totals': dict(totals, total=sum(totals.values()))
+    }
@@ -0,0 +1,249 @@
+import calendar
+import json
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from types import SimpleNamespace
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models.expense import Expense
+from models.invoice import Invoice, InvoiceItem
+from models.recurring import RecurringInstance, RecurringTemplate
+from services.general_ledger import expense_posting, invoice_posting, sync_postings
+from services.invoicing import calculate_totals, generate_invoice_number, to_decimal
+from services.report_cache import invalidate_reports
+from services.tax_snapshots import invalidate_tax_snapshots
+
+logger = logging.getLogger(__name__)
+
+# Months between occurrences per unit of ``interval``; weekly schedules step in days
+FREQUENCY_MONTHS = {'monthly': 1, 'quarterly': 3, 'yearly': 12}
+FREQUENCIES = ('weekly',) + tuple(FREQUENCY_MONTHS)
+
+
+def occurrence_date(start_date, frequency, interval, n):
+    """The ``n``th (0-based) date of a schedule.
+
+    Counted from the start date rather than the previous occurrence, so a
+    schedule starting on the 31st lands on each month's last day without
+    drifting to the 28th after February.
+    """
+    if frequency == 'weekly':
+        return start_date + timedelta(weeks=interval * n)
+    months = start_date.month - 1 + FREQUENCY_MONTHS[frequency] * interval * n
+    year, month = start_date.year + months // 12, months % 12 + 1
+    return date(year, month, min(start_date.day, calendar.monthrange(year, month)[1]))
+
+
+def schedule_from(template, run_count):
+    """Point ``template`` at its ``run_count``th occurrence (no next run past end_date)."""
+    next_date = occurrence_date(template.start_date, template.frequency, template.interval, run_count)
+    template.run_count = run_count
+    template.next_run_date = next_date if template.end_date is None or next_date <= template.end_date else None
+
+
+def reschedule(template):
+    """Recompute the next run after a schedule change, skipping periods already generated."""
+    last_period = None
+    if template.id is not None:
+        with db.session.no_autoflush:  # The edited template is written once, at commit
+            last_period = db.session.query(db.func.max(RecurringInstance.period_date)).filter(
+                RecurringInstance.template_id == template.id
+            ).scalar()
+    run_count = 0
+    if last_period is not None:
+        while occurrence_date(template.start_date, template.frequency, template.interval, run_count) <= last_period:
+            run_count += 1
+    schedule_from(template, run_count)
+
+
+def _invoice_rows(template, period_date, invoice_number):
+    items = json.loads(template.items or '[]')
+    line_totals, subtotal, tax_amount, total_amount = calculate_totals(items, template.tax_rate or 0)
+    invoice_row = {
+        'invoice_number': invoice_number,
+        'user_id': template.user_id,
+        'client_name': template.client_name,
+        'client_email': template.client_email,
+        'client_address': template.client_address,
+        'issue_date': period_date,
+        'due_date': period_date + timedelta(days=template.due_days or 0),
+        'subtotal': subtotal,
+        'tax_rate': to_decimal(template.tax_rate or 0),
+        'tax_amount': tax_amount,
+        'total_amount': total_amount,
+        'status': 'draft',
+        'notes': template.notes
+    }
+    item_rows = [
+        {
+            'description': item['description'],
+            'quantity': to_decimal(item['quantity']),
+            'unit_price': to_decimal(item['unit_price']),
+            'total': line_total
+        }
+        for item, line_total in zip(items, line_totals)
+    ]
+    return invoice_row, item_rows
+
+
+def _expense_row(template, period_date):
+    return {
+        'user_id': template.user_id,
+        'category_id': template.category_id,
+        'description': template.description,
+        'amount': template.amount,
+        'expense_date': period_date,
+        'vendor': template.vendor,
+        'payment_method': template.payment_method,
+        'status': 'pending',
+        'notes': template.notes
+    }
+
+
+def template_problem(template):
+    """Why ``template`` cannot produce a row, or None when it is complete."""
+    if template.kind == 'invoice':
+        if not template.client_name:
+            return 'client_name is missing'
+        try:
+            items = json.loads(template.items or '[]')
+        except ValueError:
+            return 'items are not valid JSON'
+        if not items:
+            return 'items are missing'
+        for item in items:
+            if not item.get('description') or item.get('quantity') is None or item.get('unit_price') is None:
+                return 'an item lacks description, quantity or unit_price'
+    elif template.kind == 'expense':
+        for field in ('category_id', 'description', 'amount'):
+            if getattr(template, field) is None or getattr(template, field) == '':
+                return f'{field} is missing'
+    else:
+        return f'unknown kind {template.kind!r}'
+    return None
+
+
+def is_period_conflict(error):
+    """True when ``error`` is the (template, period) key rejecting a duplicate."""
+    message = str(error.orig)
+    return 'uq_recurring_instance_period' in message or (
+        'recurring_instance.template_id' in message and 'recurring_instance.period_date' in message  # SQLite
+    )
+
+
+def due_occurrences(today, max_catch_up):
+    """(template, period_date) for every occurrence due by ``today``, across all tenants.
+
+    Templates are advanced past what is returned. A template that has
+    fallen far behind yields at most ``max_catch_up`` periods per run.
+    Incomplete templates are deactivated rather than let one tenant's
+    template fail the whole batch.
+    """
+    templates = RecurringTemplate.query.filter(
+        RecurringTemplate.active.is_(True), RecurringTemplate.next_run_date <= today
+    ).order_by(RecurringTemplate.id).all()
+
+    due = []
+    for template in templates:
+        problem = template_problem(template)
+        if problem:
+            logger.warning('Deactivating recurring template %s: %s', template.id, problem)
+            template.active = False
+            continue
+        for _ in range(max_catch_up):
+            if template.next_run_date is None or template.next_run_date > today:
+                break
+            due.append((template, template.next_run_date))
+            schedule_from(template, template.run_count + 1)
+    if not due:
+        return due
+
+    # Periods that already exist (e.g. after a template was rescheduled) are skipped
+    existing = set(db.session.query(RecurringInstance.template_id, RecurringInstance.period_date).filter(
+        RecurringInstance.template_id.in_({template.id for template, _ in due}),
+        RecurringInstance.period_date >= min(period_date for _, period_date in due)
+    ))
+    return [(template, period_date) for template, period_date in due if (template.id, period_date) not in existing]
+
+
+def generate_recurring(today=None, max_catch_up=12):
+    """Create every invoice and expense due from recurring templates, for all tenants.
+
+    The run is one transaction of set-based statements: a bulk INSERT each
+    for invoices, their items, expenses and instance keys, plus one ledger
+    sync per tenant, however many templates are due. Re-running is a no-op:
+    templates advance in the same commit, and the unique (template, period)
+    key makes an overlapping run fail and roll back instead of duplicating.
+
+    Returns {'invoices': created, 'expenses': created}.
+    """
+    today = today or date.today()
+    due = due_occurrences(today, max_catch_up)
+    counts = {'invoices': 0, 'expenses': 0}
+    if not due:
+        db.session.commit()  # Templates may still have advanced past existing periods
+        return counts
+
+    invoices_due = [(template, period_date) for template, period_date in due if template.kind == 'invoice']
+    expenses_due = [(template, period_date) for template, period_date in due if template.kind == 'expense']
+    postings = defaultdict(list)
+    touched_dates = defaultdict(set)
+    instance_rows = []
+
+    try:
+        if invoices_due:
+            numbers = set()
+            while len(numbers) < len(invoices_due):
+                numbers.add(generate_invoice_number())
+            prepared = [
+                _invoice_rows(template, period_date, number)
+                for (template, period_date), number in zip(invoices_due, sorted(numbers))
+            ]
+            invoice_ids = db.session.execute(
+                insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True),
+                [invoice_row for invoice_row, _ in prepared]
+            ).scalars().all()
+            item_rows = [
+                dict(item_row, invoice_id=invoice_id)
+                for invoice_id, (_, items) in zip(invoice_ids, prepared)
+                for item_row in items
+            ]
+            if item_rows:
+                db.session.execute(insert(InvoiceItem), item_rows)
+            for invoice_id, (template, period_date), (invoice_row, _) in zip(invoice_ids, invoices_due, prepared):
+                instance_rows.append({'template_id': template.id, 'period_date': period_date, 'invoice_id': invoice_id})
+                touched_dates[template.user_id].add(period_date)
+                posting = invoice_posting(SimpleNamespace(id=invoice_id, **invoice_row))
+                if posting.lines:  # Drafts stay off the books until sent
+                    postings[template.user_id].append(posting)
+            counts['invoices'] = len(invoice_ids)
+
+        if expenses_due:
+            expense_rows = [_expense_row(template, period_date) for template, period_date in expenses_due]
+            expense_ids = db.session.execute(
+                insert(Expense).returning(Expense.id, sort_by_parameter_order=True), expense_rows
+            ).scalars().all()
+            for expense_id, (template, period_date), expense_row in zip(expense_ids, expenses_due, expense_rows):
+                instance_rows.append({'template_id': template.id, 'period_date': period_date, 'expense_id': expense_id})
+                touched_dates[template.user_id].add(period_date)
+                postings[template.user_id].append(expense_posting(SimpleNamespace(id=expense_id, **expense_row)))
+            counts['expenses'] = len(expense_ids)
+
+        db.session.execute(insert(RecurringInstance), instance_rows)
+        for user_id, dates in touched_dates.items():
+            invalidate_tax_snapshots(user_id, *dates)
+            sync_postings(user_id, postings[user_id])
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not is_period_conflict(e):
+            logger.exception('Recurring generation failed')
+            raise
+        # A concurrent run generated some of these periods first; it owns them
+        return {'invoices': 0, 'expenses': 0}
+
+    for user_id in touched_dates:
+        invalidate_reports(user_id)
+    return counts
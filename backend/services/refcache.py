@@ -0,0 +1,26 @@
+from flask import current_app
+from extensions import cache
+
+
+class ReferenceCache:
+    """Cache for small reference datasets on top of the app cache.
+
+    Namespaces are prefixed with ``ref:`` and entries live for
+    ``REFCACHE_TTL`` seconds. Writers call ``bump(namespace)`` after
+    committing. With the ``local`` cache backend other workers pick up a
+    change once their copy expires; the shared backends see it at once.
+    """
+
+    def get(self, namespace, key, loader):
+        """Return the cached value for ``key``, calling ``loader()`` on a miss."""
+        return cache.get_or_load(f'ref:{namespace}', key, loader, ttl=current_app.config['REFCACHE_TTL'])
+
+    def bump(self, namespace):
+        """Invalidate every entry in ``namespace``."""
+        cache.invalidate(f'ref:{namespace}')
+
+    def clear(self):
+        cache.clear()
+
+
+reference_cache = ReferenceCache()
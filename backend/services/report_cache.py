@@ -0,0 +1,50 @@
+from datetime import date
+from flask import current_app
+from extensions import cache
+
+
+def _namespace(user_id):
+    return cache.tenant_namespace(user_id, 'reports')
+
+
+def _report_key(name, params):
+    # Today's date is part of the key because default report periods are relative to it
+    return f"{name}:{date.today().isoformat()}:{sorted(params.items())}"
+
+
+def _report_ttl():
+    """Report cache lifetime, or 0 when writes in one worker would not reach the others.
+
+    Bundles stand in for live reads, so they are only cached on a backend
+    every worker shares; with ``local`` another worker would serve a stale
+    copy for up to ``REPORT_CACHE_TTL`` seconds after a write.
+    """
+    return current_app.config['REPORT_CACHE_TTL'] if cache.backend.shared else 0
+
+
+def cached_report(user_id, name, params, build):
+    """Return report ``name`` for ``params`` from the app cache, calling ``build()`` on a miss.
+
+    With a shared cache backend every worker serves the same copy; otherwise
+    every call builds the report.
+    """
+    ttl = _report_ttl()
+    if not ttl:
+        return build()
+    return cache.get_or_load(_namespace(user_id), _report_key(name, params), build, ttl=ttl)
+
+
+async def cached_report_async(user_id, name, params, build):
+    """``cached_report`` for the ASGI handlers, where ``build`` is a coroutine function.
+
+    Entries are shared with the Flask views for the same name and params.
+    """
+    ttl = _report_ttl()
+    if not ttl:
+        return await build()
+    return await cache.get_or_load_async(_namespace(user_id), _report_key(name, params), build, ttl=ttl)
+
+
+def invalidate_reports(user_id):
+    """Call after committing any write to the user's invoices, payments, expenses or payroll."""
+    cache.invalidate(_namespace(user_id))
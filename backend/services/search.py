@@ -0,0 +1,153 @@
+import re
+from extensions import db
+from models.invoice import Invoice
+from models.expense import Expense
+from models.payroll import Employee
+from sqlalchemy import DDL, event, text
+
+# Searchable entities: table, indexed columns, and the title/subtitle shown in results
+SEARCH_SOURCES = {
+    'expenses': {
+        'table': 'expense',
+        'columns': ['description', 'vendor', 'notes'],
+        'title': "e.description",
+        'subtitle': "coalesce(e.vendor, '')"
+    },
+    'invoices': {
+        'table': 'invoice',
+        'columns': ['invoice_number', 'client_name', 'notes'],
+        'title': "e.invoice_number",
+        'subtitle': "e.client_name"
+    },
+    'employees': {
+        'table': 'employee',
+        'columns': ['first_name', 'last_name', 'email'],
+        'title': "e.first_name || ' ' || e.last_name",
+        'subtitle': "e.email"
+    },
+}
+
+
+def _sqlite_ddl(table, columns):
+    """External-content FTS5 table plus triggers that mirror every write."""
+    fts = f'{table}_fts'
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def _postgres_document(columns, alias=None):
+    prefix = f'{alias}.' if alias else ''
+    joined = " || ' ' || ".join(f"coalesce({prefix}{column}, '')" for column in columns)
+    return f"to_tsvector('english', {joined})"
+
+
+def _postgres_ddl(table, columns):
+    """GIN expression index; Postgres keeps it in sync on every write."""
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search ON {table} USING gin ({_postgres_document(columns)})"
+    ]
+
+
+def _register_ddl():
+    for model, source in ((Expense, 'expenses'), (Invoice, 'invoices'), (Employee, 'employees')):
+        table = SEARCH_SOURCES[source]['table']
+        columns = SEARCH_SOURCES[source]['columns']
+        for statement in _sqlite_ddl(table, columns):
+            event.listen(model.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+        for statement in _postgres_ddl(table, columns):
+            event.listen(model.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+
+
+_register_ddl()
+
+
+def rebuild_search_index():
+    """Create any missing index objects and rebuild them from the base tables.
+
+    Needed once for databases created before search existed; afterwards the
+    index is maintained on every write.
+    """
+    dialect = db.engine.dialect.name
+    with db.engine.begin() as connection:
+        for source in SEARCH_SOURCES.values():
+            table, columns = source['table'], source['columns']
+            if dialect == 'sqlite':
+                for statement in _sqlite_ddl(table, columns):
+                    connection.execute(text(statement))
+                connection.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+            elif dialect == 'postgresql':
+                for statement in _postgres_ddl(table, columns):
+                    connection.execute(text(statement))
+
+
+def _terms(query):
+    return re.findall(r'\w+', query.lower())[:16]
+
+
+def _sqlite_branch(name, source):
+    table = source['table']
+    return (
+        f"SELECT '{name}' AS type, e.id AS id, {source['title']} AS title, {source['subtitle']} AS subtitle, "
+        f"-bm25({table}_fts) AS score "
+        f"FROM {table}_fts JOIN {table} e ON e.id = {table}_fts.rowid "
+        f"WHERE {table}_fts MATCH :match AND e.user_id = :user_id"
+    )
+
+
+def _postgres_branch(name, source):
+    document = _postgres_document(source['columns'], 'e')
+    return (
+        f"SELECT '{name}' AS type, e.id AS id, {source['title']} AS title, {source['subtitle']} AS subtitle, "
+        f"ts_rank({document}, to_tsquery('english', :match)) AS score "
+        f"FROM {source['table']} e "
+        f"WHERE {document} @@ to_tsquery('english', :match) AND e.user_id = :user_id"
+    )
+
+
+def search(user_id, query, types=None, page=1, per_page=10):
+    """Ranked, paginated search over a user's expenses, invoices and employees.
+
+    Every search term must match, as a prefix. Returns (results, total).
+    """
+    terms = _terms(query)
+    names = [name for name in (types or SEARCH_SOURCES) if name in SEARCH_SOURCES]
+    if not terms or not names:
+        return [], 0
+    
+    if db.engine.dialect.name == 'postgresql':
+        match = ' & '.join(f'{term}:*' for term in terms)
+        branches = [_postgres_branch(name, SEARCH_SOURCES[name]) for name in names]
+    else:
+        match = ' '.join(f'"{term}"*' for term in terms)
+        branches = [_sqlite_branch(name, SEARCH_SOURCES[name]) for name in names]
+    
+    union = ' UNION ALL '.join(branches)
+    params = {'match': match, 'user_id': int(user_id)}
+    
+    total = db.session.execute(text(f'SELECT count(*) FROM ({union}) AS hits'), params).scalar()
+    rows = db.session.execute(
+        text(f'SELECT * FROM ({union}) AS hits ORDER BY score DESC, type, id LIMIT :limit OFFSET :offset'),
+        dict(params, limit=per_page, offset=(page - 1) * per_page)
+    ).mappings().all()
+    
+    return [
+        {
+            'type': row['type'],
+            'id': row['id'],
+            'title': row['title'],
+            'subtitle': row['subtitle'],
+            'score': float(row['score'])
+        }
+        for row in rows
+    ], total
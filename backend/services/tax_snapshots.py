@@ -0,0 +1,97 @@
+import json
+from datetime import date
+from sqlalchemy import and_, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from models.report_snapshot import TaxSummarySnapshot, TaxYearRevision
+
+_UPSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+
+def is_closed_year(year):
+    return year < date.today().year
+
+
+def load_snapshots(user_id, years, report_version):
+    """Return {year: summary} for the stored snapshots among ``years``."""
+    rows = db.session.query(TaxSummarySnapshot.tax_year, TaxSummarySnapshot.payload).filter(
+        TaxSummarySnapshot.user_id == user_id,
+        TaxSummarySnapshot.tax_year.in_(list(years)),
+        TaxSummarySnapshot.report_version == report_version
+    ).all()
+    return {year: json.loads(payload) for year, payload in rows}
+
+
+def tax_year_revisions(user_id, years):
+    """Return {year: revision} for ``years``; read it before computing a summary."""
+    if not years:
+        return {}
+    rows = db.session.query(TaxYearRevision.tax_year, TaxYearRevision.revision).filter(
+        TaxYearRevision.user_id == user_id,
+        TaxYearRevision.tax_year.in_(list(years))
+    ).all()
+    return dict.fromkeys(years, 0) | dict(rows)
+
+
+def _revision_rows(user_id, years):
+    insert = _UPSERTS[db.session.get_bind().dialect.name]
+    return insert(TaxYearRevision), [{'user_id': user_id, 'tax_year': year, 'revision': 0} for year in years]
+
+
+def store_snapshots(user_id, report_version, summaries, revisions):
+    """Persist summaries of closed years computed at ``revisions``; the caller commits.
+
+    ``summaries`` and ``revisions`` map year to the computed summary and to
+    the revision read before computing it. A year with a backdated write
+    committed since then is skipped. The revision rows of the stored years
+    stay locked until the caller commits, so a write cannot slip in between
+    this check and the snapshots becoming visible. Returns the stored years.
+    """
+    if not summaries:
+        return set()
+    
+    statement, rows = _revision_rows(user_id, sorted(summaries))
+    db.session.execute(statement.on_conflict_do_nothing(), rows)
+    unchanged = set(db.session.execute(
+        update(TaxYearRevision).where(
+            TaxYearRevision.user_id == user_id,
+            or_(*[
+                and_(TaxYearRevision.tax_year == year, TaxYearRevision.revision == revisions[year])
+                for year in summaries
+            ])
+        ).values(revision=TaxYearRevision.revision).returning(TaxYearRevision.tax_year)
+    ).scalars())
+    
+    db.session.add_all([
+        TaxSummarySnapshot(
+            user_id=user_id,
+            tax_year=year,
+            report_version=report_version,
+            payload=json.dumps(summaries[year])
+        )
+        for year in sorted(unchanged)
+    ])
+    return unchanged
+
+
+def invalidate_tax_snapshots(user_id, *dates):
+    """Drop snapshots for closed years touched by a backdated write.
+
+    Call with every date the write affects (old and new values) before the
+    write is committed, so the invalidation is part of the same transaction.
+    Bumping the years' revisions also stops readers that computed a summary
+    before this write commits from storing it.
+    """
+    years = {d.year for d in dates if d is not None and is_closed_year(d.year)}
+    if not years:
+        return
+    
+    statement, rows = _revision_rows(user_id, sorted(years))
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=[TaxYearRevision.user_id, TaxYearRevision.tax_year],
+        set_={'revision': TaxYearRevision.revision + 1}
+    ), [dict(row, revision=1) for row in rows])
+    TaxSummarySnapshot.query.filter(
+        TaxSummarySnapshot.user_id == user_id,
+        TaxSummarySnapshot.tax_year.in_(years)
+    ).delete(synchronize_session=False)
@@ -0,0 +1,103 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from extensions import db
+from models.invoice import Invoice
+from models.expense import Expense
+from models.payroll import PayrollRecord, Employee
+from sqlalchemy import func
+
+
+def partition_range(start_date, end_date, days):
+    """Split an inclusive date range into consecutive chunks of ``days`` days."""
+    partitions = []
+    current = start_date
+    while current <= end_date:
+        partition_end = min(current + timedelta(days=days - 1), end_date)
+        partitions.append((current, partition_end))
+        current = partition_end + timedelta(days=1)
+    return partitions
+
+
+def new_tenant_stats():
+    return {
+        'revenue': 0.0,
+        'expenses': 0.0,
+        'payroll': 0.0,
+        'invoice_status': defaultdict(int)
+    }
+
+
+def aggregate_partition(start_date, end_date):
+    """Per-tenant totals for one date partition, using one grouped query per metric."""
+    stats = defaultdict(new_tenant_stats)
+    
+    revenue = db.session.query(Invoice.user_id, func.sum(Invoice.total_amount)).filter(
+        Invoice.status == 'paid',
+        Invoice.issue_date >= start_date,
+        Invoice.issue_date <= end_date
+    ).group_by(Invoice.user_id)
+    for user_id, total in revenue:
+        stats[user_id]['revenue'] += float(total or 0)
+    
+    expenses = db.session.query(Expense.user_id, func.sum(Expense.amount)).filter(
+        Expense.expense_date >= start_date,
+        Expense.expense_date <= end_date
+    ).group_by(Expense.user_id)
+    for user_id, total in expenses:
+        stats[user_id]['expenses'] += float(total or 0)
+    
+    payroll = db.session.query(Employee.user_id, func.sum(PayrollRecord.gross_pay)).join(Employee).filter(
+        PayrollRecord.pay_period_start >= start_date,
+        PayrollRecord.pay_period_start <= end_date
+    ).group_by(Employee.user_id)
+    for user_id, total in payroll:
+        stats[user_id]['payroll'] += float(total or 0)
+    
+    statuses = db.session.query(Invoice.user_id, Invoice.status, func.count(Invoice.id)).filter(
+        Invoice.issue_date >= start_date,
+        Invoice.issue_date <= end_date
+    ).group_by(Invoice.user_id, Invoice.status)
+    for user_id, status, count in statuses:
+        stats[user_id]['invoice_status'][status] += count
+    
+    return stats
+
+
+def _aggregate_in_context(app, start_date, end_date):
+    with app.app_context():
+        try:
+            return aggregate_partition(start_date, end_date)
+        finally:
+            db.session.remove()
+
+
+def merge_stats(partials):
+    merged = defaultdict(new_tenant_stats)
+    for partial in partials:
+        for user_id, stats in partial.items():
+            tenant = merged[user_id]
+            tenant['revenue'] += stats['revenue']
+            tenant['expenses'] += stats['expenses']
+            tenant['payroll'] += stats['payroll']
+            for status, count in stats['invoice_status'].items():
+                tenant['invoice_status'][status] += count
+    return merged
+
+
+def collect_tenant_stats(app, start_date, end_date, workers=4, partition_days=92):
+    """Aggregate stats for every tenant over a date range.
+
+    The range is split into partitions that are aggregated concurrently on
+    a thread pool, each thread with its own app context and session, and
+    the partial results are merged per tenant.
+    """
+    partitions = partition_range(start_date, end_date, partition_days)
+    
+    if workers <= 1 or len(partitions) <= 1:
+        partials = [aggregate_partition(start, end) for start, end in partitions]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(partitions))) as executor:
+            partials = list(executor.map(lambda part: _aggregate_in_context(app, *part), partitions))
+    
+    return merge_stats(partials)
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+SECONDS_PER_DAY = 24 * 60 * 60
+DAILY_OVERTIME_HOURS = 8
+# A shift that ends when it starts could be empty or a full day; the API rejects it
+SAME_START_AND_END = 'end_time must differ from start_time'
+
+
+def memoized_parser(fmt, convert):
+    """Return a strptime-based parser that converts each distinct string once.
+
+    Timesheet batches repeat the same dates and clock times many times, so
+    the parser keeps a per-batch cache. Raises ValueError on bad input.
+    """
+    cache = {}
+    
+    def parse(value):
+        if value not in cache:
+            cache[value] = convert(datetime.strptime(value, fmt))
+        return cache[value]
+    
+    return parse
+
+
+def date_parser():
+    return memoized_parser('%Y-%m-%d', lambda dt: dt.date())
+
+
+def time_parser():
+    return memoized_parser('%H:%M', lambda dt: dt.time())
+
+
+def compute_hours(start_times, end_times, daily_overtime_hours=DAILY_OVERTIME_HOURS):
+    """Compute hours worked and overtime flags for parallel columns of times.
+
+    A shift whose end time is earlier than its start time crosses midnight
+    and is counted into the next day; equal start and end times give 0
+    hours, so callers reject them first. Entries are flagged as overtime when
+    they exceed ``daily_overtime_hours``; a falsy threshold disables the flag.
+    Returns (hours_worked, is_overtime).
+    """
+    starts = [t.hour * 3600 + t.minute * 60 + t.second for t in start_times]
+    ends = [t.hour * 3600 + t.minute * 60 + t.second for t in end_times]
+    
+    hours_worked = [round(((end - start) % SECONDS_PER_DAY) / 3600, 2) for start, end in zip(starts, ends)]
+    is_overtime = [bool(daily_overtime_hours) and hours > daily_overtime_hours for hours in hours_worked]
+    return hours_worked, is_overtime
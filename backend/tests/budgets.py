@@ -0,0 +1,188 @@
+"""SQL statement budgets for every endpoint.
+
+Each entry names a Flask endpoint, the most statements one request to it
+may issue against the seeded ledger (see ``conftest.seed_ledger``), and the
+request test_query_budgets sends. Paths are formatted with the seeded ids.
+Budgets must not depend on how many rows a user has; a new endpoint needs
+an entry here before the suite passes.
+"""
+
+import base64
+from collections import namedtuple
+from datetime import date
+
+# ``files`` maps multipart field names to (filename, bytes)
+RouteBudget = namedtuple('RouteBudget', 'limit method path json files', defaults=(None, None))
+
+TODAY = date.today().isoformat()
+
+# An 8x6 PNG; conftest.seed_ledger attaches it to the first expense
+RECEIPT_PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAgAAAAGCAIAAABxZ0isAAAAFElEQVR4nGM8cecDAzbAhFWUThIAgZECoC+icxgAAAAASUVORK5CYII='
+)
+
+# Endpoints that answer 501 unless an optional package is installed
+# (requirements-optional.txt); their budgets are skipped without it
+OPTIONAL_DEPENDENCIES = {
+    'reports.export_columnar': 'pyarrow',
+    'expenses.get_receipt_thumbnail': 'PIL',
+}
+
+ROUTE_BUDGETS = {
+    # Health
+    'health_check': RouteBudget(0, 'GET', '/api/health'),
+    'favicon': RouteBudget(0, 'GET', '/favicon.ico'),
+
+    # Auth
+    'auth.register': RouteBudget(4, 'POST', '/api/auth/register', {
+        'username': 'newbie', 'email': 'newbie@example.com', 'password': 'secret',
+        'first_name': 'New', 'last_name': 'User'
+    }),
+    'auth.login': RouteBudget(1, 'POST', '/api/auth/login', {'username': 'owner', 'password': 'secret'}),
+    'auth.get_profile': RouteBudget(1, 'GET', '/api/auth/profile'),
+    'auth.update_profile': RouteBudget(3, 'PUT', '/api/auth/profile', {'company_name': 'Acme'}),
+    'auth.change_password': RouteBudget(2, 'POST', '/api/auth/change-password', {
+        'current_password': 'secret', 'new_password': 'secret2'
+    }),
+
+    # Invoices
+    # Writes that change the books also read the source's postings and insert
+    # a journal entry, its lines and any checkpoint shifts
+    'invoices.get_invoices': RouteBudget(4, 'GET', '/api/invoices?per_page=50'),
+    'invoices.get_invoice': RouteBudget(3, 'GET', '/api/invoices/{invoice_id}'),
+    'invoices.create_invoice': RouteBudget(6, 'POST', '/api/invoices', {
+        'client_name': 'New Client', 'issue_date': TODAY, 'due_date': TODAY, 'tax_rate': 5,
+        'items': [{'description': 'Work', 'quantity': 2, 'unit_price': 50}]
+    }),
+    'invoices.create_invoices_bulk': RouteBudget(6, 'POST', '/api/invoices/bulk', {
+        'invoices': [
+            {
+                'client_name': f'Bulk {n}', 'issue_date': TODAY, 'due_date': TODAY,
+                'items': [{'description': 'Work', 'quantity': 1, 'unit_price': 10}]
+            }
+            for n in range(5)
+        ]
+    }),
+    'invoices.update_invoice': RouteBudget(10, 'PUT', '/api/invoices/{invoice_id}', {
+        'notes': 'Updated', 'items': [{'description': 'Only line', 'quantity': 1, 'unit_price': 300}]
+    }),
+    'invoices.update_invoice_item': RouteBudget(11, 'PATCH', '/api/invoices/{invoice_id}/items/{item_id}', {
+        'quantity': 2
+    }),
+    'invoices.delete_invoice': RouteBudget(6, 'DELETE', '/api/invoices/{draft_invoice_id}'),
+    'invoices.add_payment': RouteBudget(9, 'POST', '/api/invoices/{invoice_id}/payments', {
+        'amount': 10, 'payment_date': TODAY
+    }),
+    # Sending also inserts the client's email into the outbox
+    'invoices.send_invoice': RouteBudget(10, 'POST', '/api/invoices/{draft_invoice_id}/send'),
+    # Renders on the first download (items, payments); later ones read the cached file
+    'invoices.get_invoice_pdf': RouteBudget(3, 'GET', '/api/invoices/{invoice_id}/pdf'),
+    'invoices.render_invoice_pdfs': RouteBudget(2, 'POST', '/api/invoices/pdf/batch', {
+        'start_date': '2020-01-01', 'end_date': TODAY
+    }),
+
+    # Expenses
+    'expenses.get_expenses': RouteBudget(2, 'GET', '/api/expenses?per_page=50'),
+    'expenses.get_expense': RouteBudget(1, 'GET', '/api/expenses/{expense_id}'),
+    'expenses.create_expense': RouteBudget(7, 'POST', '/api/expenses', {
+        'category': 'office', 'description': 'Paper', 'amount': 12.5, 'expense_date': TODAY
+    }),
+    'expenses.update_expense': RouteBudget(5, 'PUT', '/api/expenses/{expense_id}', {'category': 'travel'}),
+    'expenses.delete_expense': RouteBudget(7, 'DELETE', '/api/expenses/{expense_id}'),
+    'expenses.upload_receipt': RouteBudget(4, 'POST', '/api/expenses/{expense_id}/receipt', files={
+        'receipt': ('receipt.png', RECEIPT_PNG)
+    }),
+    'expenses.download_receipt': RouteBudget(1, 'GET', '/api/expenses/{expense_id}/receipt'),
+    'expenses.get_receipt_thumbnail': RouteBudget(1, 'GET', '/api/expenses/{expense_id}/receipt/thumbnail'),
+    'expenses.get_categories': RouteBudget(1, 'GET', '/api/expenses/categories'),
+    'expenses.create_category': RouteBudget(3, 'POST', '/api/expenses/categories', {'name': 'meals'}),
+    # One query per month for the trailing 12 months
+    'expenses.get_expense_summary': RouteBudget(14, 'GET', '/api/expenses/summary'),
+
+    # Payroll
+    'payroll.get_employees': RouteBudget(2, 'GET', '/api/payroll/employees?per_page=50'),
+    'payroll.get_employee': RouteBudget(1, 'GET', '/api/payroll/employees/{employee_id}'),
+    'payroll.create_employee': RouteBudget(3, 'POST', '/api/payroll/employees', {
+        'first_name': 'New', 'last_name': 'Hire', 'email': 'hire@example.com',
+        'hire_date': TODAY, 'salary': 40000
+    }),
+    'payroll.update_employee': RouteBudget(3, 'PUT', '/api/payroll/employees/{employee_id}', {'position': 'Lead'}),
+    'payroll.delete_employee': RouteBudget(4, 'DELETE', '/api/payroll/employees/{spare_employee_id}'),
+    'payroll.get_payroll_records': RouteBudget(2, 'GET', '/api/payroll/payroll?per_page=50'),
+    'payroll.get_payroll_record': RouteBudget(1, 'GET', '/api/payroll/payroll/{payroll_record_id}'),
+    'payroll.create_payroll_record': RouteBudget(9, 'POST', '/api/payroll/payroll', {
+        'employee_id': '{employee_id}', 'pay_period_start': TODAY, 'pay_period_end': TODAY, 'pay_date': TODAY
+    }),
+    'payroll.get_time_entries': RouteBudget(2, 'GET', '/api/payroll/time-entries?per_page=50'),
+    'payroll.create_time_entry': RouteBudget(3, 'POST', '/api/payroll/time-entries', {
+        'employee_id': '{employee_id}', 'date': TODAY, 'start_time': '09:00', 'end_time': '17:00'
+    }),
+    'payroll.create_time_entries_bulk': RouteBudget(6, 'POST', '/api/payroll/time-entries/bulk', {
+        'entries': [
+            {'employee_id': '{employee_id}', 'date': TODAY, 'start_time': '09:00', 'end_time': '17:00'}
+            for _ in range(5)
+        ]
+    }),
+    'payroll.process_payroll': RouteBudget(3, 'POST', '/api/payroll/process'),
+
+    # Dashboard
+    'dashboard.get_dashboard_overview': RouteBudget(8, 'GET', '/api/dashboard/overview'),
+    'dashboard.get_dashboard_bundle': RouteBudget(8, 'GET', '/api/dashboard/bundle'),
+    'dashboard.get_revenue_chart': RouteBudget(1, 'GET', '/api/dashboard/charts/revenue'),
+    'dashboard.get_expenses_chart': RouteBudget(1, 'GET', '/api/dashboard/charts/expenses'),
+    'dashboard.get_expense_categories_chart': RouteBudget(1, 'GET', '/api/dashboard/charts/expense-categories'),
+    'dashboard.get_invoice_status_chart': RouteBudget(1, 'GET', '/api/dashboard/charts/invoice-status'),
+    'dashboard.get_quick_stats': RouteBudget(8, 'GET', '/api/dashboard/quick-stats'),
+
+    # Reports
+    # Revenue, expenses and payroll are each read once, grouped by day
+    'reports.get_financial_summary': RouteBudget(3, 'GET', '/api/reports/financial-summary'),
+    'reports.get_reports_bundle': RouteBudget(3, 'GET', '/api/reports/bundle?range=year'),
+    'reports.get_revenue_report': RouteBudget(1, 'GET', '/api/reports/revenue'),
+    'reports.get_expenses_report': RouteBudget(1, 'GET', '/api/reports/expenses'),
+    'reports.get_payroll_report': RouteBudget(1, 'GET', '/api/reports/payroll'),
+    'reports.get_tax_summary': RouteBudget(3, 'GET', '/api/reports/tax-summary'),
+    # Computes each year in the default range that has no snapshot, then
+    # checks the closed years' revisions once before storing them
+    'reports.get_tax_summary_history': RouteBudget(23, 'GET', '/api/reports/tax-summary/history'),
+    'reports.get_ar_aging': RouteBudget(1, 'GET', '/api/reports/ar-aging'),
+    'reports.get_invoice_report': RouteBudget(3, 'GET', '/api/reports/invoice-report'),
+    'reports.get_expense_report': RouteBudget(1, 'GET', '/api/reports/expense-report'),
+    'reports.export_csv': RouteBudget(2, 'GET', '/api/reports/export/csv?type=payroll'),
+    'reports.export_columnar': RouteBudget(1, 'GET', '/api/reports/export/columnar?dataset=expenses'),
+    'reports.export_json': RouteBudget(6, 'GET', '/api/reports/export/json?type=ledger'),
+
+    # Jobs
+    'jobs.get_jobs': RouteBudget(2, 'GET', '/api/jobs'),
+    'jobs.get_job': RouteBudget(1, 'GET', '/api/jobs/{job_id}'),
+    'jobs.get_job_result': RouteBudget(2, 'GET', '/api/jobs/{job_id}/result'),
+
+    # Outbox
+    'outbox.get_outbox': RouteBudget(3, 'GET', '/api/outbox'),
+    'outbox.retry_message': RouteBudget(3, 'POST', '/api/outbox/{outbox_message_id}/retry'),
+
+    # Recurring templates
+    'recurring.get_templates': RouteBudget(2, 'GET', '/api/recurring?per_page=50'),
+    'recurring.get_template': RouteBudget(1, 'GET', '/api/recurring/{recurring_template_id}'),
+    'recurring.create_template': RouteBudget(3, 'POST', '/api/recurring', {
+        'kind': 'expense', 'name': 'Hosting', 'frequency': 'monthly', 'start_date': TODAY,
+        'category': 'office', 'description': 'Hosting', 'amount': 20
+    }),
+    # Rescheduling reads the latest generated period
+    'recurring.update_template': RouteBudget(4, 'PUT', '/api/recurring/{recurring_template_id}', {
+        'interval': 2, 'items': [{'description': 'Retainer', 'quantity': 1, 'unit_price': 600}]
+    }),
+    'recurring.delete_template': RouteBudget(3, 'DELETE', '/api/recurring/{recurring_template_id}'),
+
+    # Search
+    'search.search_records': RouteBudget(2, 'GET', '/api/search?q=client'),
+
+    # General ledger
+    'ledger.get_accounts': RouteBudget(3, 'GET', '/api/ledger/accounts'),
+    'ledger.get_trial_balance': RouteBudget(3, 'GET', '/api/ledger/trial-balance'),
+    'ledger.get_journal_entries': RouteBudget(3, 'GET', '/api/ledger/entries'),
+
+    # Admin
+    # Four grouped queries per partition of the default one-year range
+    'admin.get_tenant_analytics': RouteBudget(18, 'GET', '/api/admin/analytics'),
+}
@@ -0,0 +1,229 @@
+import os
+import sys
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models.user import User
+from models.invoice import Invoice, InvoiceItem, Payment
+from models.expense import Expense, ExpenseCategory
+from models.payroll import Employee, PayrollRecord, TimeEntry
+from models.job import Job
+from models.outbox import OutboxMessage
+from models.recurring import RecurringTemplate
+from services.general_ledger import backfill_ledger
+from services.overtime import workweek_start
+from services.recurring import schedule_from
+from services.receipts import HashingFileWriter, attach_receipt, storage_dir
+from services.refcache import reference_cache
+from tests.budgets import RECEIPT_PNG
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app('testing')
+    app.config['RECEIPT_STORAGE_DIR'] = str(tmp_path / 'receipts')
+    app.config['INVOICE_PDF_DIR'] = str(tmp_path / 'invoice-pdfs')
+    with app.app_context():
+        reference_cache.clear()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post('/api/auth/register', json={
+        'username': 'owner',
+        'email': 'owner@example.com',
+        'password': 'secret',
+        'first_name': 'Olive',
+        'last_name': 'Owner'
+    })
+    user = User.query.filter_by(username='owner').one()
+    user.role = 'admin'
+    db.session.commit()
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def seed_ledger(user_id, scale):
+    """Give a user ``scale`` (at least 2) invoices, expenses and employees with related rows,
+    posted to the general ledger, and a receipt on the first expense.
+
+    Returns the ids the endpoint tests address.
+    """
+    today = date.today()
+    categories = [ExpenseCategory(name='office'), ExpenseCategory(name='travel')]
+    db.session.add_all(categories)
+
+    invoices = []
+    for n in range(scale):
+        invoice = Invoice(
+            invoice_number=f'INV-TEST-{n:04d}',
+            user_id=user_id,
+            client_name=f'Client {n}',
+            client_email=f'client{n}@example.com',
+            issue_date=today - timedelta(days=n),
+            due_date=today + timedelta(days=30 - 10 * n),
+            subtotal=300,
+            tax_rate=10,
+            tax_amount=30,
+            total_amount=330,
+            status=('draft', 'sent', 'paid')[n % 3],
+            items=[
+                InvoiceItem(description=f'Line {i}', quantity=1, unit_price=100, total=100)
+                for i in range(3)
+            ],
+            payments=[
+                Payment(amount=50, payment_date=today - timedelta(days=n), payment_method='check')
+                for _ in range(2 if n % 3 else 0)
+            ]
+        )
+        invoices.append(invoice)
+    db.session.add_all(invoices)
+
+    expenses = [
+        Expense(
+            user_id=user_id,
+            category_ref=categories[n % 2],
+            description=f'Expense {n}',
+            amount=25 + n,
+            expense_date=today - timedelta(days=n),
+            vendor='Staples'
+        )
+        for n in range(scale)
+    ]
+    db.session.add_all(expenses)
+
+    # The period /api/payroll/process pays today, so the endpoint finds it paid
+    pay_period_end = workweek_start(today + timedelta(days=1)) - timedelta(days=1)
+    employees = []
+    for n in range(scale):
+        employee = Employee(
+            user_id=user_id,
+            employee_id=f'EMP-{n:04d}',
+            first_name=f'Worker{n}',
+            last_name='Test',
+            email=f'worker{n}@example.com',
+            hire_date=today - timedelta(days=365),
+            salary=52000,
+            hourly_rate=25,
+            time_entries=[
+                TimeEntry(
+                    date=today - timedelta(days=d),
+                    start_time=time(9, 0),
+                    end_time=time(18, 0),
+                    hours_worked=9,
+                    is_overtime=True
+                )
+                for d in range(2)
+            ],
+            payroll_records=[
+                PayrollRecord(
+                    pay_period_start=pay_period_end - timedelta(days=13),
+                    pay_period_end=pay_period_end,
+                    pay_date=pay_period_end,
+                    regular_hours=80,
+                    gross_pay=2000,
+                    net_pay=1500
+                )
+            ]
+        )
+        employees.append(employee)
+    # Has no payroll history, so it can be deleted
+    spare_employee = Employee(
+        user_id=user_id,
+        employee_id='EMP-SPARE',
+        first_name='Spare',
+        last_name='Test',
+        email='spare@example.com',
+        hire_date=today,
+        salary=40000
+    )
+    db.session.add_all(employees + [spare_employee])
+
+    job = Job(
+        user_id=user_id,
+        job_type='reports.export_csv',
+        status='succeeded',
+        payload='{}',
+        result='{}',
+        result_data=b'a,b\n',
+        result_filename='export.csv',
+        result_mimetype='text/csv',
+        finished_at=datetime.utcnow()
+    )
+    # A delivery the mail server refused, for the outbox retry endpoint
+    outbox_message = OutboxMessage(
+        user_id=user_id,
+        invoice_id=invoices[1].id,
+        recipient=invoices[1].client_email,
+        subject=f'Invoice {invoices[1].invoice_number}',
+        body='Please find your invoice attached.',
+        status='failed',
+        attempts=1,
+        last_error='SMTPRecipientsRefused'
+    )
+    db.session.add_all([job, outbox_message])
+    # Monthly templates, alternating invoice and expense, first due next week
+    templates = [
+        RecurringTemplate(
+            user_id=user_id,
+            kind='invoice' if i % 2 == 0 else 'expense',
+            name=f'Retainer {i}',
+            frequency='monthly',
+            interval=1,
+            start_date=today + timedelta(days=7),
+            client_name=f'Client {i}',
+            client_email=f'client{i}@example.com',
+            tax_rate=10,
+            due_days=30,
+            items='[{"description": "Monthly retainer", "quantity": 1, "unit_price": 500}]',
+            category_ref=categories[i % 2],
+            description=f'Subscription {i}',
+            amount=49
+        )
+        for i in range(scale)
+    ]
+    for template in templates:
+        schedule_from(template, 0)
+    db.session.add_all(templates)
+    db.session.commit()
+    backfill_ledger(user_id)
+
+    receipt = HashingFileWriter(os.path.join(storage_dir(), 'tmp'), max_bytes=len(RECEIPT_PNG))
+    receipt.write(RECEIPT_PNG)
+    receipt.close()
+    attach_receipt(expenses[0], receipt, 'receipt.png', 'image/png')
+    db.session.commit()
+
+    return {
+        'invoice_id': invoices[1].id,
+        'item_id': invoices[1].items[0].id,
+        'draft_invoice_id': invoices[0].id,
+        'expense_id': expenses[0].id,
+        'employee_id': employees[0].id,
+        'spare_employee_id': spare_employee.id,
+        'payroll_record_id': employees[0].payroll_records[0].id,
+        'job_id': job.id,
+        'outbox_message_id': outbox_message.id,
+        'recurring_template_id': templates[0].id,
+    }
+
+
+@pytest.fixture
+def seeded(app, auth_headers):
+    user = User.query.filter_by(username='owner').one()
+    ids = seed_ledger(user.id, scale=5)
+    db.session.expire_all()
+    return ids
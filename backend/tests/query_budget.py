@@ -0,0 +1,55 @@
+from contextlib import ContextDecorator
+from sqlalchemy import event
+from extensions import db
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class count_queries(ContextDecorator):
+    """Record every SQL statement sent to the engine while active.
+    
+    Usable as ``with count_queries() as queries:`` or as a decorator; the
+    statements are available as ``queries.statements`` afterwards. Needs an
+    application context unless an engine is passed in.
+    """
+    
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.statements = []
+    
+    @property
+    def count(self):
+        return len(self.statements)
+    
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+    
+    def __enter__(self):
+        self.statements = []
+        self._engine = self.engine or db.engine
+        event.listen(self._engine, 'before_cursor_execute', self._record)
+        return self
+    
+    def __exit__(self, *exc):
+        event.remove(self._engine, 'before_cursor_execute', self._record)
+        return False
+
+
+class query_budget(count_queries):
+    """Fail with QueryBudgetExceeded if more than ``limit`` statements run."""
+    
+    def __init__(self, limit, label='block', engine=None):
+        super().__init__(engine)
+        self.limit = limit
+        self.label = label
+    
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        if exc_type is None and self.count > self.limit:
+            statements = '\n'.join(f'  {n}. {sql}' for n, sql in enumerate(self.statements, 1))
+            raise QueryBudgetExceeded(
+                f'{self.label} ran {self.count} SQL statements, budget is {self.limit}:\n{statements}'
+            )
+        return False
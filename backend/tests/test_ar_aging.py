@@ -0,0 +1,20 @@
+from datetime import date, timedelta
+
+
+def test_open_balances_are_bucketed_by_days_past_due(client, auth_headers, seeded):
+    report = client.get('/api/reports/ar-aging', headers=auth_headers).get_json()
+    clients = {row['client_name']: row for row in report['clients']}
+
+    # Seeded sent invoices: 330 total with 100 paid; drafts and paid invoices are not open
+    assert sorted(clients) == ['Client 1', 'Client 4']
+    assert clients['Client 1']['current'] == 230
+    assert clients['Client 4']['0_30'] == 230
+    assert report['totals']['total'] == 460
+
+
+def test_aging_as_of_a_later_date(client, auth_headers, seeded):
+    as_of = (date.today() + timedelta(days=60)).isoformat()
+    report = client.get(f'/api/reports/ar-aging?as_of={as_of}', headers=auth_headers).get_json()
+
+    assert report['totals']['31_60'] == 230
+    assert report['totals']['61_90'] == 230
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+import threading
+
+import pytest
+
+# The ASGI entrypoint's packages are optional (requirements-optional.txt)
+for module in ('a2wsgi', 'aiosqlite', 'greenlet'):
+    pytest.importorskip(module)
+
+import asgi
+from app import create_app
+from asgi import ASYNC_ROUTES, AsyncReportsApp
+from cache import SQLiteBackend
+from config import TestingConfig, config
+from extensions import db
+from services.report_cache import invalidate_reports
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # The async engine opens its own connections, so the data must live in a file
+    file_config = type('FileTestingConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'smoothbooks.db'}"
+    })
+    monkeypatch.setitem(config, 'file-testing', file_config)
+    app = create_app('file-testing')
+    app.config['RECEIPT_STORAGE_DIR'] = str(tmp_path / 'receipts')
+    app.config['INVOICE_PDF_DIR'] = str(tmp_path / 'invoice-pdfs')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+async def _get(asgi_app, path, headers, method='GET'):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'raw_path': path.encode(), 'root_path': '',
+        'query_string': query.encode(), 'scheme': 'http', 'http_version': '1.1',
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 1234),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi_app(scope, receive, send)
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return messages[0]['status'], json.loads(body)
+
+
+def _without_recent_activity(payload):
+    # Rows seeded in one transaction share created_at, so their order is not fixed
+    overview = payload.get('overview', payload)
+    overview.pop('recent_activity', None)
+    return payload
+
+
+def test_async_routes_match_the_flask_views(app, client, auth_headers, seeded):
+    asgi_app = AsyncReportsApp(app)
+
+    async def fetch_all():
+        try:
+            return {path: await _get(asgi_app, path, auth_headers) for path in ASYNC_ROUTES}
+        finally:
+            await asgi_app.engine.dispose()
+
+    responses = asyncio.run(fetch_all())
+
+    for path, (status, payload) in responses.items():
+        expected = client.get(path, headers=auth_headers).get_json()
+        assert status == 200, (path, payload)
+        assert _without_recent_activity(payload) == _without_recent_activity(expected), path
+
+
+def test_errors_and_fallback_to_the_wsgi_app(app, auth_headers):
+    asgi_app = AsyncReportsApp(app)
+
+    async def fetch():
+        try:
+            return (
+                await _get(asgi_app, '/api/reports/financial', {}),
+                await _get(asgi_app, '/api/reports/financial?start_date=soon', auth_headers),
+                await _get(asgi_app, '/api/health', {})
+            )
+        finally:
+            await asgi_app.engine.dispose()
+
+    missing, bad_date, health = asyncio.run(fetch())
+
+    assert missing == (401, {'error': 'Missing token'})
+    assert bad_date[0] == 400
+    assert health == (200, {'status': 'healthy', 'message': 'SmoothBooks API is running'})
+
+
+def test_bundles_share_the_report_cache_with_the_flask_views(app, client, auth_headers, seeded, monkeypatch, tmp_path):
+    # Reports are only cached on a backend that every worker shares
+    app.extensions['cache'] = SQLiteBackend(str(tmp_path / 'cache.db'))
+    asgi_app = AsyncReportsApp(app)
+    load_dashboard, loads = asgi.load_dashboard, []
+
+    async def counting_load_dashboard(*args):
+        loads.append(args)
+        return await load_dashboard(*args)
+
+    monkeypatch.setattr(asgi, 'load_dashboard', counting_load_dashboard)
+    user_id = client.get('/api/auth/profile', headers=auth_headers).get_json()['user']['id']
+
+    async def fetch_bundle():
+        return await _get(asgi_app, '/api/dashboard/bundle?months=6', auth_headers)
+
+    async def fetch_twice_then_after_a_write():
+        try:
+            first, second = await fetch_bundle(), await fetch_bundle()
+            with app.app_context():
+                invalidate_reports(user_id)
+            return first, second, await fetch_bundle()
+        finally:
+            await asgi_app.engine.dispose()
+
+    first, second, third = asyncio.run(fetch_twice_then_after_a_write())
+
+    assert first == second == third and first[0] == 200
+    assert len(loads) == 2  # The second request was served from the cache
+    flask_bundle = client.get('/api/dashboard/bundle?months=6', headers=auth_headers).get_json()
+    assert flask_bundle == first[1]
+
+
+def test_cache_lookups_run_off_the_event_loop(app, client, auth_headers, seeded, tmp_path):
+    backend = app.extensions['cache'] = SQLiteBackend(str(tmp_path / 'cache.db'))
+    asgi_app = AsyncReportsApp(app)
+    get, threads = backend.get, []
+
+    def recording_get(key):
+        threads.append(threading.current_thread())
+        return get(key)
+
+    backend.get = recording_get
+
+    async def fetch():
+        try:
+            return await _get(asgi_app, '/api/dashboard/bundle?months=6', auth_headers), threading.current_thread()
+        finally:
+            await asgi_app.engine.dispose()
+
+    (status, _), loop_thread = asyncio.run(fetch())
+
+    assert status == 200 and threads and loop_thread not in threads
+
+
+def test_unexpected_errors_are_logged_with_their_traceback(app, auth_headers, seeded, monkeypatch, caplog):
+    asgi_app = AsyncReportsApp(app)
+
+    async def broken_load_dashboard(*args):
+        raise RuntimeError('dashboard query failed')
+
+    monkeypatch.setattr(asgi, 'load_dashboard', broken_load_dashboard)
+
+    async def fetch():
+        try:
+            return await _get(asgi_app, '/api/dashboard/bundle?months=6', auth_headers)
+        finally:
+            await asgi_app.engine.dispose()
+
+    with caplog.at_level(logging.ERROR):
+        response = asyncio.run(fetch())
+
+    assert response == (500, {'error': 'Internal server error'})
+    [record] = [record for record in caplog.records if record.exc_info]
+    assert 'Error in async /api/dashboard/bundle' in record.getMessage()
+    assert record.exc_info[0] is RuntimeError
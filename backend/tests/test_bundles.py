@@ -0,0 +1,33 @@
+def _get(client, headers, path):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()
+
+
+def _without_recent_activity(overview):
+    # Rows seeded in one transaction share created_at, so their order is not fixed
+    return {key: value for key, value in overview.items() if key != 'recent_activity'}
+
+
+def test_dashboard_bundle_matches_the_page_endpoints(client, auth_headers, seeded):
+    bundle = _get(client, auth_headers, '/api/dashboard/bundle?months=6')
+    overview = _get(client, auth_headers, '/api/dashboard/overview')
+
+    assert _without_recent_activity(bundle['overview']) == _without_recent_activity(overview)
+    assert len(bundle['overview']['recent_activity']['invoices']) == len(overview['recent_activity']['invoices'])
+    assert bundle['revenue_chart'] == _get(client, auth_headers, '/api/dashboard/charts/revenue?months=6')
+
+
+def test_reports_bundle_matches_the_page_endpoints(client, auth_headers, seeded):
+    bundle = _get(client, auth_headers, '/api/reports/bundle?range=quarter')
+
+    assert bundle['financial'] == _get(client, auth_headers, '/api/reports/financial')
+    assert bundle['revenue'] == _get(client, auth_headers, '/api/reports/revenue?range=quarter')
+    assert bundle['expenses'] == _get(client, auth_headers, '/api/reports/expenses?range=quarter')
+
+
+def test_charts_use_calendar_months(client, auth_headers, seeded):
+    months = [row['month'] for row in _get(client, auth_headers, '/api/dashboard/charts/expenses')['data']]
+
+    assert len(months) == len(set(months)) == 12
+    assert months == sorted(months)
@@ -0,0 +1,72 @@
+import time
+from datetime import date
+
+import pytest
+
+from cache import LocalBackend, SQLiteBackend
+from extensions import cache
+from tests.query_budget import count_queries
+
+
+@pytest.fixture(params=['local', 'sqlite'])
+def backend(request, app, tmp_path):
+    if request.param == 'sqlite':
+        app.extensions['cache'] = SQLiteBackend(str(tmp_path / 'cache.db'))
+    else:
+        app.extensions['cache'] = LocalBackend(max_entries=2)
+    return app.extensions['cache']
+
+
+def test_namespaces_are_invalidated_independently(backend):
+    first, second = cache.tenant_namespace(1, 'reports'), cache.tenant_namespace(2, 'reports')
+    cache.set(first, 'summary', {'total': 1})
+    cache.set(second, 'summary', {'total': 2})
+
+    cache.invalidate(first)
+
+    assert cache.get(first, 'summary') is None
+    assert cache.get(second, 'summary') == {'total': 2}
+    assert cache.get_or_load(first, 'summary', lambda: {'total': 3}) == {'total': 3}
+    assert cache.get(first, 'summary') == {'total': 3}
+
+
+def test_entries_expire(backend):
+    cache.set('ns', 'key', 'value', ttl=0.05)
+    assert cache.get('ns', 'key') == 'value'
+    time.sleep(0.1)
+    assert cache.get('ns', 'key', default='gone') == 'gone'
+
+
+def test_local_backend_evicts_least_recently_used(app):
+    app.extensions['cache'] = LocalBackend(max_entries=2)
+    cache.set('ns', 'a', 1)
+    cache.set('ns', 'b', 2)
+    cache.get('ns', 'a')
+    cache.set('ns', 'c', 3)
+
+    assert [cache.get('ns', key) for key in 'abc'] == [1, None, 3]
+
+
+def test_report_bundles_are_cached_until_a_write(app, client, auth_headers, seeded, tmp_path):
+    app.extensions['cache'] = SQLiteBackend(str(tmp_path / 'cache.db'))
+    before = client.get('/api/reports/bundle', headers=auth_headers).get_json()
+    with count_queries() as queries:
+        assert client.get('/api/reports/bundle', headers=auth_headers).get_json() == before
+    assert queries.count == 0
+
+    response = client.post('/api/expenses', headers=auth_headers, json={
+        'description': 'New laptop', 'amount': 1000, 'category': 'office',
+        'expense_date': date.today().isoformat()
+    })
+    assert response.status_code == 201
+
+    after = client.get('/api/reports/bundle', headers=auth_headers).get_json()
+    assert after['financial']['total_expenses'] == before['financial']['total_expenses'] + 1000
+
+
+def test_report_bundles_are_not_cached_per_worker(client, auth_headers, seeded):
+    # The test app uses the local backend; another worker's write would never reach this copy
+    before = client.get('/api/reports/bundle', headers=auth_headers).get_json()
+    with count_queries() as queries:
+        assert client.get('/api/reports/bundle', headers=auth_headers).get_json() == before
+    assert queries.count > 0
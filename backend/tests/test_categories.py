@@ -0,0 +1,128 @@
+from datetime import date
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect
+
+from extensions import db
+from models.expense import Expense, ExpenseCategory
+from models.user import User
+from services.categories import (
+    cached_categories, category_ids, invalidate_added_categories, migrate_expense_categories, resolve_category_id
+)
+
+
+def _register(client, name):
+    response = client.post('/api/auth/register', json={
+        'username': name,
+        'email': f'{name}@example.com',
+        'password': 'secret',
+        'first_name': 'Tess',
+        'last_name': 'Tenant'
+    })
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def _add_expense(client, headers, category):
+    return client.post('/api/expenses', headers=headers, json={
+        'category': category, 'description': 'Thing', 'amount': 10, 'expense_date': date.today().isoformat()
+    })
+
+
+def test_new_categories_are_private_to_their_user(client, auth_headers, seeded):
+    tenant_headers = _register(client, 'tenant')
+
+    assert _add_expense(client, auth_headers, 'Project Falcon').status_code == 201
+    assert _add_expense(client, tenant_headers, 'office').status_code == 201
+    assert _add_expense(client, tenant_headers, 'Project Falcon').status_code == 201
+
+    names = [category['name'] for category in client.get(
+        '/api/expenses/categories', headers=tenant_headers
+    ).get_json()['categories']]
+    assert names.count('Project Falcon') == 1 and 'office' in names
+    falcons = ExpenseCategory.query.filter_by(name='Project Falcon').all()
+    assert {category.user_id for category in falcons} == {
+        User.query.filter_by(username=name).one().id for name in ('owner', 'tenant')
+    }
+
+    tenant_expenses = client.get('/api/expenses', headers=tenant_headers).get_json()['expenses']
+    assert {expense['category'] for expense in tenant_expenses} == {'office', 'Project Falcon'}
+    filtered = client.get('/api/expenses?category=Project Falcon', headers=tenant_headers).get_json()
+    assert filtered['total'] == 1
+
+    duplicate = client.post('/api/expenses/categories', headers=tenant_headers, json={'name': 'office'})
+    own = client.post('/api/expenses/categories', headers=tenant_headers, json={'name': 'meals'})
+    assert duplicate.status_code == 400 and own.status_code == 201
+    owner_names = {category['name'] for category in client.get(
+        '/api/expenses/categories', headers=auth_headers
+    ).get_json()['categories']}
+    assert 'meals' not in owner_names
+
+
+def test_new_categories_reach_the_cache_only_once_committed(app, seeded):
+    owner_id = User.query.filter_by(username='owner').one().id
+    cached = category_ids(owner_id), cached_categories(owner_id)
+
+    category_id = resolve_category_id(owner_id, 'Kept')
+    # Readers before the commit must not cache a row that could still roll back
+    assert (category_ids(owner_id), cached_categories(owner_id)) == cached
+    db.session.commit()
+    invalidate_added_categories()
+    assert category_ids(owner_id)['Kept'] == category_id
+
+
+def _legacy_tables():
+    """Recreate the expense tables as they were before categories had ids and owners."""
+    metadata = MetaData()
+    db.metadata.tables['user'].to_metadata(metadata)
+    legacy_category = Table(
+        'expense_category', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('name', String(50), unique=True, nullable=False),
+        Column('description', String(200)),
+        Column('color', String(7)),
+        Column('created_at', DateTime)
+    )
+    legacy_expense = Table(
+        'expense', metadata,
+        *[column._copy() for column in Expense.__table__.columns if column.name != 'category_id'],
+        Column('category', String(50), nullable=False)
+    )
+    Expense.__table__.drop(db.engine)
+    ExpenseCategory.__table__.drop(db.engine)
+    legacy_category.create(db.engine)
+    legacy_expense.create(db.engine)
+    return legacy_category, legacy_expense
+
+
+def test_migration_scopes_legacy_categories(app, auth_headers):
+    owner_id = User.query.filter_by(username='owner').one().id
+    tenant = User(username='tenant', email='tenant@example.com', first_name='Tess', last_name='Tenant')
+    tenant.set_password('secret')
+    db.session.add(tenant)
+    db.session.commit()
+    tenant_id = tenant.id
+    db.session.remove()
+
+    legacy_category, legacy_expense = _legacy_tables()
+    with db.engine.begin() as conn:
+        conn.execute(legacy_category.insert(), [{'name': name} for name in ('office', 'meals', 'unused')])
+        conn.execute(legacy_expense.insert(), [
+            {'user_id': user_id, 'category': category, 'description': 'Thing', 'amount': 5,
+             'expense_date': date.today(), 'status': 'pending'}
+            for user_id, category in [
+                (owner_id, 'office'), (owner_id, 'travel'),
+                (tenant_id, 'office'), (tenant_id, 'meals'), (tenant_id, 'lab'), (tenant_id, 'lab')
+            ]
+        ])
+
+    assert migrate_expense_categories() == {'encoded': 6, 'made_private': 1}
+
+    assert 'category' not in {column['name'] for column in inspect(db.engine).get_columns('expense')}
+    owners = {category.name: category.user_id for category in ExpenseCategory.query}
+    assert owners == {
+        'office': None, 'unused': None, 'meals': tenant_id, 'travel': owner_id, 'lab': tenant_id
+    }
+    assert set(category_ids(owner_id)) == {'office', 'unused', 'travel'}
+    assert {(expense.user_id, expense.category) for expense in Expense.query} == {
+        (owner_id, 'office'), (owner_id, 'travel'), (tenant_id, 'office'), (tenant_id, 'meals'), (tenant_id, 'lab')
+    }
+    assert migrate_expense_categories() is None
@@ -0,0 +1,67 @@
+from datetime import date
+
+from sqlalchemy import text
+
+from extensions import db
+from models.payroll import Employee, PayrollRecord, TimeEntry
+from models.user import User
+from services.employees import employee_directory
+
+
+def _owner_id():
+    return User.query.filter_by(username='owner').one().id
+
+
+def _change_elsewhere(statement, **params):
+    """Write the way another worker would: committed, but this process's cache is never told."""
+    with db.engine.begin() as connection:
+        connection.execute(text(statement), params)
+
+
+def test_directory_names_follow_employee_writes(client, auth_headers, seeded):
+    employee_id = seeded['employee_id']
+    assert employee_directory(_owner_id())[employee_id].first_name == 'Worker0'
+
+    response = client.put(f'/api/payroll/employees/{employee_id}', headers=auth_headers,
+                          json={'first_name': 'Renamed'})
+
+    assert response.status_code == 200
+    assert employee_directory(_owner_id())[employee_id].first_name == 'Renamed'
+    report = client.get('/api/reports/export/csv?type=payroll&range=month', headers=auth_headers)
+    assert 'Renamed Test' in report.get_data(as_text=True)
+
+
+def test_pay_is_computed_from_the_current_employee_row(client, auth_headers, seeded):
+    employee_id = seeded['employee_id']
+    employee_directory(_owner_id())
+    _change_elsewhere('UPDATE employee SET hourly_rate = 40 WHERE id = :id', id=employee_id)
+    today = date.today().isoformat()
+
+    response = client.post('/api/payroll/payroll', headers=auth_headers, json={
+        'employee_id': employee_id, 'pay_period_start': today, 'pay_period_end': today, 'pay_date': today,
+        'regular_hours': 10, 'overtime_hours': 1
+    })
+
+    assert response.status_code == 201
+    record = response.get_json()['payroll_record']
+    assert (record['regular_pay'], record['overtime_pay'], record['gross_pay']) == (400.0, 60.0, 460.0)
+
+
+def test_employees_deleted_elsewhere_get_no_new_rows(client, auth_headers, seeded):
+    spare_id = seeded['spare_employee_id']
+    assert spare_id in employee_directory(_owner_id())
+    _change_elsewhere('DELETE FROM employee WHERE id = :id', id=spare_id)
+    today = date.today().isoformat()
+    entry = {'employee_id': spare_id, 'date': today, 'start_time': '09:00', 'end_time': '17:00'}
+
+    payroll = client.post('/api/payroll/payroll', headers=auth_headers, json={
+        'employee_id': spare_id, 'pay_period_start': today, 'pay_period_end': today, 'pay_date': today
+    })
+    single = client.post('/api/payroll/time-entries', headers=auth_headers, json=entry)
+    bulk = client.post('/api/payroll/time-entries/bulk', headers=auth_headers, json={'entries': [entry]})
+
+    assert payroll.status_code == single.status_code == 404
+    assert bulk.status_code == 400 and bulk.get_json()['results'][0]['error'] == 'Employee not found'
+    assert PayrollRecord.query.filter_by(employee_id=spare_id).count() == 0
+    assert TimeEntry.query.filter_by(employee_id=spare_id).count() == 0
+    assert db.session.get(Employee, spare_id) is None
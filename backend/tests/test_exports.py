@@ -0,0 +1,112 @@
+import gzip
+import io
+import json
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from extensions import db
+from models.expense import Expense
+from models.invoice import Invoice
+
+START = (date.today() - timedelta(days=30)).isoformat()
+END = date.today().isoformat()
+
+
+def _download(client, url, headers):
+    """Read a streamed export in full and close it, ending its request context."""
+    response = client.get(url, headers=headers)
+    response.get_data()
+    response.close()
+    return response
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_ndjson_ledger_streams_a_header_then_one_line_per_record(app, client, auth_headers, seeded):
+    # Several batches per dataset, so records must not repeat or go missing between them
+    app.config['EXPORT_BATCH_SIZE'] = 2
+
+    response = _download(client, f'/api/reports/export/json?type=ledger&start_date={START}&end_date={END}',
+                         auth_headers)
+
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    assert response.headers['Content-Disposition'] == f'attachment; filename=ledger_{START}_to_{END}.ndjson'
+    header, *records = _ndjson(response)
+    assert header == {
+        'record_type': 'export', 'start_date': START, 'end_date': END,
+        'datasets': ['invoices', 'expenses', 'payroll_records', 'time_entries']
+    }
+    assert list(Counter(record['record_type'] for record in records).items()) == [
+        ('invoice', 5), ('expense', 5), ('payroll_record', 5), ('time_entry', 10)
+    ]
+
+    invoices = {record['id']: record for record in records if record['record_type'] == 'invoice'}
+    assert set(invoices) == {invoice.id for invoice in Invoice.query}
+    invoice = invoices[seeded['invoice_id']]
+    assert (invoice['total_amount'], invoice['issue_date']) == (330.0, (date.today() - timedelta(days=1)).isoformat())
+    assert [item['total'] for item in invoice['items']] == [100.0] * 3
+    assert {item['invoice_id'] for item in invoice['items']} == {invoice['id']}
+    assert [payment['amount'] for payment in invoice['payments']] == [50.0, 50.0]
+    assert invoices[seeded['draft_invoice_id']]['payments'] == []
+    expense = next(record for record in records if record.get('id') == seeded['expense_id']
+                   and record['record_type'] == 'expense')
+    assert expense['category'] == db.session.get(Expense, seeded['expense_id']).category
+
+
+def test_ndjson_ledger_filters_datasets_and_compresses(client, auth_headers, seeded):
+    url = f'/api/reports/export/json?type=ledger&start_date={START}&end_date={END}&datasets=expenses'
+
+    plain = _download(client, url, auth_headers)
+    compressed = _download(client, url + '&compress=gzip', auth_headers)
+    unknown = client.get(url + ',payments', headers=auth_headers)
+
+    assert [record['record_type'] for record in _ndjson(plain)] == ['export'] + ['expense'] * 5
+    assert compressed.mimetype == 'application/gzip'
+    assert compressed.headers['Content-Disposition'].endswith('.ndjson.gz')
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+    assert unknown.status_code == 400
+
+
+def test_parquet_and_arrow_exports_carry_the_ledger_columns_and_types(app, client, auth_headers, seeded):
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    app.config['EXPORT_BATCH_SIZE'] = 2
+    url = f'/api/reports/export/columnar?dataset=invoices&start_date={START}&end_date={END}'
+
+    parquet = _download(client, url, auth_headers)
+    arrow = _download(client, url + '&format=arrow', auth_headers)
+
+    assert parquet.headers['Content-Disposition'] == f'attachment; filename=invoices_{START}_to_{END}.parquet'
+    assert arrow.mimetype == 'application/vnd.apache.arrow.stream'
+    parquet_file = pq.ParquetFile(io.BytesIO(parquet.get_data()))
+    # One row group and one stream batch per fetched batch of rows
+    assert parquet_file.metadata.num_row_groups == 3
+    batches = list(pa.ipc.open_stream(arrow.get_data()))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+
+    table = parquet_file.read()
+    assert table.equals(pa.Table.from_batches(batches))
+    assert table.column_names == [column.name for column in Invoice.__table__.columns]
+    assert table.schema.field('total_amount').type == pa.decimal128(10, 2)
+    assert table.schema.field('issue_date').type == pa.date32()
+    assert table.schema.field('created_at').type == pa.timestamp('us')
+    invoices = Invoice.query.order_by(Invoice.id).all()
+    assert table.column('id').to_pylist() == [invoice.id for invoice in invoices]
+    assert table.column('total_amount').to_pylist() == [Decimal('330.00')] * 5
+    assert table.column('issue_date').to_pylist() == [invoice.issue_date for invoice in invoices]
+
+
+def test_columnar_export_rejects_unknown_datasets_and_formats(client, auth_headers, seeded):
+    pytest.importorskip('pyarrow')
+
+    dataset = client.get('/api/reports/export/columnar?dataset=users', headers=auth_headers)
+    export_format = client.get('/api/reports/export/columnar?format=csv', headers=auth_headers)
+    queued_arrow = client.get('/api/reports/export/columnar?format=arrow&async=1', headers=auth_headers)
+
+    assert dataset.status_code == export_format.status_code == queued_arrow.status_code == 400
+    assert queued_arrow.get_json()['error'] == 'Queued exports are written as parquet'
@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func
+
+from extensions import db
+from models.invoice import Invoice
+from models.ledger import AccountBalanceCheckpoint, JournalLine, LedgerAccount
+from models.user import User
+from services.general_ledger import RECEIVABLES, backfill_ledger, balances_as_of, roll_checkpoints
+
+
+def _owner_id():
+    return User.query.filter_by(username='owner').one().id
+
+
+def _full_history_balances(user_id, as_of):
+    rows = db.session.query(
+        JournalLine.account_id,
+        func.sum(JournalLine.debit - JournalLine.credit)
+    ).join(LedgerAccount).filter(
+        LedgerAccount.user_id == user_id,
+        JournalLine.entry_date <= as_of
+    ).group_by(JournalLine.account_id).all()
+    return {account_id: Decimal(net).quantize(Decimal('0.01')) for account_id, net in rows if net}
+
+
+def _receivables_id(user_id):
+    return LedgerAccount.query.filter_by(user_id=user_id, code=RECEIVABLES).one().id
+
+
+def test_backfilled_ledger_balances(client, auth_headers, seeded):
+    trial = client.get('/api/ledger/trial-balance', headers=auth_headers).get_json()
+
+    assert trial['balanced']
+    assert trial['total_debits'] > 0
+    # Re-running the backfill finds everything already posted
+    written = backfill_ledger(_owner_id())
+    written.pop('checkpoints')
+    assert set(written.values()) == {0}
+
+
+def test_checkpointed_balances_match_the_full_history(client, auth_headers, seeded):
+    user_id = _owner_id()
+    today = date.today()
+    # Move some activity into earlier months so there is something to checkpoint
+    for months_back, invoice_id in enumerate((seeded['invoice_id'], seeded['draft_invoice_id']), start=2):
+        response = client.put(f'/api/invoices/{invoice_id}', headers=auth_headers, json={
+            'status': 'sent', 'issue_date': (today - timedelta(days=31 * months_back)).isoformat()
+        })
+        assert response.status_code == 200
+
+    assert roll_checkpoints(user_id) > 0
+    db.session.commit()
+
+    # A backdated write after the checkpoints were stored shifts them
+    response = client.put(f"/api/invoices/{seeded['draft_invoice_id']}", headers=auth_headers, json={
+        'items': [{'description': 'Repriced', 'quantity': 1, 'unit_price': 999}]
+    })
+    assert response.status_code == 200
+    assert AccountBalanceCheckpoint.query.count() > 0
+
+    for days_back in (0, 20, 45, 75, 120):
+        as_of = today - timedelta(days=days_back)
+        balances = {account_id: net for account_id, net in balances_as_of(user_id, as_of).items() if net}
+        assert balances == _full_history_balances(user_id, as_of), as_of
+
+
+def test_deleting_a_source_reverses_its_postings(client, auth_headers, seeded):
+    user_id = _owner_id()
+    invoice_id = seeded['draft_invoice_id']
+    before = balances_as_of(user_id, date.today())[_receivables_id(user_id)]
+
+    client.post(f'/api/invoices/{invoice_id}/send', headers=auth_headers)
+    total = Decimal(str(db.session.get(Invoice, invoice_id).total_amount))
+    assert balances_as_of(user_id, date.today())[_receivables_id(user_id)] == before + total
+
+    assert client.delete(f'/api/invoices/{invoice_id}', headers=auth_headers).status_code == 200
+    assert balances_as_of(user_id, date.today())[_receivables_id(user_id)] == before
+
+    entries = client.get(
+        f'/api/ledger/entries?source_type=invoice&source_id={invoice_id}', headers=auth_headers
+    ).get_json()['entries']
+    assert [entry['description'].endswith('(reversed)') for entry in entries] == [True, False]
@@ -0,0 +1,81 @@
+import io
+import os
+import zipfile
+from datetime import date
+
+import services.invoice_documents as invoice_documents
+from extensions import db
+from models.invoice import Invoice
+from services.invoice_pdf import render_invoice_pdf
+from services.jobs import claim_next_job, run_job
+
+
+def _count_renders(monkeypatch):
+    calls = []
+    render = invoice_documents.write_invoice_pdf
+
+    def counting(invoice, path):
+        calls.append(invoice['id'])
+        return render(invoice, path)
+
+    monkeypatch.setattr(invoice_documents, 'write_invoice_pdf', counting)
+    return calls
+
+
+def test_invoice_pdf_renders_once_per_version(client, auth_headers, seeded, monkeypatch):
+    renders = _count_renders(monkeypatch)
+    url = f"/api/invoices/{seeded['invoice_id']}/pdf"
+
+    first = client.get(url, headers=auth_headers)
+    again = client.get(url, headers=auth_headers)
+
+    assert first.status_code == again.status_code == 200
+    assert first.mimetype == 'application/pdf'
+    assert first.data.startswith(b'%PDF-1.4') and first.data.rstrip().endswith(b'%%EOF')
+    assert again.data == first.data
+    assert renders == [seeded['invoice_id']]
+
+    client.put(f"/api/invoices/{seeded['invoice_id']}", headers=auth_headers, json={'notes': 'Net 30'})
+    edited = client.get(url, headers=auth_headers)
+
+    assert edited.data != first.data
+    assert renders == [seeded['invoice_id']] * 2
+    folder = os.path.dirname(invoice_documents.cached_pdf_path(db.session.get(Invoice, seeded['invoice_id'])))
+    assert len(os.listdir(folder)) == 1  # The superseded version was removed
+
+
+def test_long_invoices_span_pages():
+    items = [{'description': f'Line (item) {n}', 'quantity': 1.5, 'unit_price': 10, 'total': 15} for n in range(50)]
+    pdf = render_invoice_pdf({
+        'id': 1, 'invoice_number': 'INV-1', 'client_name': 'Café', 'client_email': None, 'client_address': 'A\nB',
+        'issue_date': '2026-01-01', 'due_date': '2026-01-31', 'subtotal': 750, 'tax_rate': 0, 'tax_amount': 0,
+        'total_amount': 750, 'status': 'sent', 'notes': None, 'updated_at': '2026-01-01T00:00:00',
+        'items': items, 'payments': [{'amount': 100}]
+    })
+
+    assert b'/Count 3' in pdf
+
+
+def test_batch_job_renders_across_processes_and_reuses_cached_pdfs(app, client, auth_headers, seeded):
+    app.config.update(INVOICE_PDF_PROCESSES=2, INVOICE_PDF_POOL_MIN=2)
+    client.get(f"/api/invoices/{seeded['invoice_id']}/pdf", headers=auth_headers)
+    body = {'start_date': '2000-01-01', 'end_date': date.today().isoformat()}
+
+    def run_batch():
+        response = client.post('/api/invoices/pdf/batch', headers=auth_headers, json=body)
+        assert response.status_code == 202
+        job = run_job(claim_next_job('test'), app.config)
+        assert job.status == 'succeeded', job.error
+        return job
+
+    first = run_batch()
+    second = run_batch()
+
+    summary = first.to_dict()['result']
+    assert summary['invoices'] > 2
+    assert summary['cached'] == 1 and summary['rendered'] == summary['invoices'] - 1
+    assert second.to_dict()['result']['rendered'] == 0
+    with zipfile.ZipFile(io.BytesIO(first.result_data)) as archive:
+        names = archive.namelist()
+        assert len(names) == summary['invoices']
+        assert all(archive.read(name).startswith(b'%PDF') for name in names)
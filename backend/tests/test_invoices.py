@@ -0,0 +1,138 @@
+from datetime import date
+
+from extensions import db
+from models.invoice import Invoice
+from tests.query_budget import count_queries
+
+
+def _bulk_entry(client_name, *items, tax_rate=10):
+    return {
+        'client_name': client_name,
+        'issue_date': date.today().isoformat(),
+        'due_date': date.today().isoformat(),
+        'tax_rate': tax_rate,
+        'items': [{'description': 'Work', 'quantity': quantity, 'unit_price': price} for quantity, price in items]
+    }
+
+
+def test_bulk_create_reports_each_invoice_in_request_order(app, client, auth_headers):
+    # A chunk size of 2 puts the valid invoices in two transactions
+    app.config['BULK_INSERT_CHUNK_SIZE'] = 2
+    entries = [
+        _bulk_entry('First', (2, 10.5), (1, 0.333)),
+        {'client_name': 'No items', 'issue_date': '2026-01-01', 'due_date': '2026-01-31'},
+        _bulk_entry('Second', (3, 100)),
+        dict(_bulk_entry('Bad date', (1, 1)), issue_date='01/02/2026'),
+        _bulk_entry('Third', (1, 19.99), tax_rate=0),
+        'not an invoice'
+    ]
+
+    response = client.post('/api/invoices/bulk', headers=auth_headers, json={'invoices': entries})
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (3, 3)
+    results = body['results']
+    assert [result['index'] for result in results] == list(range(6))
+    assert [result['status'] for result in results] == ['created', 'error'] * 3
+    assert results[1]['error'] == 'items is required'
+    assert results[3]['error'] == 'Dates must use the YYYY-MM-DD format'
+    assert results[5]['error'] == 'Invoice must be an object'
+    assert [result['total_amount'] for result in results[::2]] == [23.46, 330.0, 19.99]
+    assert len({result['invoice_number'] for result in results[::2]}) == 3
+
+    for result, client_name, line_totals in zip(results[::2], ['First', 'Second', 'Third'],
+                                                [[21.0, 0.33], [300.0], [19.99]]):
+        invoice = db.session.get(Invoice, result['id']).to_dict()
+        assert (invoice['client_name'], invoice['invoice_number']) == (client_name, result['invoice_number'])
+        assert [item['total'] for item in invoice['items']] == line_totals
+        assert invoice['total_amount'] == result['total_amount']
+    assert Invoice.query.count() == 3
+
+
+def test_bulk_create_rejects_a_request_with_nothing_to_create(app, client, auth_headers):
+    app.config['BULK_MAX_INVOICES'] = 2
+
+    invalid = client.post('/api/invoices/bulk', headers=auth_headers, json={'invoices': [{'client_name': 'Only'}]})
+    too_many = client.post('/api/invoices/bulk', headers=auth_headers, json={
+        'invoices': [_bulk_entry(f'Client {n}', (1, 10)) for n in range(3)]
+    })
+    empty = client.post('/api/invoices/bulk', headers=auth_headers, json={'invoices': []})
+
+    assert invalid.status_code == 400 and invalid.get_json()['created'] == 0
+    assert too_many.status_code == 400 and 'At most 2 invoices' in too_many.get_json()['error']
+    assert empty.status_code == 400
+    assert Invoice.query.count() == 0
+
+
+def test_bulk_create_returns_201_when_every_invoice_is_created(client, auth_headers):
+    response = client.post('/api/invoices/bulk', headers=auth_headers, json={
+        'invoices': [_bulk_entry('One', (1, 10)), _bulk_entry('Two', (2, 10))]
+    })
+
+    assert response.status_code == 201
+    assert response.get_json()['message'] == 'Created 2 of 2 invoices'
+
+
+def _item_updates(queries):
+    return [statement for statement in queries.statements if statement.startswith('UPDATE invoice_item')]
+
+
+def test_item_list_updates_inserts_and_deletes_only_what_changed(client, auth_headers, seeded):
+    invoice_id = seeded['invoice_id']
+    kept, changed, dropped = [item['id'] for item in client.get(
+        f'/api/invoices/{invoice_id}', headers=auth_headers
+    ).get_json()['invoice']['items']]
+
+    with count_queries() as queries:
+        response = client.put(f'/api/invoices/{invoice_id}', headers=auth_headers, json={'items': [
+            {'id': kept, 'description': 'Line 0', 'quantity': 1, 'unit_price': 100},
+            {'id': changed, 'quantity': 2.5},
+            {'description': 'Added', 'quantity': 3, 'unit_price': 16.5}
+        ]})
+
+    assert response.status_code == 200
+    invoice = response.get_json()['invoice']
+    items = {item['description']: item for item in invoice['items']}
+    assert set(items) == {'Line 0', 'Line 1', 'Added'} and dropped not in {item['id'] for item in invoice['items']}
+    assert (items['Line 0']['id'], items['Line 1']['id']) == (kept, changed)
+    assert (items['Line 1']['total'], items['Added']['total']) == (250.0, 49.5)
+    # The same totals a full recompute at 10% tax gives
+    assert (invoice['subtotal'], invoice['tax_amount'], invoice['total_amount']) == (399.5, 39.95, 439.45)
+    assert len(_item_updates(queries)) == 1
+
+
+def test_unknown_item_ids_leave_the_invoice_untouched(client, auth_headers, seeded):
+    invoice_id = seeded['invoice_id']
+    before = client.get(f'/api/invoices/{invoice_id}', headers=auth_headers).get_json()['invoice']
+
+    unknown = client.put(f'/api/invoices/{invoice_id}', headers=auth_headers, json={'items': [
+        {'id': seeded['item_id'], 'quantity': 5}, {'id': 999999, 'quantity': 1}
+    ]})
+    incomplete = client.put(f'/api/invoices/{invoice_id}', headers=auth_headers, json={'items': [
+        {'description': 'No price', 'quantity': 1}
+    ]})
+
+    assert unknown.status_code == 400 and unknown.get_json()['error'] == 'Invoice item 999999 not found'
+    assert incomplete.status_code == 400
+    after = client.get(f'/api/invoices/{invoice_id}', headers=auth_headers).get_json()['invoice']
+    assert (after['items'], after['total_amount']) == (before['items'], before['total_amount'])
+
+
+def test_patching_one_item_adjusts_the_invoice_totals(client, auth_headers, seeded):
+    url = f"/api/invoices/{seeded['invoice_id']}/items/{seeded['item_id']}"
+
+    unchanged = client.patch(url, headers=auth_headers, json={'quantity': 1})
+    with count_queries() as queries:
+        response = client.patch(url, headers=auth_headers, json={'unit_price': 40.5})
+
+    assert unchanged.get_json()['invoice']['total_amount'] == 330.0
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['item']['total'] == 40.5
+    assert body['invoice'] == {
+        'id': seeded['invoice_id'], 'subtotal': 240.5, 'tax_amount': 24.05, 'total_amount': 264.55
+    }
+    assert len(_item_updates(queries)) == 1
+    assert client.patch(f"/api/invoices/{seeded['draft_invoice_id']}/items/{seeded['item_id']}",
+                        headers=auth_headers, json={'quantity': 2}).status_code == 404
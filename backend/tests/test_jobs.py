@@ -0,0 +1,94 @@
+import time
+from datetime import datetime, timedelta
+
+from extensions import db
+from models.job import Job
+from models.user import User
+from services.jobs import JOB_HANDLERS, Heartbeat, claim_next_job, enqueue_job, requeue_stale_jobs, run_job, work
+
+
+def slow_job(user_id, payload, config):
+    time.sleep(payload['seconds'])
+    return {'slept': payload['seconds']}
+
+
+def _queue(count):
+    user_id = User.query.filter_by(username='owner').one().id
+    return [enqueue_job(user_id, 'payroll.process').id for _ in range(count)]
+
+
+def test_each_job_is_claimed_once_in_order(app, auth_headers):
+    first, second = _queue(2)
+
+    claims = [claim_next_job('worker-a'), claim_next_job('worker-b'), claim_next_job('worker-c')]
+
+    assert [job.id for job in claims[:2]] == [first, second] and claims[2] is None
+    assert [(job.status, job.worker, job.attempts) for job in claims[:2]] == [
+        ('running', 'worker-a', 1), ('running', 'worker-b', 1)
+    ]
+    assert claims[0].heartbeat_at is not None
+
+
+def _running(job_id, heartbeat_age, attempts=1):
+    job = db.session.get(Job, job_id)
+    job.status, job.worker, job.attempts = 'running', 'gone:1', attempts
+    job.started_at = job.heartbeat_at = datetime.utcnow() - timedelta(seconds=heartbeat_age)
+    db.session.commit()
+
+
+def test_only_jobs_of_dead_workers_are_requeued(app, auth_headers):
+    alive, dead, exhausted, legacy = _queue(4)
+    # Started long ago but still beating
+    _running(alive, 3600)
+    db.session.get(Job, alive).heartbeat_at = datetime.utcnow()
+    _running(dead, 600)
+    _running(exhausted, 600, attempts=3)
+    _running(legacy, 600)
+    db.session.get(Job, legacy).heartbeat_at = None  # claimed before heartbeats existed
+    db.session.commit()
+
+    assert requeue_stale_jobs(stale_after=300, max_attempts=3) == (2, 1)
+
+    statuses = {job.id: (job.status, job.worker) for job in Job.query}
+    assert statuses[alive] == ('running', 'gone:1')
+    assert statuses[dead] == statuses[legacy] == ('queued', None)
+    assert statuses[exhausted] == ('failed', None)
+    assert 'after 3 attempts' in db.session.get(Job, exhausted).error
+    assert claim_next_job('worker').attempts == 2
+
+
+def test_heartbeats_keep_a_long_job_alive(app, auth_headers):
+    [job_id] = _queue(1)
+    job = claim_next_job('worker')
+    claimed_heartbeat = job.heartbeat_at
+
+    with Heartbeat(db.engine, job_id, 'worker', interval=0.05):
+        time.sleep(0.3)
+
+    db.session.expire_all()
+    assert db.session.get(Job, job_id).heartbeat_at > claimed_heartbeat
+    assert requeue_stale_jobs(stale_after=0.2, max_attempts=3) == (0, 0)
+
+
+def test_workers_run_jobs_with_a_heartbeat(app, auth_headers, monkeypatch):
+    monkeypatch.setitem(JOB_HANDLERS, 'test.slow', 'tests.test_jobs:slow_job')
+    user_id = User.query.filter_by(username='owner').one().id
+    job_id = enqueue_job(user_id, 'test.slow', {'seconds': 0.2}).id
+    app.config['JOB_HEARTBEAT_INTERVAL'] = 0.05
+
+    work(app, burst=True)
+
+    job = db.session.get(Job, job_id)
+    assert job.status == 'succeeded' and job.to_dict()['result'] == {'slept': 0.2}
+    assert job.heartbeat_at > job.started_at
+
+
+def test_failed_handlers_record_the_error(app, auth_headers, monkeypatch):
+    monkeypatch.setitem(JOB_HANDLERS, 'test.slow', 'tests.test_jobs:slow_job')
+    user_id = User.query.filter_by(username='owner').one().id
+    enqueue_job(user_id, 'test.slow', {})
+
+    job = run_job(claim_next_job('worker'), app.config)
+
+    assert job.status == 'failed' and job.error.startswith('KeyError')
+    assert job.finished_at is not None
@@ -0,0 +1,185 @@
+import email
+import smtplib
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from extensions import db
+from models.invoice import Invoice
+from models.outbox import OutboxMessage
+from services.outbox import ClaimHeartbeat, claim_batch, dispatch_batch, queue_invoice_email, requeue_stale_messages, run_dispatcher
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """A local SMTP server that records what it accepts; ``reject`` maps addresses to reply codes."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, reject=None):
+        super().__init__(('127.0.0.1', 0), SMTPStandInHandler)
+        self.reject = reject or {}
+        self.connections = 0
+        self.messages = []
+
+
+class SMTPStandInHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 stand-in ready')
+        recipients = []
+        for line in self.rfile:
+            verb, _, argument = line.decode().strip().partition(' ')
+            verb = verb.upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 stand-in')
+            elif verb in ('MAIL', 'RSET'):
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = argument.partition(':')[2].strip().strip('<>')
+                code = self.server.reject.get(address)
+                if code:
+                    self.reply(f'{code} Recipient rejected')
+                else:
+                    recipients.append(address)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = b''.join(iter(lambda: self.rfile.readline(), b'.\r\n'))
+                self.server.messages.append((recipients, email.message_from_bytes(data)))
+                self.reply('250 OK queued')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+@pytest.fixture
+def smtp_server(app):
+    server = SMTPStandIn(reject={'client0@example.com': 550, 'client2@example.com': 451})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app.config.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=server.server_address[1], OUTBOX_BATCH_SIZE=2)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _queue_all_invoices():
+    messages = [queue_invoice_email(invoice) for invoice in Invoice.query.order_by(Invoice.id)]
+    db.session.commit()
+    return messages
+
+
+def test_send_invoice_queues_the_email_without_contacting_the_mail_server(client, auth_headers, seeded, monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise AssertionError('send_invoice must not talk to SMTP')
+
+    monkeypatch.setattr(smtplib, 'SMTP', unreachable)
+
+    response = client.post(f"/api/invoices/{seeded['draft_invoice_id']}/send", headers=auth_headers)
+
+    assert response.status_code == 200
+    message = OutboxMessage.query.filter_by(invoice_id=seeded['draft_invoice_id']).one()
+    assert (message.status, message.recipient) == ('pending', 'client0@example.com')
+
+
+def test_dispatcher_sends_batches_over_one_connection_and_backs_off(app, client, auth_headers, seeded, smtp_server):
+    messages = _queue_all_invoices()
+    started = datetime.utcnow()
+
+    assert run_dispatcher(app, burst=True) == len(messages)
+
+    by_recipient = {message.recipient: db.session.get(OutboxMessage, message.id) for message in messages}
+    assert smtp_server.connections == 1
+    accepted = set(by_recipient) - {'client0@example.com', 'client2@example.com'}
+    assert sorted(to for (to,), _ in smtp_server.messages) == sorted(accepted)
+    _, delivered = smtp_server.messages[0]
+    assert [part.get_content_type() for part in delivered.walk()][-1] == 'application/pdf'
+
+    rejected, deferred = by_recipient['client0@example.com'], by_recipient['client2@example.com']
+    assert rejected.status == 'failed'  # 5xx: retrying will not help
+    assert deferred.status == 'pending' and deferred.attempts == 1
+    assert deferred.next_attempt_at >= started + timedelta(seconds=app.config['OUTBOX_RETRY_BASE'])
+
+    # With the server gone the retry is deferred again, for twice as long
+    smtp_server.shutdown()
+    smtp_server.server_close()
+    deferred.next_attempt_at = datetime.utcnow()
+    db.session.commit()
+    retried_at = datetime.utcnow()
+    run_dispatcher(app, burst=True)
+    deferred = db.session.get(OutboxMessage, deferred.id)
+    assert deferred.status == 'pending' and deferred.attempts == 2
+    assert deferred.next_attempt_at >= retried_at + timedelta(seconds=2 * app.config['OUTBOX_RETRY_BASE'])
+
+    status = client.get('/api/outbox', headers=auth_headers).get_json()
+    assert status['counts'] == {'sent': len(messages) - 2, 'pending': 1, 'failed': 2}
+
+
+class CrashingConnection:
+    """Delivers ``survive`` messages, then dies the way a killed dispatcher would."""
+
+    def __init__(self, survive):
+        self.survive = survive
+        self.sent = []
+
+    def send(self, message):
+        if len(self.sent) == self.survive:
+            raise KeyboardInterrupt
+        self.sent.append(message['To'])
+
+    def close(self):
+        pass
+
+
+def test_delivered_messages_stay_sent_when_the_dispatcher_dies(app, seeded):
+    messages = _queue_all_invoices()
+    app.config['OUTBOX_BATCH_SIZE'] = len(messages)
+
+    with pytest.raises(KeyboardInterrupt):
+        dispatch_batch(CrashingConnection(survive=2), 'doomed', app.config)
+    db.session.rollback()
+
+    statuses = [db.session.get(OutboxMessage, message.id).status for message in messages]
+    assert statuses[:2] == ['sent', 'sent']
+    assert set(statuses[2:]) == {'sending'}
+
+
+def test_stale_messages_are_requeued_until_they_run_out_of_attempts(app, seeded):
+    messages = _queue_all_invoices()
+    app.config.update(OUTBOX_BATCH_SIZE=len(messages), OUTBOX_MAX_ATTEMPTS=2)
+    stale_after = -1  # Treat every claim as abandoned
+
+    for attempt in (1, 2):
+        with pytest.raises(KeyboardInterrupt):
+            dispatch_batch(CrashingConnection(survive=0), 'doomed', app.config)
+        db.session.rollback()
+        requeued, failed = requeue_stale_messages(stale_after, app.config['OUTBOX_MAX_ATTEMPTS'])
+        assert (requeued, failed) == ((len(messages), 0) if attempt == 1 else (0, len(messages)))
+
+    poison = db.session.get(OutboxMessage, messages[0].id)
+    assert poison.status == 'failed' and poison.attempts == 2
+    assert 'gave up after 2 attempts' in poison.last_error
+    assert claim_batch('next', len(messages)) == []
+
+
+def test_a_slow_live_dispatcher_keeps_its_claim(app, seeded):
+    messages = _queue_all_invoices()
+    claim_batch('slow', len(messages))
+    claimed_at = db.session.get(OutboxMessage, messages[0].id).claimed_at
+
+    with ClaimHeartbeat(db.engine, 'slow', interval=0.05):
+        time.sleep(0.3)
+
+    db.session.expire_all()
+    assert db.session.get(OutboxMessage, messages[0].id).claimed_at > claimed_at
+    assert requeue_stale_messages(stale_after=0.2, max_attempts=3) == (0, 0)
+    assert {db.session.get(OutboxMessage, message.id).status for message in messages} == {'sending'}
@@ -0,0 +1,103 @@
+from datetime import date, time, timedelta
+
+from extensions import db
+from models.payroll import Employee, PayrollRecord, TimeEntry
+from models.user import User
+from services.overtime import compute_overtime, overtime_for_period, split_week, workweek_start
+from services.payroll_run import run_payroll
+
+MONDAY = date(2026, 3, 2)
+
+
+def _week(*hours, start=MONDAY):
+    return [(start + timedelta(days=n), h) for n, h in enumerate(hours)]
+
+
+def test_workweeks_start_on_the_configured_day():
+    assert workweek_start(date(2026, 3, 8)) == MONDAY
+    assert workweek_start(date(2026, 3, 8), week_start_day=6) == date(2026, 3, 8)
+    assert workweek_start(date(2026, 3, 7), week_start_day=6) == date(2026, 3, 1)
+
+
+def test_weekly_threshold_spills_into_overtime():
+    assert split_week(_week(8, 8, 8, 8, 8), weekly_threshold=40) == (40, 0)
+    assert split_week(_week(8, 8, 8, 8, 8, 6), weekly_threshold=40) == (40, 6)
+    assert split_week(_week(10, 10, 10, 10, 10), weekly_threshold=0) == (50, 0)
+
+
+def test_daily_rule_counts_before_the_weekly_one():
+    assert split_week(_week(10, 4), daily_threshold=8) == (12, 2)
+    # 4 daily overtime hours leave 40 regular, so the weekly rule adds nothing
+    assert split_week(_week(10, 10, 8, 8, 8), daily_threshold=8, weekly_threshold=40) == (40, 4)
+    assert split_week(_week(8, 8, 8, 8, 8, 8), daily_threshold=8, weekly_threshold=40) == (40, 8)
+
+
+def test_days_are_summed_and_bucketed_per_employee_and_week():
+    next_week = MONDAY + timedelta(days=7)
+    rows = [(1, MONDAY, 5), (1, MONDAY, 5), (2, MONDAY, 4), (1, next_week, 9), (1, next_week + timedelta(days=1), 9)]
+
+    summary = compute_overtime(rows)
+
+    assert summary[1]['regular_hours'] == 24 and summary[1]['overtime_hours'] == 4
+    assert [week['week_start'] for week in summary[1]['weeks']] == ['2026-03-02', '2026-03-09']
+    assert summary[2] == {
+        'regular_hours': 4, 'overtime_hours': 0,
+        'weeks': [{'week_start': '2026-03-02', 'regular_hours': 4, 'overtime_hours': 0}]
+    }
+
+
+def test_a_straddling_week_is_split_whole_and_counted_once():
+    # 10 hours Monday to Friday is 40 regular and 10 overtime, whichever period each day falls in
+    rows = [(1, day, hours) for day, hours in _week(10, 10, 10, 10, 10)]
+    first_half = MONDAY + timedelta(days=1)
+
+    before = compute_overtime(rows, daily_threshold=0, end_date=first_half)[1]
+    after = compute_overtime(rows, daily_threshold=0, start_date=first_half + timedelta(days=1))[1]
+
+    assert (before['regular_hours'], before['overtime_hours']) == (20, 0)
+    assert (after['regular_hours'], after['overtime_hours']) == (20, 10)
+    assert compute_overtime(rows, end_date=MONDAY - timedelta(days=1)) == {}
+
+
+def _hourly_employee(user_id, daily_hours):
+    employee = Employee(
+        user_id=user_id, employee_id='EMP-OT', first_name='Otto', last_name='Time',
+        email='otto@example.com', hire_date=MONDAY - timedelta(days=365), salary=52000, hourly_rate=20,
+        time_entries=[
+            TimeEntry(date=day, start_time=time(8, 0), end_time=time(18, 0), hours_worked=hours)
+            for day, hours in daily_hours
+        ]
+    )
+    db.session.add(employee)
+    db.session.commit()
+    return employee
+
+
+def test_pay_periods_follow_workweeks(app, auth_headers):
+    user_id = User.query.filter_by(username='owner').one().id
+    # Two weeks of 10-hour weekdays, then a week of 12-hour weekdays
+    employee = _hourly_employee(user_id, _week(*[10] * 5) + _week(*[10] * 5, start=MONDAY + timedelta(days=7))
+                                + _week(*[12] * 5, start=MONDAY + timedelta(days=14)))
+
+    # Any day of the third week pays the two complete weeks before it
+    [record] = run_payroll(user_id, app.config, end_date=MONDAY + timedelta(days=17))
+    assert (record.pay_period_start, record.pay_period_end) == (MONDAY, MONDAY + timedelta(days=13))
+    assert (float(record.regular_hours), float(record.overtime_hours)) == (80, 20)
+    assert run_payroll(user_id, app.config, end_date=MONDAY + timedelta(days=19)) == []
+
+    # The week's last day closes it; the next period starts the day after the last one ended
+    [record] = run_payroll(user_id, app.config, end_date=MONDAY + timedelta(days=27))
+    assert record.pay_period_start == MONDAY + timedelta(days=14)
+    assert (float(record.regular_hours), float(record.overtime_hours)) == (40, 20)
+    assert PayrollRecord.query.filter_by(employee_id=employee.id).count() == 2
+
+
+def test_manual_periods_see_the_whole_workweek(app, auth_headers):
+    user_id = User.query.filter_by(username='owner').one().id
+    employee = _hourly_employee(user_id, _week(10, 10, 10, 10, 10))
+    config = dict(app.config, OVERTIME_DAILY_THRESHOLD=0)
+
+    hours = overtime_for_period(user_id, MONDAY + timedelta(days=3), MONDAY + timedelta(days=6), config)
+
+    assert hours[employee.id]['regular_hours'] == 10
+    assert hours[employee.id]['overtime_hours'] == 10
@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+import pytest
+
+from extensions import db
+from models.payroll import Employee, PayrollRecord
+from models.user import User
+from services.payroll_tax import (
+    TaxTables, calculate_withholdings, calculate_withholdings_ytd, load_tax_tables, periods_per_year
+)
+
+# Round numbers so expected amounts can be worked out by hand
+TABLES = TaxTables({
+    'federal': {'standard_deduction': 1000, 'brackets': [{'over': 0, 'rate': 0.10}, {'over': 10000, 'rate': 0.20}]},
+    'state': {'brackets': [{'over': 0, 'rate': 0.05}]},
+    'social_security': {'rate': 0.10, 'wage_base': 10000},
+    'medicare': {'rate': 0.01, 'additional_rate': 0.01, 'additional_threshold': 10000}
+})
+
+
+def test_brackets_tax_each_slice_at_its_rate():
+    assert TABLES.federal.annual_tax(1000) == 0
+    assert TABLES.federal.annual_tax(11000) == pytest.approx(1000)
+    assert TABLES.federal.annual_tax(21000) == pytest.approx(1000 + 10000 * 0.20)
+
+
+def test_income_tax_is_annualized_per_pay_frequency():
+    semiannual = calculate_withholdings([5500], periods_per_year=2, tables=TABLES)
+    annual = calculate_withholdings([5500], periods_per_year=1, tables=TABLES)
+
+    # 11,000 a year less the deduction is 10,000 at 10%; 5,500 a year leaves 4,500
+    assert semiannual['federal_tax'] == [500.0] and annual['federal_tax'] == [450.0]
+    assert semiannual['state_tax'] == annual['state_tax'] == [275.0]
+
+
+def test_wage_base_and_medicare_threshold_follow_year_to_date_pay():
+    withholdings = calculate_withholdings([5500, 5500, 5500], periods_per_year=2, ytd_gross=[0, 8000, 12000], tables=TABLES)
+
+    assert withholdings['social_security'] == [550.0, 200.0, 0.0]
+    assert withholdings['medicare'] == [55.0, 55.0 + 35.0, 55.0 + 55.0]
+    assert withholdings['total'][1] == round(500 + 275 + 200 + 90, 2)
+
+
+def test_year_to_date_pay_comes_from_earlier_records_this_year(app, auth_headers):
+    user_id = User.query.filter_by(username='owner').one().id
+    pay_date = date(2026, 6, 30)
+    employees = [
+        Employee(
+            user_id=user_id, employee_id=f'EMP-TAX-{n}', first_name='Tax', last_name=str(n),
+            email=f'tax{n}@example.com', hire_date=date(2020, 1, 1), salary=52000,
+            payroll_records=[
+                PayrollRecord(pay_period_start=day - timedelta(days=13), pay_period_end=day, pay_date=day,
+                              gross_pay=gross, net_pay=gross)
+                for day, gross in records
+            ]
+        )
+        for n, records in enumerate([
+            [(date(2026, 3, 31), 6000), (date(2026, 5, 31), 2000)],
+            # Last year's pay and this run's own date do not count
+            [(date(2025, 12, 31), 9000), (pay_date, 9000)],
+        ])
+    ]
+    db.session.add_all(employees)
+    db.session.commit()
+
+    withholdings = calculate_withholdings_ytd([employee.id for employee in employees], [5500, 5500], pay_date,
+                                              periods_per_year=2, tables=TABLES)
+
+    assert withholdings['social_security'] == [200.0, 550.0]
+
+
+def test_pay_frequency_follows_the_period_length():
+    start = date(2026, 3, 2)
+    assert [periods_per_year(start, start + timedelta(days=days - 1)) for days in (7, 14, 15, 31)] == [52, 26, 24, 12]
+
+
+def test_bundled_tables_load_once():
+    tables = load_tax_tables()
+    assert load_tax_tables() is tables
+    assert tables.social_security_wage_base > 0 and tables.federal.annual_tax(0) == 0
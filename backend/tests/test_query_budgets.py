@@ -0,0 +1,103 @@
+import importlib.util
+import io
+
+import pytest
+
+from extensions import db
+from models.user import User
+from services.refcache import reference_cache
+from tests.budgets import OPTIONAL_DEPENDENCIES, ROUTE_BUDGETS
+from tests.conftest import seed_ledger
+from tests.query_budget import QueryBudgetExceeded, count_queries, query_budget
+
+# Endpoints served without touching application code
+UNBUDGETED = {'static'}
+
+
+def _fill(value, ids):
+    """Substitute seeded ids into a path or JSON body."""
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in ids:
+            return ids[value[1:-1]]
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, ids) for item in value]
+    return value
+
+
+def _send(client, headers, budget, ids):
+    """Issue the request and read the whole body, so streamed responses run too."""
+    if budget.files:
+        body = {'data': {field: (io.BytesIO(content), name) for field, (name, content) in budget.files.items()}}
+    else:
+        body = {'json': _fill(budget.json, ids)}
+    response = client.open(
+        _fill(budget.path, ids),
+        method=budget.method,
+        headers=headers,
+        **body
+    )
+    response.get_data()
+    response.close()
+    return response
+
+
+def test_every_endpoint_has_a_budget(app):
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules()} - UNBUDGETED
+    assert sorted(endpoints - ROUTE_BUDGETS.keys()) == [], 'endpoints without a query budget'
+    assert sorted(ROUTE_BUDGETS.keys() - endpoints) == [], 'budgets for endpoints that no longer exist'
+
+
+@pytest.mark.parametrize('endpoint', sorted(ROUTE_BUDGETS))
+def test_endpoint_stays_within_query_budget(client, auth_headers, seeded, endpoint):
+    budget = ROUTE_BUDGETS[endpoint]
+    dependency = OPTIONAL_DEPENDENCIES.get(endpoint)
+    if dependency and importlib.util.find_spec(dependency) is None:
+        pytest.skip(f'{dependency} is not installed')
+    with query_budget(budget.limit, label=endpoint):
+        response = _send(client, auth_headers, budget, seeded)
+    assert response.status_code < 400, response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('endpoint', sorted(
+    endpoint for endpoint, budget in ROUTE_BUDGETS.items() if budget.method == 'GET'
+))
+def test_read_queries_do_not_grow_with_rows(app, client, auth_headers, endpoint):
+    """Reads issue the same number of statements for 2 rows as for 8."""
+    budget = ROUTE_BUDGETS[endpoint]
+    owner = User.query.filter_by(username='owner').one()
+    owner_columns = {column.name: getattr(owner, column.name) for column in User.__table__.columns}
+    counts = []
+    for scale in (2, 8):
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        reference_cache.clear()
+        db.session.add(User(**owner_columns))
+        ids = seed_ledger(owner_columns['id'], scale)
+        db.session.expire_all()
+        with count_queries() as queries:
+            _send(client, auth_headers, budget, ids)
+        counts.append(queries.count)
+    assert counts[0] == counts[1], f'{endpoint} ran {counts[0]} statements for 2 rows and {counts[1]} for 8'
+
+
+def test_query_budget_reports_the_statements(app):
+    with pytest.raises(QueryBudgetExceeded) as excinfo:
+        with query_budget(1, label='two selects'):
+            db.session.execute(db.select(User)).all()
+            db.session.execute(db.select(User.id)).all()
+    assert 'two selects ran 2 SQL statements, budget is 1' in str(excinfo.value)
+
+
+def test_count_queries_works_as_a_decorator(app):
+    counter = count_queries()
+
+    @counter
+    def load_users():
+        return db.session.execute(db.select(User)).all()
+
+    load_users()
+    assert counter.count == 1
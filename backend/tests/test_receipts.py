@@ -0,0 +1,119 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from models.expense import ExpenseReceipt
+from services.receipts import blob_path, storage_dir
+from tests.budgets import RECEIPT_PNG
+
+
+def _upload(client, headers, expense_id, content, filename='receipt.pdf'):
+    return client.post(
+        f'/api/expenses/{expense_id}/receipt',
+        headers=headers,
+        data={'receipt': (io.BytesIO(content), filename)},
+        content_type='multipart/form-data'
+    )
+
+
+def _blobs():
+    return [name for _, _, names in os.walk(os.path.join(storage_dir(), 'blobs')) for name in names]
+
+
+def test_identical_receipts_are_stored_once(client, auth_headers, seeded):
+    content = b'%PDF-1.4\n' + os.urandom(300_000)
+    other_expense_id = client.get('/api/expenses', headers=auth_headers).get_json()['expenses'][-1]['id']
+
+    first = _upload(client, auth_headers, seeded['expense_id'], content)
+    second = _upload(client, auth_headers, other_expense_id, content, filename='copy.pdf')
+
+    assert first.status_code == second.status_code == 201
+    sha256 = hashlib.sha256(content).hexdigest()
+    assert first.get_json()['receipt']['sha256'] == second.get_json()['receipt']['sha256'] == sha256
+    # The seeded PNG stays in the store until receipts-gc finds it unreferenced
+    assert sorted(_blobs()) == sorted([sha256, hashlib.sha256(RECEIPT_PNG).hexdigest()])
+    assert ExpenseReceipt.query.filter_by(sha256=sha256).count() == 2
+    assert not os.listdir(os.path.join(storage_dir(), 'tmp'))
+
+
+def test_large_binary_receipts_stream_through(client, auth_headers, seeded):
+    # Several MB of binary content, which holds CR/LF runs the multipart decoder buffers
+    content = b'%PDF-1.4\n' + b''.join(hashlib.sha256(n.to_bytes(4, 'big')).digest() for n in range(200_000))
+
+    response = _upload(client, auth_headers, seeded['expense_id'], content)
+
+    assert response.status_code == 201, response.get_data(as_text=True)
+    assert response.get_json()['receipt']['sha256'] == hashlib.sha256(content).hexdigest()
+    assert client.get(f"/api/expenses/{seeded['expense_id']}/receipt", headers=auth_headers).data == content
+
+
+def test_uploads_refresh_the_cached_dashboard(client, auth_headers, seeded):
+    bundle = client.get('/api/dashboard/bundle', headers=auth_headers).get_json()
+    expense_id = next(
+        expense['id'] for expense in bundle['overview']['recent_activity']['expenses'] if not expense['receipt_url']
+    )
+
+    assert _upload(client, auth_headers, expense_id, b'%PDF-1.4\n').status_code == 201
+
+    bundle = client.get('/api/dashboard/bundle', headers=auth_headers).get_json()
+    recent = {expense['id']: expense for expense in bundle['overview']['recent_activity']['expenses']}
+    assert recent[expense_id]['receipt_url'] == f'/api/expenses/{expense_id}/receipt'
+
+
+def test_receipts_are_served_with_ranges(client, auth_headers, seeded):
+    content = b'%PDF-1.4\n' + bytes(range(256)) * 100
+    _upload(client, auth_headers, seeded['expense_id'], content)
+    url = f"/api/expenses/{seeded['expense_id']}/receipt"
+
+    full = client.get(url, headers=auth_headers)
+    partial = client.get(url, headers=dict(auth_headers, Range='bytes=100-199'))
+    cached = client.get(url, headers=dict(auth_headers, **{'If-None-Match': full.headers['ETag']}))
+
+    assert full.data == content and full.mimetype == 'application/pdf'
+    assert partial.status_code == 206 and partial.data == content[100:200]
+    assert cached.status_code == 304
+
+
+def test_rejected_uploads_leave_nothing_behind(app, client, auth_headers, seeded):
+    app.config['RECEIPT_MAX_BYTES'] = 1024
+    too_large = client.post(
+        f"/api/expenses/{seeded['expense_id']}/receipt",
+        headers=auth_headers,
+        data={'receipt': (io.BytesIO(b'%PDF-' + b'x' * 4096), 'big.pdf'), 'note': 'padding ' * 10},
+        content_type='multipart/form-data'
+    )
+    not_a_receipt = _upload(client, auth_headers, seeded['expense_id'], b'<html>hi</html>', 'page.html')
+
+    assert too_large.status_code == 413
+    assert not_a_receipt.status_code == 415
+    assert not os.listdir(os.path.join(storage_dir(), 'tmp'))
+    assert ExpenseReceipt.query.one().content_type == 'image/png'
+
+
+def test_thumbnails_are_rendered_once(client, auth_headers, seeded):
+    pytest.importorskip('PIL')
+    url = f"/api/expenses/{seeded['expense_id']}/receipt/thumbnail"
+
+    first = client.get(url, headers=auth_headers)
+    rendered = os.listdir(os.path.join(storage_dir(), 'thumbnails'))
+    second = client.get(url, headers=auth_headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.mimetype == 'image/jpeg' and first.data == second.data
+    assert rendered == os.listdir(os.path.join(storage_dir(), 'thumbnails'))
+    assert open(blob_path(hashlib.sha256(RECEIPT_PNG).hexdigest()), 'rb').read() == RECEIPT_PNG
+
+
+def test_corrupt_images_get_no_thumbnail(client, auth_headers, seeded):
+    pytest.importorskip('PIL')
+    # A valid PNG signature passes the upload check; the body cannot be decoded
+    corrupt = RECEIPT_PNG[:16] + os.urandom(64)
+    assert _upload(client, auth_headers, seeded['expense_id'], corrupt, 'broken.png').status_code == 201
+
+    response = client.get(f"/api/expenses/{seeded['expense_id']}/receipt/thumbnail", headers=auth_headers)
+
+    assert response.status_code == 415
+    assert response.get_json()['error'] == 'Receipt image could not be read'
+    assert not [names for _, _, names in os.walk(os.path.join(storage_dir(), 'thumbnails')) if names]
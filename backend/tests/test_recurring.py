@@ -0,0 +1,142 @@
+from datetime import date, timedelta
+
+from extensions import db
+from models.expense import Expense, ExpenseCategory
+from models.invoice import Invoice, InvoiceItem
+from models.recurring import RecurringInstance, RecurringTemplate
+from models.user import User
+from services.recurring import generate_recurring, occurrence_date, schedule_from
+from tests.query_budget import count_queries
+
+
+def _add_templates(user_id, count, start_date):
+    category_id = ExpenseCategory.query.filter_by(name='office').one().id
+    templates = [
+        RecurringTemplate(
+            user_id=user_id,
+            kind='invoice' if i % 2 == 0 else 'expense',
+            name=f'Plan {i}',
+            frequency='monthly',
+            interval=1,
+            start_date=start_date,
+            client_name=f'Tenant client {i}',
+            client_email=f'tenant{i}@example.com',
+            tax_rate=10,
+            due_days=14,
+            items='[{"description": "Plan", "quantity": 2, "unit_price": 100}]',
+            category_id=category_id,
+            description=f'Licence {i}',
+            amount=30
+        )
+        for i in range(count)
+    ]
+    for template in templates:
+        schedule_from(template, 0)
+    db.session.add_all(templates)
+    db.session.commit()
+    return templates
+
+
+def _other_tenant(name):
+    user = User(username=name, email=f'{name}@example.com', first_name='Tess', last_name='Tenant')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _round_trips(statements):
+    """Statement count with repeats of the same statement counted once.
+
+    SQLite cannot order RETURNING rows from a multi-row INSERT, so SQLAlchemy
+    sends those INSERTs a row at a time there (as for /api/invoices/bulk).
+    """
+    return sum(1 for n, sql in enumerate(statements) if n == 0 or sql != statements[n - 1])
+
+
+def test_schedules_count_from_the_start_date():
+    month_end = [occurrence_date(date(2026, 1, 31), 'monthly', 1, n) for n in range(4)]
+    assert month_end == [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)]
+    assert occurrence_date(date(2024, 2, 29), 'yearly', 1, 1) == date(2025, 2, 28)
+    assert occurrence_date(date(2026, 11, 15), 'quarterly', 1, 1) == date(2027, 2, 15)
+    assert occurrence_date(date(2026, 1, 1), 'weekly', 2, 3) == date(2026, 2, 12)
+
+    template = RecurringTemplate(
+        start_date=date(2026, 1, 31), frequency='monthly', interval=1, end_date=date(2026, 3, 1)
+    )
+    schedule_from(template, 1)
+    assert template.next_run_date == date(2026, 2, 28)
+    schedule_from(template, 2)
+    assert template.next_run_date is None
+
+
+def test_generator_covers_every_tenant_once(client, auth_headers, seeded):
+    tenant = _other_tenant('tenant')
+    start_date = date.today() + timedelta(days=7)
+    _add_templates(tenant.id, 1, start_date)
+    run_date = occurrence_date(start_date, 'monthly', 1, 2)
+
+    counts = generate_recurring(run_date)
+
+    # The seeded owner has 5 templates (3 invoices, 2 expenses); each catches up 3 months
+    assert counts == {'invoices': 4 * 3, 'expenses': 2 * 3}
+    assert RecurringInstance.query.count() == 6 * 3
+    tenant_invoices = Invoice.query.filter_by(user_id=tenant.id).order_by(Invoice.issue_date).all()
+    assert [invoice.issue_date for invoice in tenant_invoices] == [
+        occurrence_date(start_date, 'monthly', 1, n) for n in range(3)
+    ]
+    assert {(invoice.status, float(invoice.total_amount)) for invoice in tenant_invoices} == {('draft', 220.0)}
+    assert tenant_invoices[0].due_date == start_date + timedelta(days=14)
+    assert [item.description for item in tenant_invoices[0].items] == ['Plan']
+
+    totals = (Invoice.query.count(), InvoiceItem.query.count(), Expense.query.count())
+    assert generate_recurring(run_date) == {'invoices': 0, 'expenses': 0}
+    assert (Invoice.query.count(), InvoiceItem.query.count(), Expense.query.count()) == totals
+
+    template = db.session.get(RecurringTemplate, seeded['recurring_template_id'])
+    assert template.run_count == 3
+    assert template.next_run_date == occurrence_date(start_date, 'monthly', 1, 3)
+    trial = client.get('/api/ledger/trial-balance', headers=auth_headers).get_json()
+    assert trial['balanced']
+
+
+def test_generator_statements_do_not_grow_with_templates(app, seeded):
+    owner_id = User.query.filter_by(username='owner').one().id
+    start_date = date.today() + timedelta(days=7)
+    _add_templates(_other_tenant('small').id, 2, start_date)
+
+    with count_queries() as few:
+        assert sum(generate_recurring(start_date).values()) == 5 + 2
+
+    later = start_date + timedelta(days=3)
+    _add_templates(owner_id, 12, later)
+    _add_templates(_other_tenant('large').id, 12, later)
+
+    with count_queries() as many:
+        assert sum(generate_recurring(later).values()) == 24
+
+    assert _round_trips(few.statements) == _round_trips(many.statements)
+
+
+def test_updates_cannot_clear_required_fields(client, auth_headers, seeded):
+    expense_template = RecurringTemplate.query.filter_by(kind='expense').first()
+
+    response = client.put(f'/api/recurring/{expense_template.id}', headers=auth_headers, json={'amount': None})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'amount is required'
+
+
+def test_a_broken_template_does_not_stop_other_tenants(client, auth_headers, seeded):
+    tenant = _other_tenant('tenant')
+    start_date = date.today() + timedelta(days=7)
+    _add_templates(tenant.id, 1, start_date)
+    broken = RecurringTemplate.query.filter_by(kind='expense').first()
+    broken.amount = None  # e.g. written before updates were validated
+    db.session.commit()
+
+    counts = generate_recurring(start_date)
+
+    assert counts == {'invoices': 4, 'expenses': 1}
+    assert Invoice.query.filter_by(user_id=tenant.id).count() == 1
+    assert db.session.get(RecurringTemplate, broken.id).active is False
@@ -0,0 +1,69 @@
+from extensions import db
+from models.expense import Expense
+from models.payroll import Employee
+from models.user import User
+from services.search import rebuild_search_index, search
+
+
+def _owner_id():
+    return User.query.filter_by(username='owner').one().id
+
+
+def test_every_term_must_match_as_a_prefix(app, seeded):
+    owner_id = _owner_id()
+
+    results, total = search(owner_id, 'stap')
+    assert total == 5 and {result['type'] for result in results} == {'expenses'}
+    assert {result['subtitle'] for result in results} == {'Staples'}
+
+    results, total = search(owner_id, 'Worker2 tes')
+    assert total == 1 and results[0]['title'] == 'Worker2 Test'
+    assert results[0]['id'] == Employee.query.filter_by(first_name='Worker2').one().id
+    assert search(owner_id, 'worker2 staples') == ([], 0)
+    # Punctuation is not FTS syntax, and a query with no words finds nothing
+    assert search(owner_id, '"client" (3*') == search(owner_id, 'client 3') != ([], 0)
+    assert search(owner_id, '*') == ([], 0)
+
+
+def test_results_are_limited_to_the_user_and_requested_types(app, client, auth_headers, seeded):
+    other = User(username='other', email='other@example.com', first_name='Oth', last_name='Er')
+    other.set_password('secret')
+    db.session.add(other)
+    db.session.commit()
+
+    assert search(other.id, 'staples') == ([], 0)
+
+    response = client.get('/api/search?q=client&types=invoices&per_page=2&page=3', headers=auth_headers)
+    body = response.get_json()
+    assert (body['total'], body['pages'], body['current_page']) == (5, 3, 3)
+    assert [result['type'] for result in body['results']] == ['invoices']
+
+    unknown = client.get('/api/search?q=client&types=invoices,payments', headers=auth_headers)
+    assert unknown.status_code == 400 and unknown.get_json()['error'] == 'Unknown search type: payments'
+    assert client.get('/api/search?q=%20', headers=auth_headers).status_code == 400
+
+
+def test_the_index_follows_updates_and_deletes(app, seeded):
+    owner_id = _owner_id()
+    expense = db.session.get(Expense, seeded['expense_id'])
+
+    expense.vendor = 'Zeppelin Supplies'
+    db.session.commit()
+    [result], _ = search(owner_id, 'zeppelin')
+    assert result['id'] == expense.id and search(owner_id, 'staples')[1] == 4
+
+    db.session.delete(expense)
+    db.session.commit()
+    assert search(owner_id, 'zeppelin') == ([], 0)
+
+
+def test_rebuild_indexes_rows_written_before_search_existed(app, seeded):
+    with db.engine.begin() as connection:
+        for trigger in ('ai', 'ad', 'au'):
+            connection.exec_driver_sql(f'DROP TRIGGER expense_fts_{trigger}')
+        connection.exec_driver_sql('DROP TABLE expense_fts')
+        connection.exec_driver_sql("UPDATE expense SET vendor = 'Office Depot'")
+
+    rebuild_search_index()
+
+    assert search(_owner_id(), 'depot')[1] == 5
@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys
+from app import create_app
+app = create_app('testing')
+loaded = lambda: sorted(name for name in sys.modules if name.startswith('routes.'))
+at_startup = loaded()
+app.test_client().get('/api/health')
+after_health = loaded()
+app.test_client().get('/api/ledger/accounts')
+print(json.dumps([at_startup, after_health, loaded()]))
+"""
+
+
+def test_blueprints_import_on_first_request_to_their_prefix():
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=BACKEND_DIR, env=dict(os.environ, LAZY_BLUEPRINTS='true'),
+        capture_output=True, text=True, check=True
+    )
+    at_startup, after_health, after_ledger = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert at_startup == []
+    assert after_health == []
+    assert after_ledger == ['routes.ledger']
+
+
+
+def _rules(app):
+    return sorted((rule.rule, rule.endpoint, sorted(rule.methods)) for rule in app.url_map.iter_rules())
+
+
+def test_lazy_apps_register_the_same_rules_up_front(monkeypatch):
+    from app import create_app
+    from blueprints import route_table
+    from config import TestingConfig
+    from route_table import ROUTES
+
+    monkeypatch.setattr(TestingConfig, 'LAZY_BLUEPRINTS', False)
+    eager = create_app('testing')
+    monkeypatch.setattr(TestingConfig, 'LAZY_BLUEPRINTS', True)
+    lazy = create_app('testing')
+
+    assert route_table(eager) == ROUTES, 'route_table.py is stale: run LAZY_BLUEPRINTS=false flask --app app route-table'
+    assert _rules(lazy) == _rules(eager)
+
+
+def test_first_requests_leave_the_url_map_alone(app, client):
+    assert app.config['LAZY_BLUEPRINTS']
+    before = _rules(app)
+
+    assert client.get('/api/outbox/').status_code == 401
+    assert client.get('/api/search?q=x').status_code == 401
+
+    assert _rules(app) == before
@@ -0,0 +1,128 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+import routes.reports
+from extensions import db
+from models.expense import ExpenseCategory
+from models.invoice import Invoice
+from models.recurring import RecurringTemplate
+from models.report_snapshot import TaxSummarySnapshot
+from models.user import User
+from services.recurring import generate_recurring, schedule_from
+from services.tax_snapshots import invalidate_tax_snapshots, store_snapshots, tax_year_revisions
+
+YEAR = date.today().year - 1
+DAY = date(YEAR, 6, 15)
+
+
+def _owner_id():
+    return User.query.filter_by(username='owner').one().id
+
+
+def _summary(client, headers):
+    return client.get(f'/api/reports/tax-summary?year={YEAR}', headers=headers).get_json()
+
+
+def _add_expense_elsewhere(amount):
+    """Write without invalidating, as a stale snapshot would see it."""
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO expense (user_id, category_id, description, amount, expense_date, status) "
+            "VALUES (:user_id, :category_id, 'Unseen', :amount, :day, 'pending')"
+        ), {'user_id': _owner_id(), 'category_id': ExpenseCategory.query.first().id, 'amount': amount, 'day': DAY})
+
+
+def test_closed_years_are_served_from_their_snapshot(client, auth_headers, seeded):
+    first = _summary(client, auth_headers)
+    _add_expense_elsewhere(100)
+
+    assert _summary(client, auth_headers) == first
+    assert TaxSummarySnapshot.query.filter_by(tax_year=YEAR).count() == 1
+    # The current year is never stored
+    client.get(f'/api/reports/tax-summary?year={YEAR + 1}', headers=auth_headers)
+    assert TaxSummarySnapshot.query.count() == 1
+
+
+def _create_invoice(client, headers, seeded):
+    return client.post('/api/invoices', headers=headers, json={
+        'client_name': 'Backdated', 'issue_date': DAY.isoformat(), 'due_date': DAY.isoformat(), 'status': 'paid',
+        'items': [{'description': 'Work', 'quantity': 1, 'unit_price': 100}]
+    })
+
+
+def _create_expense(client, headers, seeded):
+    return client.post('/api/expenses', headers=headers, json={
+        'category': 'office', 'description': 'Backdated', 'amount': 100, 'expense_date': DAY.isoformat()
+    })
+
+
+def _create_payroll_record(client, headers, seeded):
+    return client.post('/api/payroll/payroll', headers=headers, json={
+        'employee_id': seeded['employee_id'], 'pay_period_start': DAY.isoformat(),
+        'pay_period_end': DAY.isoformat(), 'pay_date': DAY.isoformat(), 'regular_hours': 4
+    })
+
+
+def _pay_invoice(client, headers, seeded):
+    invoice = Invoice.query.filter_by(status='sent').first()
+    return client.post(f'/api/invoices/{invoice.id}/payments', headers=headers, json={
+        'amount': float(invoice.total_amount), 'payment_date': DAY.isoformat()
+    })
+
+
+def _generate_recurring(client, headers, seeded):
+    template = RecurringTemplate(
+        user_id=_owner_id(), kind='expense', name='Backdated', frequency='monthly', interval=1, start_date=DAY,
+        category_id=ExpenseCategory.query.first().id, description='Backdated', amount=100
+    )
+    schedule_from(template, 0)
+    db.session.add(template)
+    db.session.commit()
+    return generate_recurring(today=DAY)
+
+
+def _backdate_sent_invoice():
+    with db.engine.begin() as connection:
+        connection.execute(text("UPDATE invoice SET issue_date = :day WHERE status = 'sent'"), {'day': DAY})
+
+
+@pytest.mark.parametrize('write', [
+    _create_invoice, _create_expense, _create_payroll_record, _pay_invoice, _generate_recurring
+])
+def test_backdated_writes_drop_the_snapshot(client, auth_headers, seeded, write):
+    _backdate_sent_invoice()
+    before = _summary(client, auth_headers)
+    assert TaxSummarySnapshot.query.filter_by(tax_year=YEAR).count() == 1
+
+    write(client, auth_headers, seeded)
+
+    assert TaxSummarySnapshot.query.filter_by(tax_year=YEAR).count() == 0
+    assert tax_year_revisions(_owner_id(), [YEAR]) == {YEAR: 1}
+    assert _summary(client, auth_headers) != before
+
+
+def test_a_new_report_version_recomputes_the_snapshot(client, auth_headers, seeded, monkeypatch):
+    first = _summary(client, auth_headers)
+    _add_expense_elsewhere(100)
+
+    monkeypatch.setattr(routes.reports, 'TAX_SUMMARY_VERSION', routes.reports.TAX_SUMMARY_VERSION + 1)
+    second = _summary(client, auth_headers)
+
+    assert second['expenses_breakdown']['business_expenses'] == first['expenses_breakdown']['business_expenses'] + 100
+    assert TaxSummarySnapshot.query.filter_by(tax_year=YEAR).count() == 2
+
+
+def test_a_write_committed_during_the_computation_blocks_the_store(app, seeded):
+    owner_id = _owner_id()
+    revisions = tax_year_revisions(owner_id, [YEAR])
+
+    # A backdated write commits while the reader is still computing
+    invalidate_tax_snapshots(owner_id, DAY)
+    db.session.commit()
+
+    assert store_snapshots(owner_id, 1, {YEAR: {'stale': True}}, revisions) == set()
+    assert store_snapshots(owner_id, 1, {YEAR: {'fresh': True}}, tax_year_revisions(owner_id, [YEAR])) == {YEAR}
+    db.session.commit()
+    assert TaxSummarySnapshot.query.one().payload == '{"fresh": true}'
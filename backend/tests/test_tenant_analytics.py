@@ -0,0 +1,133 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from app import create_app
+from config import TestingConfig, config
+from extensions import db
+from services.refcache import reference_cache
+from services.tenant_analytics import collect_tenant_stats, merge_stats, partition_range
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Worker threads open their own connections, so the data must live in a file
+    file_config = type('FileTestingConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'smoothbooks.db'}",
+        'ANALYTICS_WORKERS': 4
+    })
+    monkeypatch.setitem(config, 'file-testing', file_config)
+    app = create_app('file-testing')
+    app.config['RECEIPT_STORAGE_DIR'] = str(tmp_path / 'receipts')
+    app.config['INVOICE_PDF_DIR'] = str(tmp_path / 'invoice-pdfs')
+    with app.app_context():
+        reference_cache.clear()
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _register(client, name):
+    response = client.post('/api/auth/register', json={
+        'username': name, 'email': f'{name}@example.com', 'password': 'secret',
+        'first_name': 'Tess', 'last_name': 'Tenant'
+    })
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+@pytest.fixture
+def tenant_headers(client, seeded):
+    headers = _register(client, 'tenant')
+    for status, day in (('paid', TODAY - timedelta(days=40)), ('draft', TODAY)):
+        client.post('/api/invoices', headers=headers, json={
+            'client_name': 'Customer', 'issue_date': day.isoformat(), 'due_date': day.isoformat(), 'status': status,
+            'items': [{'description': 'Work', 'quantity': 2, 'unit_price': 100}]
+        })
+    client.post('/api/expenses', headers=headers, json={
+        'category': 'office', 'description': 'Paper', 'amount': 50, 'expense_date': TODAY.isoformat()
+    })
+    return headers
+
+
+def _analytics(client, headers, query=''):
+    response = client.get(f'/api/admin/analytics{query}', headers=headers)
+    return response, [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_only_admins_see_analytics(client, auth_headers, tenant_headers):
+    response = client.get('/api/admin/analytics', headers=tenant_headers)
+
+    assert response.status_code == 403 and response.get_json()['error'] == 'Admin access required'
+
+
+@pytest.mark.parametrize('query', [
+    '?start_date=2026-13-01', '?end_date=yesterday', '?start_date=2026-05-02&end_date=2026-05-01'
+])
+def test_bad_or_inverted_dates_are_rejected(client, auth_headers, query):
+    assert client.get(f'/api/admin/analytics{query}', headers=auth_headers).status_code == 400
+
+
+def test_each_tenant_and_the_totals_are_reported(client, auth_headers, tenant_headers):
+    response, lines = _analytics(client, auth_headers)
+
+    assert response.status_code == 200 and response.mimetype == 'application/x-ndjson'
+    owner, tenant, totals = lines
+    # Seeded: one paid 330 invoice, expenses of 25 to 29 and five 2000 pay periods
+    assert (owner['username'], owner['revenue'], owner['expenses'], owner['payroll']) == ('owner', 330.0, 135.0, 10000.0)
+    assert owner['invoice_status'] == {'draft': 2, 'sent': 2, 'paid': 1}
+    assert owner['profit'] == round(330 - 135 - 10000, 2)
+    assert (tenant['username'], tenant['revenue'], tenant['expenses'], tenant['payroll']) == ('tenant', 200.0, 50.0, 0.0)
+    assert tenant['invoice_status'] == {'paid': 1, 'draft': 1}
+    assert totals == {
+        'type': 'totals',
+        'period': {'start_date': (TODAY - timedelta(days=365)).isoformat(), 'end_date': TODAY.isoformat()},
+        'tenants': 2, 'revenue': 530.0, 'expenses': 185.0, 'payroll': 10000.0,
+        'invoice_status': {'draft': 3, 'sent': 2, 'paid': 2}
+    }
+
+    # The tenant's paid invoice falls outside a 30-day window
+    _, (_, tenant, _) = _analytics(client, auth_headers, f'?start_date={(TODAY - timedelta(days=30)).isoformat()}')
+    assert (tenant['revenue'], tenant['invoice_status']) == (0.0, {'draft': 1})
+
+
+def test_partitions_cover_the_range_once():
+    start = date(2026, 1, 1)
+
+    assert partition_range(start, date(2026, 1, 10), 4) == [
+        (date(2026, 1, 1), date(2026, 1, 4)), (date(2026, 1, 5), date(2026, 1, 8)), (date(2026, 1, 9), date(2026, 1, 10))
+    ]
+    assert partition_range(start, start, 92) == [(start, start)]
+    assert partition_range(start, start - timedelta(days=1), 92) == []
+
+
+def test_partials_merge_per_tenant():
+    first = merge_stats([])
+    first[1]['revenue'], first[1]['invoice_status']['paid'] = 10.0, 1
+    second = merge_stats([])
+    second[1]['expenses'], second[1]['invoice_status']['paid'] = 4.0, 2
+    second[2]['payroll'] = 7.0
+
+    merged = merge_stats([first, second])
+
+    assert (merged[1]['revenue'], merged[1]['expenses'], dict(merged[1]['invoice_status'])) == (10.0, 4.0, {'paid': 3})
+    assert merged[2]['payroll'] == 7.0 and dict(merged[2]['invoice_status']) == {}
+
+
+def _plain(stats):
+    return {user_id: dict(tenant, invoice_status=dict(tenant['invoice_status'])) for user_id, tenant in stats.items()}
+
+
+def test_threaded_partitions_match_a_single_pass(app, tenant_headers):
+    start, end = TODAY - timedelta(days=365), TODAY
+
+    single = collect_tenant_stats(app, start, end, workers=1, partition_days=366)
+    # One-day partitions split the seeded rows across many threads
+    threaded = collect_tenant_stats(app, start, end, workers=4, partition_days=1)
+    sequential = collect_tenant_stats(app, start, end, workers=1, partition_days=1)
+
+    assert _plain(threaded) == _plain(sequential) == _plain(single)
+    assert len(single) == 2
@@ -0,0 +1,90 @@
+from datetime import date, time
+
+from models.payroll import TimeEntry
+from services.timesheets import SAME_START_AND_END, compute_hours, time_parser
+
+TODAY = date.today().isoformat()
+
+
+def test_hours_wrap_past_midnight():
+    hours, overtime = compute_hours([time(22, 0), time(9, 0), time(23, 45)], [time(6, 0), time(17, 30), time(0, 15)])
+
+    assert hours == [8.0, 8.5, 0.5]
+    assert overtime == [False, True, False]
+
+
+def test_overtime_is_flagged_above_the_daily_threshold():
+    starts = [time(9, 0)] * 3
+    ends = [time(17, 0), time(17, 1), time(19, 0)]
+
+    assert compute_hours(starts, ends, 8)[1] == [False, True, True]
+    assert compute_hours(starts, ends, 10)[1] == [False, False, False]
+    assert compute_hours(starts, ends, 0)[1] == [False, False, False]
+
+
+def test_times_are_parsed_once_per_distinct_string():
+    parse = time_parser()
+    assert parse('09:30') is parse('09:30') and parse('09:30') == time(9, 30)
+
+
+def _entry(employee_id, start_time='09:00', end_time='17:00', **fields):
+    return {'employee_id': employee_id, 'date': TODAY, 'start_time': start_time, 'end_time': end_time, **fields}
+
+
+def test_bulk_import_rejects_bad_rows_by_index(app, client, auth_headers, seeded):
+    app.config['OVERTIME_DAILY_THRESHOLD'] = 8
+    other = client.post('/api/auth/register', json={
+        'username': 'other', 'email': 'other@example.com', 'password': 'secret', 'first_name': 'Oth', 'last_name': 'Er'
+    }).get_json()['access_token']
+    foreign_id = client.post('/api/payroll/employees', headers={'Authorization': f'Bearer {other}'}, json={
+        'employee_id': 'EMP-OTHER', 'first_name': 'Not', 'last_name': 'Yours', 'email': 'notyours@example.com',
+        'hire_date': TODAY, 'salary': 40000
+    }).get_json()['employee']['id']
+    employee_id = seeded['employee_id']
+    before = TimeEntry.query.count()
+
+    response = client.post('/api/payroll/time-entries/bulk', headers=auth_headers, json={'entries': [
+        _entry(employee_id, '22:00', '06:00'),
+        _entry(employee_id, '9am', '17:00'),
+        _entry(foreign_id),
+        'not an entry',
+        _entry(employee_id, '08:00', '18:00', notes='Long day'),
+        _entry(employee_id, '09:00', '09:00'),
+        {'employee_id': employee_id, 'date': TODAY, 'start_time': '09:00'}
+    ]})
+
+    assert response.status_code == 207
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == ['created', 'error', 'error', 'error', 'created', 'error', 'error']
+    assert (results[0]['hours_worked'], results[0]['is_overtime']) == (8.0, False)
+    assert (results[4]['hours_worked'], results[4]['is_overtime']) == (10.0, True)
+    assert [results[index]['error'] for index in (1, 2, 3, 5, 6)] == [
+        'Invalid employee, date or time format', 'Employee not found', 'Time entry must be an object',
+        SAME_START_AND_END, 'end_time is required'
+    ]
+    assert TimeEntry.query.count() == before + 2
+    assert TimeEntry.query.filter_by(employee_id=foreign_id).count() == 0
+
+
+def test_bulk_import_limits_the_batch_size(app, client, auth_headers, seeded):
+    app.config['BULK_MAX_TIME_ENTRIES'] = 2
+
+    too_many = client.post('/api/payroll/time-entries/bulk', headers=auth_headers, json={
+        'entries': [_entry(seeded['employee_id'])] * 3
+    })
+    at_limit = client.post('/api/payroll/time-entries/bulk', headers=auth_headers, json={
+        'entries': [_entry(seeded['employee_id'])] * 2
+    })
+
+    assert too_many.status_code == 400 and 'At most 2 time entries' in too_many.get_json()['error']
+    assert at_limit.status_code == 201 and at_limit.get_json()['created'] == 2
+
+
+def test_single_entries_share_the_hours_rules(client, auth_headers, seeded):
+    overnight = client.post('/api/payroll/time-entries', headers=auth_headers,
+                            json=_entry(seeded['employee_id'], '22:00', '06:00'))
+    empty = client.post('/api/payroll/time-entries', headers=auth_headers,
+                        json=_entry(seeded['employee_id'], '09:00', '09:00'))
+
+    assert overnight.status_code == 201 and overnight.get_json()['time_entry']['hours_worked'] == 8.0
+    assert empty.status_code == 400 and empty.get_json()['error'] == SAME_START_AND_END
@@ -33,13 +33,10 @@ function Dashboard() {
   const fetchDashboardData = async () => {
     try {
       setLoading(true);
-      const [overviewRes, revenueRes] = await Promise.all([
-        axios.get('/api/dashboard/overview'),
-        axios.get('/api/dashboard/charts/revenue')
-      ]);
+      const response = await axios.get('/api/dashboard/bundle');
 
-      setDashboardData(overviewRes.data);
-      setRevenueData(revenueRes.data.data);
+      setDashboardData(response.data.overview);
+      setRevenueData(response.data.revenue_chart.data);
     } catch (err) {
       setError('Failed to load dashboard data');
       console.error('Dashboard data fetch error:', err);
@@ -51,6 +51,7 @@ function Expenses() {
   const [error, setError] = useState('');
   const [openDialog, setOpenDialog] = useState(false);
   const [editingExpense, setEditingExpense] = useState(null);
+  const [receiptFile, setReceiptFile] = useState(null);
   const [formData, setFormData] = useState({
     description: '',
     amount: '',
@@ -119,6 +120,7 @@ function Expenses() {
   const handleCloseDialog = () => {
     setOpenDialog(false);
     setEditingExpense(null);
+    setReceiptFile(null);
     setFormData({
       description: '',
       amount: '',
@@ -136,10 +138,17 @@ function Expenses() {
 
   const handleSubmit = async () => {
     try {
+      let response;
       if (editingExpense) {
-        await axios.put(`/api/expenses/${editingExpense.id}`, formData);
+        response = await axios.put(`/api/expenses/${editingExpense.id}`, formData);
       } else {
-        await axios.post('/api/expenses', formData);
+        response = await axios.post('/api/expenses', formData);
+      }
+
+      if (receiptFile) {
+        const upload = new FormData();
+        upload.append('receipt', receiptFile);
+        await axios.post(`/api/expenses/${response.data.expense.id}/receipt`, upload);
       }
 
       fetchExpenses();
@@ -150,6 +159,21 @@ function Expenses() {
     }
   };
 
+  const openReceipt = async (receiptUrl) => {
+    if (!receiptUrl.startsWith('/api/')) {
+      window.open(receiptUrl, '_blank');
+      return;
+    }
+    // Stored receipts need the auth header, so fetch them and open a blob URL
+    try {
+      const response = await axios.get(receiptUrl, { responseType: 'blob' });
+      window.open(URL.createObjectURL(response.data), '_blank');
+    } catch (err) {
+      setError('Failed to open receipt');
+      console.error('Error opening receipt:', err);
+    }
+  };
+
   const handleDelete = async (id) => {
     if (window.confirm('Are you sure you want to delete this expense?')) {
       try {
@@ -316,7 +340,7 @@ function Expenses() {
                 <TableCell>${parseFloat(expense.amount).toLocaleString()}</TableCell>
                 <TableCell>
                   {expense.receipt_url && (
-                    <IconButton size="small" onClick={() => window.open(expense.receipt_url, '_blank')}>
+                    <IconButton size="small" onClick={() => openReceipt(expense.receipt_url)}>
                       <Receipt />
                     </IconButton>
                   )}
@@ -405,6 +429,17 @@ function Expenses() {
                 placeholder="https://example.com/receipt.pdf"
               />
             </Grid>
+            <Grid item xs={12}>
+              <Button variant="outlined" component="label">
+                {receiptFile ? receiptFile.name : 'Upload Receipt'}
+                <input
+                  type="file"
+                  hidden
+                  accept="application/pdf,image/jpeg,image/png,image/gif,image/webp"
+                  onChange={(e) => setReceiptFile(e.target.files[0] || null)}
+                />
+              </Button>
+            </Grid>
             <Grid item xs={12}>
               <TextField
                 fullWidth
@@ -31,7 +31,8 @@ import {
   Add,
   Edit,
   Delete,
-  Send
+  Send,
+  PictureAsPdf
 } from '@mui/icons-material';
 import axios from '../config/axios';
 
@@ -226,6 +227,20 @@ function Invoices() {
     }
   };
 
+  const handleDownloadPdf = async (invoice) => {
+    try {
+      const response = await axios.get(`/api/invoices/${invoice.id}/pdf`, { responseType: 'blob' });
+      const link = document.createElement('a');
+      link.href = URL.createObjectURL(response.data);
+      link.download = `${invoice.invoice_number}.pdf`;
+      link.click();
+      URL.revokeObjectURL(link.href);
+    } catch (err) {
+      setError('Failed to download invoice PDF');
+      console.error('Error downloading invoice PDF:', err);
+    }
+  };
+
   if (loading) {
     return (
       <Box display="flex" justifyContent="center" alignItems="center" minHeight="400px">
@@ -343,6 +358,9 @@ function Invoices() {
                   <IconButton size="small" onClick={() => handleDelete(invoice.id)}>
                     <Delete />
                   </IconButton>
+                  <IconButton size="small" onClick={() => handleDownloadPdf(invoice)}>
+                    <PictureAsPdf />
+                  </IconButton>
                   {invoice.status === 'draft' && (
                     <IconButton size="small" onClick={() => handleSendInvoice(invoice.id)}>
                       <Send />
@@ -62,19 +62,13 @@ function Reports() {
       setError('');
       
       if (reportType === 'financial') {
-        const [financialRes, revenueRes, expenseRes] = await Promise.all([
-          axios.get(`/api/reports/financial?range=${dateRange}`),
-          axios.get(`/api/reports/revenue?range=${dateRange}`),
-          axios.get(`/api/reports/expenses?range=${dateRange}`)
-        ]);
+        const response = await axios.get(`/api/reports/bundle?range=${dateRange}`);
         
-        console.log('Financial data received:', financialRes.data);
-        console.log('Revenue data received:', revenueRes.data);
-        console.log('Expense data received:', expenseRes.data);
+        console.log('Report bundle received:', response.data);
         
-        setFinancialData(financialRes.data);
-        setRevenueData(revenueRes.data.data);
-        setExpenseData(expenseRes.data.data);
+        setFinancialData(response.data.financial);
+        setRevenueData(response.data.revenue.data);
+        setExpenseData(response.data.expenses.data);
       } else if (reportType === 'invoices') {
         const response = await axios.get(`/api/reports/invoice-report?range=${dateRange}`);
         setInvoiceData(response.data.invoices);
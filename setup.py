@@ -114,6 +114,7 @@ echo ""
 echo "Starting Backend Server..."
 cd backend
 source venv/bin/activate
+flask --app app init-db
 python app.py &
 BACKEND_PID=$!
 
@@ -4,7 +4,7 @@ echo.
 
 echo Starting Backend Server...
 cd backend
-start "SmoothBooks Backend" cmd /k "venv\Scripts\activate && python app.py"
+start "SmoothBooks Backend" cmd /k "venv\Scripts\activate && flask --app app init-db && python app.py"
 
 echo.
 echo Starting Frontend Server...